@@ -26,6 +26,13 @@ if %errorlevel% neq 0 (
     pip install cx-freeze
 )
 
+echo Building the optimized databases...
+python -m core_functions.database_builder --output albayan_database
+if %errorlevel% neq 0 (
+    echo Building the databases failed!
+    exit /b 1
+)
+
 if exist setup.py (
     echo Building the program with cx-Freeze...
     python setup.py build
@@ -1,9 +1,11 @@
 import os
 import sqlite3
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from functools import lru_cache
+from contextlib import contextmanager
 from abc import ABC, abstractmethod
 from exceptions.database import DBNotFoundError
+from utils.connection_pool import ConnectionPool
 from utils.logger import LoggerManager
 
 logger = LoggerManager.get_logger(__name__)
@@ -16,17 +18,17 @@ class RecitersManager(ABC):
         self.table_name = table_name
         logger.debug(f"{self.__class__.__name__} initialized.")
 
-    def _connect(self) -> sqlite3.Connection:
-        """Establishes a connection to the SQLite database."""
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Borrows a pooled read-only connection to the SQLite database for a with block."""
         logger.debug(f"Connecting to database at: {self.db_path} in {self.__class__.__name__}")
         if not os.path.isfile(self.db_path):
             logger.error(f"Database file not found: {self.db_path}")
             raise DBNotFoundError(self.db_path)
-        
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        logger.debug(f"Database connection established successfully to {self.db_path} in {self.__class__.__name__}")
-        return conn
+
+        with ConnectionPool.connection(self.db_path) as conn:
+            logger.debug(f"Database connection established successfully to {self.db_path} in {self.__class__.__name__}")
+            yield conn
 
     def get_reciters(self) -> List[sqlite3.Row]:
         """Fetches all reciters from the database."""
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import argparse
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List
+from exceptions.database import DBNotFoundError
+from core_functions.search.builder import SearchDatabaseBuilder
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+
+class DatabaseBuilder:
+    """
+    Regenerate the bundled databases as optimized read-only files, for packaging.
+
+    The database folder is copied to the output folder, then every SQLite file of the copy gets
+    an index on each unit column of its tables, SQLite statistics and a vacuum at a fixed page size,
+    and a manifest of the checksums of all the copied files is written next to them.
+    The search artifacts of Verses.DB are built too (see SearchDatabaseBuilder).
+    The source folder is never modified, so running the build twice gives the same files.
+
+    Run from the program folder:
+        python -m core_functions.database_builder
+    """
+    DATABASE_SUFFIXES = (".db",)
+    # The unit columns of the quran tables, each indexed with the ayah number, in Quran order, and the columns that
+    # locate an ayah inside its surah, so the first and last ayah of a unit, its surahs and its ayah count are read from the index alone.
+    UNIT_COLUMNS = ("page", "juz", "hizb", "hizbQuarter", "sura_number")
+    COVERED_COLUMNS = ("number", "sura_number", "numberInSurah")
+    # Larger pages only add slack to the long rows of the tafsir and Quran texts.
+    PAGE_SIZE = 4096
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, source_dir: str = "database", output_dir: str = "albayan_database"):
+        if not os.path.isdir(source_dir):
+            logger.error(f"Database folder not found: {source_dir}")
+            raise DBNotFoundError(source_dir)
+        self.source_dir = Path(source_dir)
+        self.output_dir = Path(output_dir)
+
+    def build(self) -> Dict[str, Dict[str, object]]:
+        """Build every database of the output folder and return the manifest."""
+        logger.info(f"Building optimized databases from {self.source_dir} into {self.output_dir}...")
+        if self.output_dir.exists():
+            shutil.rmtree(self.output_dir)
+        shutil.copytree(self.source_dir, self.output_dir)
+
+        for db_path in self.database_files():
+            if db_path.name.lower() == "verses.db":
+                SearchDatabaseBuilder(str(db_path)).build()
+            self.optimize(db_path)
+
+        manifest = self.write_manifest()
+        logger.info(f"Built {len(manifest)} files in {self.output_dir}.")
+        return manifest
+
+    def database_files(self) -> List[Path]:
+        return sorted(path for path in self.output_dir.rglob("*") if path.suffix.lower() in self.DATABASE_SUFFIXES)
+
+    def optimize(self, db_path: Path) -> None:
+        """Index the unit columns, gather the statistics and vacuum one database."""
+        with closing(sqlite3.connect(db_path)) as conn:
+            with conn:
+                tables = [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%';")]
+                for table in tables:
+                    self.create_unit_indexes(conn, table)
+            conn.execute(f"PRAGMA page_size = {self.PAGE_SIZE};")
+            conn.execute("PRAGMA journal_mode = DELETE;")
+            conn.execute("ANALYZE;")
+            conn.execute("VACUUM;")
+        logger.debug(f"Optimized {db_path}, {db_path.stat().st_size} bytes.")
+
+    def create_unit_indexes(self, conn: sqlite3.Connection, table: str) -> None:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info('{table}');")}
+        for column in self.UNIT_COLUMNS:
+            if column not in columns:
+                continue
+            indexed = [column] + [covered for covered in self.COVERED_COLUMNS if covered in columns and covered != column]
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({', '.join(indexed)});")
+            logger.debug(f"Indexed {table}({', '.join(indexed)}).")
+
+    def write_manifest(self) -> Dict[str, Dict[str, object]]:
+        """Write the size and SHA-256 of every file of the output folder to the manifest, keyed by relative path."""
+        manifest = {}
+        for path in sorted(self.output_dir.rglob("*")):
+            if not path.is_file() or path.name == self.MANIFEST_NAME:
+                continue
+            sha256 = hashlib.sha256()
+            with open(path, "rb") as file:
+                for block in iter(lambda: file.read(1 << 20), b""):
+                    sha256.update(block)
+            manifest[path.relative_to(self.output_dir).as_posix()] = {"size": path.stat().st_size, "sha256": sha256.hexdigest()}
+
+        with open(self.output_dir / self.MANIFEST_NAME, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=4)
+        return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build optimized read-only copies of the bundled databases.")
+    parser.add_argument("--source", default="database", help="The database folder of the program.")
+    parser.add_argument("--output", default="albayan_database", help="The folder to write the optimized databases to, replaced if it exists.")
+    args = parser.parse_args()
+    DatabaseBuilder(args.source, args.output).build()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,31 @@ import sqlite3
 import json
 import os
 from abc import ABC, abstractmethod
+from typing import Optional
+from core_functions.quran.corpus import QuranCorpus
+from core_functions.quran.types import NavigationMode, QuranFontType
+from utils.connection_pool import ConnectionPool
 from utils.logger import LoggerManager
 
 logger = LoggerManager.get_logger(__name__)
 
 class Base(ABC):
     
-    def _connect(self, file_path) -> sqlite3.Connection:
-        """Connect to the SQLite database and return the connection object."""
+    def _connect(self, file_path) -> None:
+        """Check that the SQLite database exists, its connections are taken from the connection pool for each query."""
         logger.debug(f"Connecting to the database: {file_path}, in instance of {self.__class__.__name__}")
         
         if not os.path.isfile(file_path):
             logger.error(f"No database found in: {file_path}")
             raise FileNotFoundError(f"No database found in: {file_path}")
 
-        conn = sqlite3.connect(file_path)
-        conn.row_factory = sqlite3.Row
+        self._file_path = file_path
         logger.info(f"Connected to the database successfully: {file_path}, in instance of {self.__class__.__name__}")
-        return conn
+
+    def _fetchone(self, query: str, parameters: tuple = ()) -> Optional[sqlite3.Row]:
+        """Run a query on a pooled read-only connection and return its first row."""
+        with ConnectionPool.connection(self._file_path) as conn:
+            return conn.execute(query, parameters).fetchone()
     
     @property
     @abstractmethod
@@ -35,13 +42,7 @@ class Base(ABC):
         logger.debug(f"Removed empty lines, new text length: {len(text)}.")
         return text
 
-    def __del__(self) -> None:
-        """Destructor to close the database connection."""
-        logger.debug(f"Deleting {self.__class__.__name__} object and closing database.")
-        if self._conn is not None:
-            self._conn.close()
-            logger.info(f"Deleted {self.__class__.__name__} object and Database connection closed.")
-        
+
 class E3rab(Base):
     def __init__(self, surah_number: int, ayah_number: int) -> None:
         logger.debug(f"Initializing E3rab with surah: {surah_number}, ayah: {ayah_number}.")
@@ -49,8 +50,7 @@ class E3rab(Base):
         self._surah_number = surah_number
         self._ayah_number = ayah_number
         file_path = os.path.join("database", "other", "e3rab.db")
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
+        self._connect(file_path)
         logger.debug(f"Initialized E3rab successfully with surah: {surah_number}, ayah: {ayah_number}.")
 
     @property
@@ -59,8 +59,7 @@ class E3rab(Base):
         logger.debug(f"Fetching E3rab for {self._surah_number}, Ayah {self._ayah_number}.")
         
         query = f"SELECT text FROM e3rab_{self._surah_number} WHERE number = ?;"
-        self.cursor.execute(query, (self._ayah_number,))
-        result = self.cursor.fetchone()
+        result = self._fetchone(query, (self._ayah_number,))
 
         if result:
             logger.debug(f"E3rab found for Surah {self._surah_number}, Ayah {self._ayah_number}.")
@@ -75,8 +74,7 @@ class TanzilAyah(Base):
         logger.debug(f"Initializing TanzilAyah with Ayah {ayah_number}.")
         self._ayah_number = ayah_number
         file_path = os.path.join("database", "other", "tanzil.db")
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
+        self._connect(file_path)
         logger.debug(f"Initialized TanzilAyah successfully with Ayah {ayah_number}.")
 
     @property
@@ -85,8 +83,7 @@ class TanzilAyah(Base):
         logger.debug(f"Fetching tanzilAyah for Ayah {self._ayah_number} from Tanzil database.")
         
         query = "SELECT text FROM tanzil WHERE number = ?;"
-        self.cursor.execute(query, (self._ayah_number,))
-        result = self.cursor.fetchone()
+        result = self._fetchone(query, (self._ayah_number,))
 
         if result:
             logger.debug(f"TanzilAyah found for Ayah {self._ayah_number}.")
@@ -102,8 +99,7 @@ class AyaInfo(Base):
         self._ayah_number = ayah_number
         file_path = os.path.join("database", "quran", "quran.DB")
         
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
+        self._connect(file_path)
         logger.debug(f"Initialized AyaInfo successfully with Ayah {ayah_number}.")
 
 
@@ -144,8 +140,7 @@ class AyaInfo(Base):
         WHERE number = ?;
         """
 
-        self.cursor.execute(query, (self._ayah_number,))
-        result = self.cursor.fetchone()
+        result = self._fetchone(query, (self._ayah_number,))
 
         if result:
             logger.debug(f"Aya information found for Ayah {self._ayah_number}.")
@@ -182,8 +177,7 @@ class SuraInfo(Base):
         assert 1 <= surah_number <= 114, "Out of surah number."
         self._surah_number = surah_number
         file_path = os.path.join("database", "other", "quran_info.DB")
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
+        self._connect(file_path)
         logger.debug(f"Initialized SuraInfo successfully for Surah {surah_number}.")
 
     @property
@@ -191,8 +185,7 @@ class SuraInfo(Base):
         """Fetch the Surah information for the specified Surah number."""
         logger.debug(f"Fetching information for Surah {self._surah_number}.")
         
-        self.cursor.execute("SELECT sura_number, info FROM surah_info WHERE sura_number = ?", (self._surah_number,))
-        result = self.cursor.fetchone()
+        result = self._fetchone("SELECT sura_number, info FROM surah_info WHERE sura_number = ?", (self._surah_number,))
 
         if result and result[0]:
             info =  json.loads(result["info"])
@@ -236,15 +229,52 @@ class SuraInfo(Base):
         return text.strip()
 
 
-class JuzInfo(Base):
+class UnitInfo(Base):
+    """
+    Information about a juz, hizb, quarter or page, read from the unit boundaries that the Quran corpus
+    materializes once for every unit, so each dialog is answered by one lookup instead of a scan of the quran table.
+    """
+    MODE: NavigationMode
+
+    def __init__(self, number: int) -> None:
+        self._number = number
+        self._corpus = QuranCorpus.get(QuranFontType.DEFAULT)
+
+    def _fetch(self) -> Optional[dict]:
+        """Return the fields shown by the info dialogs for the unit, or None if it does not exist."""
+        bounds = self._corpus.unit_bounds(self.MODE, self._number)
+        if bounds is None:
+            return None
+
+        first, last = bounds.first_ayah, bounds.last_ayah
+        return {
+            "start_ayah_number": first.number_in_surah,
+            "end_ayah_number": last.number_in_surah,
+            "start_sura_name": first.sura_name,
+            "end_sura_name": last.sura_name,
+            "surah_names": ", ".join(bounds.surah_names),
+            "count_surahs": len(bounds.surah_names),
+            "count_ayahs": bounds.ayah_count,
+            "juz": first.juz,
+            "hizb": first.hizb,
+            "start_page": first.page,
+            "end_page": last.page,
+            "start_hizb": first.hizb,
+            "end_hizb": last.hizb,
+            "start_hizbQuarter": first.hizbQuarter,
+            "end_hizbQuarter": last.hizbQuarter,
+        }
+
+
+class JuzInfo(UnitInfo):
+    MODE = NavigationMode.JUZ
+
     def __init__(self, juz_number: int) -> None:
         """Initialize with a specific Juz number"""
         logger.debug(f"Initializing JuzInfo for Juz {juz_number}.")
         assert 1 <= juz_number <= 30, "❌ Juz number must be between 1 and 30."
+        super().__init__(juz_number)
         self._juz_number = juz_number
-        file_path = os.path.join("database", "quran", "quran.DB")
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
         logger.debug(f"Initialized JuzInfo successfully for Juz {juz_number}.")
 
     @property
@@ -252,33 +282,11 @@ class JuzInfo(Base):
         """Fetch the Juz information for the specified Juz number."""
         logger.debug(f"Fetching information for Juz {self._juz_number}.")
         
-        query = """ 
-        SELECT 
-            juz AS juz_number,
-            MIN(page) AS start_page,
-            MAX(page) AS end_page,
-            MIN(hizb) AS start_hizb,
-            MAX(hizb) AS end_hizb,
-            MIN(hizbQuarter) AS start_hizbQuarter,
-            MAX(hizbQuarter) AS end_hizbQuarter,
-            COUNT(DISTINCT sura_number) AS count_surahs,
-            COUNT(number) AS count_ayahs,
-            (SELECT numberInSurah FROM quran q2 WHERE q2.juz = q1.juz ORDER BY number LIMIT 1) AS start_ayah_number,
-            (SELECT numberInSurah FROM quran q3 WHERE q3.juz = q1.juz ORDER BY number DESC LIMIT 1) AS end_ayah_number,
-            (SELECT sura_name FROM quran q4 WHERE q4.juz = q1.juz ORDER BY number LIMIT 1) AS start_sura_name,
-            (SELECT sura_name FROM quran q5 WHERE q5.juz = q1.juz ORDER BY number DESC LIMIT 1) AS end_sura_name,
-            (SELECT GROUP_CONCAT(REPLACE(sura_name, 'سورة ', ''), ', ') FROM (SELECT DISTINCT sura_name FROM quran WHERE juz = q1.juz)) AS surah_names
-        FROM quran q1
-        WHERE juz = ?
-        GROUP BY juz;
-        """
-
-        self.cursor.execute(query, (self._juz_number,))
-        result = self.cursor.fetchone()
-
+        result = self._fetch()
         if result:
+            result["juz_number"] = self._juz_number
             logger.debug(f"Information fetched successfully for Juz {self._juz_number}.")
-            return self._format(dict(result))
+            return self._format(result)
         else:
             logger.warning(f"No information found for Juz {self._juz_number}. Returning empty string.")
             return ""
@@ -301,15 +309,15 @@ class JuzInfo(Base):
         return text.strip()
 
 
-class HizbInfo(Base):
+class HizbInfo(UnitInfo):
+    MODE = NavigationMode.HIZB
+
     def __init__(self, hizb_number: int) -> None:
         """Initialize with a specific Hizb number"""
         logger.debug(f"Initializing HizbInfo for Hizb {hizb_number}.")
         assert 1 <= hizb_number <= 60, "❌ Hizb number must be between 1 and 60."
+        super().__init__(hizb_number)
         self._hizb_number = hizb_number
-        file_path = os.path.join("database", "quran", "quran.DB")
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
         logger.debug(f"Initialized HizbInfo successfully for Hizb {hizb_number}.")
 
     @property
@@ -317,36 +325,12 @@ class HizbInfo(Base):
         """Fetch the Hizb information for the specified Hizb number."""
         logger.debug(f"Fetching information for Hizb {self._hizb_number}.")
 
-        query = """ 
-        SELECT 
-            hizb AS hizb_number,
-            CASE 
-                WHEN (hizb % 2) = 1 THEN 'الأول' 
-                ELSE 'الثاني' 
-            END AS hizb_order_in_juz,
-            MIN(juz) AS juz,
-            MIN(page) AS start_page,
-            MAX(page) end_page,
-            MIN(hizbQuarter) AS start_hizbQuarter,
-            MAX(hizbQuarter) AS end_hizbQuarter,
-            COUNT(DISTINCT sura_number) AS count_surahs,
-            COUNT(number) AS count_ayahs,
-            (SELECT numberInSurah FROM quran WHERE hizb = q1.hizb ORDER BY number LIMIT 1) AS start_ayah_number,
-            (SELECT numberInSurah FROM quran WHERE hizb = q1.hizb ORDER BY number DESC LIMIT 1) AS end_ayah_number,
-            (SELECT sura_name FROM quran WHERE hizb = q1.hizb ORDER BY number LIMIT 1) AS start_sura_name,
-            (SELECT sura_name FROM quran WHERE hizb = q1.hizb ORDER BY number DESC LIMIT 1) AS end_sura_name,
-            (SELECT GROUP_CONCAT(REPLACE(sura_name, 'سورة ', ''), ', ') FROM (SELECT DISTINCT sura_name FROM quran WHERE hizb = q1.hizb)) AS surah_names
-        FROM quran q1
-        WHERE hizb = ?
-        GROUP BY hizb;
-        """
-
-        self.cursor.execute(query, (self._hizb_number,))
-        result = self.cursor.fetchone()
-
+        result = self._fetch()
         if result:
+            result["hizb_number"] = self._hizb_number
+            result["hizb_order_in_juz"] = "الأول" if self._hizb_number % 2 == 1 else "الثاني"
             logger.debug(f"Information fetched successfully for Hizb {self._hizb_number}.")
-            return self._format(dict(result))
+            return self._format(result)
         else:
             logger.warning(f"No information found for Hizb {self._hizb_number}. Returning empty string.")
             return ""
@@ -369,15 +353,15 @@ class HizbInfo(Base):
         return text.strip()
     
     
-class QuarterInfo(Base):
+class QuarterInfo(UnitInfo):
+    MODE = NavigationMode.QUARTER
+
     def __init__(self, quarter_number: int) -> None:
         """Initialize with a specific Quarter number"""
         logger.debug(f"Initializing QuarterInfo for Quarter {quarter_number}.")
         assert 1 <= quarter_number <= 240, "❌ Quarter number must be between 1 and 240."
+        super().__init__(quarter_number)
         self._quarter_number = quarter_number
-        file_path = os.path.join("database", "quran", "quran.DB")        
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
         logger.info(f"Initialized QuarterInfo successfully for Quarter {quarter_number}.")
 
     @property
@@ -385,41 +369,14 @@ class QuarterInfo(Base):
         """Fetch the Quarter information for the specified Quarter number."""
         logger.debug(f"Fetching information for Quarter {self._quarter_number}.")
         
-        query = """ 
-        SELECT 
-            hizbQuarter AS quarter_number,
-            CASE
-            WHEN hizb % 2 = 1 THEN 'الأول'
-            ELSE 'الثاني'
-            END AS hizbOrderInJuz,
-            CASE 
-                WHEN hizbQuarter % 4 = 1 THEN 'الأول'
-                WHEN hizbQuarter % 4 = 2 THEN 'الثاني'
-                WHEN hizbQuarter % 4 = 3 THEN 'الثالث'
-                ELSE 'الرابع'
-            END AS quarter_order_in_hizb,
-            MIN(juz) AS juz_number,
-            MIN(hizb) AS hizb,
-            MIN(page) AS start_page,
-            MAX(page) AS end_page,
-            COUNT(DISTINCT sura_number) AS count_surahs,
-            COUNT(number) AS count_ayahs,
-            (SELECT numberInSurah FROM quran WHERE hizbQuarter = q1.hizbQuarter ORDER BY number LIMIT 1) AS start_ayah_number,
-            (SELECT numberInSurah FROM quran WHERE hizbQuarter = q1.hizbQuarter ORDER BY number DESC LIMIT 1) AS end_ayah_number,
-            (SELECT sura_name FROM quran WHERE hizbQuarter = q1.hizbQuarter ORDER BY number LIMIT 1) AS start_sura_name,
-            (SELECT sura_name FROM quran WHERE hizbQuarter = q1.hizbQuarter ORDER BY number DESC LIMIT 1) AS end_sura_name,
-            (SELECT GROUP_CONCAT(REPLACE(sura_name, 'سورة ', ''), ', ') FROM (SELECT DISTINCT sura_name FROM quran WHERE hizbQuarter = q1.hizbQuarter)) AS surah_names
-        FROM quran q1
-        WHERE hizbQuarter = ?
-        GROUP BY hizbQuarter;
-        """
-
-        self.cursor.execute(query, (self._quarter_number,))
-        result = self.cursor.fetchone()
-
+        result = self._fetch()
         if result:
+            result["quarter_number"] = self._quarter_number
+            result["hizbOrderInJuz"] = "الأول" if result["hizb"] % 2 == 1 else "الثاني"
+            result["quarter_order_in_hizb"] = ("الرابع", "الأول", "الثاني", "الثالث")[self._quarter_number % 4]
+            result["juz_number"] = result["juz"]
             logger.debug(f"Information fetched successfully for Quarter {self._quarter_number}.")
-            return self._format(dict(result))
+            return self._format(result)
         else:
             logger.warning(f"No information found for Quarter {self._quarter_number}. Returning empty string.")
             return ""
@@ -441,15 +398,15 @@ class QuarterInfo(Base):
         logger.debug(f"Formatted information for Quarter {data['quarter_number']}.")
         return text.strip()
 
-class PageInfo(Base):
+class PageInfo(UnitInfo):
+    MODE = NavigationMode.PAGE
+
     def __init__(self, page_number: int) -> None:
         """Initialize with a specific Page number"""
         logger.debug(f"Initializing PageInfo for Page {page_number}.")
         assert 1 <= page_number <= 604, "❌ Page number must be between 1 and 604."
+        super().__init__(page_number)
         self._page_number = page_number
-        file_path = os.path.join("database", "quran", "quran.DB")
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
         logger.debug(f"Initialized PageInfo successfully for Page {page_number}.")
 
     @property
@@ -457,30 +414,14 @@ class PageInfo(Base):
         """Fetch the Page information for the specified Page number."""
         logger.debug(f"Fetching information for Page {self._page_number}.")
         
-        query = """ 
-        SELECT 
-            page AS page_number,
-            MIN(juz) AS juz_number,
-            MIN(hizb) AS hizb_number,
-            MIN(hizbQuarter) AS quarter_number,
-            COUNT(DISTINCT sura_number) AS count_surahs,
-            COUNT(number) AS count_ayahs,
-            (SELECT numberInSurah FROM quran WHERE page = q1.page ORDER BY number LIMIT 1) AS start_ayah_number,
-            (SELECT numberInSurah FROM quran WHERE page = q1.page ORDER BY number DESC LIMIT 1) AS end_ayah_number,
-            (SELECT sura_name FROM quran WHERE page = q1.page ORDER BY number LIMIT 1) AS start_sura_name,
-            (SELECT sura_name FROM quran WHERE page = q1.page ORDER BY number DESC LIMIT 1) AS end_sura_name,
-            (SELECT GROUP_CONCAT(REPLACE(sura_name, 'سورة ', ''), ', ') FROM (SELECT DISTINCT sura_name FROM quran WHERE page = q1.page)) AS surah_names
-        FROM quran q1
-        WHERE page = ?
-        GROUP BY page;
-        """
-
-        self.cursor.execute(query, (self._page_number,))
-        result = self.cursor.fetchone()
-
+        result = self._fetch()
         if result:
+            result["page_number"] = self._page_number
+            result["juz_number"] = result["juz"]
+            result["hizb_number"] = result["hizb"]
+            result["quarter_number"] = result["start_hizbQuarter"]
             logger.debug(f"Information fetched successfully for Page {self._page_number}.")
-            return self._format(dict(result))
+            return self._format(result)
         else:
             logger.warning(f"No information found for Page {self._page_number}. Returning empty string.")
             return ""
@@ -511,8 +452,7 @@ class MoshafInfo(Base):
         """Initialize the MoshafInfo class."""
         logger.debug(f"Initializing MoshafInfo.")
         file_path = os.path.join("database", "quran", "quran.DB")
-        self._conn = self._connect(file_path)
-        self.cursor = self._conn.cursor()
+        self._connect(file_path)
         logger.debug(f"Initialized MoshafInfo successfully.")
 
     @property
@@ -531,8 +471,7 @@ class MoshafInfo(Base):
         FROM quran;
         """
         
-        self.cursor.execute(query)
-        result = self.cursor.fetchone()
+        result = self._fetchone(query)
 
         if result:
             logger.debug("General information about the Quran fetched successfully.")
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import sqlite3
+import threading
+from array import array
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+from .types import QuranFontType, NavigationMode, Surah, Ayah, UnitBounds
+from exceptions.database import DBNotFoundError, DatabaseConnectionError
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+
+class QuranCorpus:
+    """
+    The whole Quran of one font, loaded once and kept in columns.
+
+    Row i of every column is the ayah number i + 1. Surahs, juz, hizbs, quarters and pages are contiguous and
+    numbered in Quran order, so every unit is a slice of the rows between two consecutive offsets, found in O(1).
+    The Ayah objects handed out are views over the rows, they share the texts and the interned surah names.
+    """
+    _instances: Dict[QuranFontType, "QuranCorpus"] = {}
+    _lock = threading.Lock()
+    UNIT_COLUMNS = {
+        NavigationMode.PAGE: "page",
+        NavigationMode.SURAH: "sura_number",
+        NavigationMode.JUZ: "juz",
+        NavigationMode.HIZB: "hizb",
+        NavigationMode.QUARTER: "hizbQuarter",
+    }
+
+    def __init__(self, db_path: str):
+        logger.debug(f"Loading Quran corpus from: {db_path}...")
+        self.db_path = db_path
+        self.texts: List[str] = []
+        self.sura_names: List[str] = []
+        self.sura_number = array("B")
+        self.number_in_surah = array("H")
+        self.juz = array("B")
+        self.hizb = array("B")
+        self.hizbQuarter = array("H")
+        self.page = array("H")
+        self.sajda = array("B")
+        self.sajdaObligation = array("B")
+        # For every unit column, the row of the first ayah of each unit, offsets[column][unit - 1], and the row count at the end.
+        self.offsets: Dict[str, array] = {}
+        # The surah table: the first global ayah number and the ayah count of each surah, surah_table[surah_number - 1].
+        self.surah_table: List[Surah] = []
+        # The boundaries of every unit of every column, materialized on first use, _bounds[column][unit - 1].
+        self._bounds: Optional[Dict[str, List[UnitBounds]]] = None
+        self._load()
+        logger.info(f"Quran corpus loaded with {len(self)} ayahs.")
+
+    @classmethod
+    def get(cls, font_type: QuranFontType) -> "QuranCorpus":
+        """Return the shared corpus of the font, loading it on first use."""
+        with cls._lock:
+            corpus = cls._instances.get(font_type)
+            if corpus is None:
+                corpus = cls._instances[font_type] = cls(str(font_type.database))
+            return corpus
+
+    def _load(self) -> None:
+        if not os.path.isfile(self.db_path):
+            logger.error(f"Database file not found: {self.db_path}")
+            raise DBNotFoundError(self.db_path)
+
+        try:
+            with closing(sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)) as conn:
+                rows = conn.execute(
+                    "SELECT number, text, sura_name, sura_number, numberInSurah, juz, hizb, hizbQuarter, page, sajda, sajdaObligation "
+                    "FROM quran ORDER BY number;"
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load Quran corpus: {e}")
+            raise DatabaseConnectionError(cause=e)
+
+        for row, (number, text, sura_name, sura_number, number_in_surah, juz, hizb, quarter, page, sajda, sajda_obligation) in enumerate(rows, 1):
+            if number != row:
+                raise DatabaseConnectionError(f"The ayahs of {self.db_path} are not numbered 1 to {len(rows)}: found {number} at row {row}.")
+            self.texts.append(text)
+            if sura_number > len(self.sura_names):
+                self.sura_names.append(sys.intern(sura_name))
+            self.sura_number.append(sura_number)
+            self.number_in_surah.append(number_in_surah)
+            self.juz.append(juz)
+            self.hizb.append(hizb)
+            self.hizbQuarter.append(quarter)
+            self.page.append(page)
+            self.sajda.append(bool(sajda))
+            self.sajdaObligation.append(bool(sajda_obligation))
+
+        for column in self.UNIT_COLUMNS.values():
+            offsets = self.offsets[column] = array("H")
+            for row, unit in enumerate(getattr(self, column)):
+                if len(offsets) < unit:
+                    offsets.append(row)
+            offsets.append(len(self.texts))
+
+        offsets = self.offsets["sura_number"]
+        self.surah_table = [
+            Surah(
+                number=surah_number,
+                name=name.replace("سورة ", ""),
+                ayah_count=offsets[surah_number] - offsets[surah_number - 1],
+                first_ayah_number=offsets[surah_number - 1] + 1,
+                last_ayah_number=offsets[surah_number]
+            )
+            for surah_number, name in enumerate(self.sura_names, 1)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def unit_count(self, mode: NavigationMode) -> int:
+        return len(self.offsets[self.UNIT_COLUMNS[mode]]) - 1
+
+    def unit_rows(self, mode: NavigationMode, unit: int) -> Tuple[int, int]:
+        """Return the [start, stop) rows of a page, surah, juz, hizb or quarter, an empty interval if it does not exist."""
+        offsets = self.offsets[self.UNIT_COLUMNS[mode]]
+        if not 1 <= unit < len(offsets):
+            return 0, 0
+        return offsets[unit - 1], offsets[unit]
+
+    def unit_of(self, mode: NavigationMode, ayah_number: int) -> int:
+        """Return the page, surah, juz, hizb or quarter of an ayah number."""
+        return getattr(self, self.UNIT_COLUMNS[mode])[ayah_number - 1]
+
+    def ayahs(self, start: int, stop: int) -> List[Ayah]:
+        """Return the ayahs of the rows [start, stop)."""
+        return [Ayah(self, row) for row in range(start, stop)]
+
+    def surahs(self) -> List[Surah]:
+        return self.surah_table
+
+    def ayah_number(self, surah_number: int, number_in_surah: Optional[int] = None, last: bool = False) -> Optional[int]:
+        """
+        Return the global number of an ayah of a surah, number_in_surah clamped to the ayahs of the surah.
+        Without number_in_surah, return the first ayah of the surah, or its last ayah if last is True.
+        Returns None if the surah does not exist.
+        """
+        if not 1 <= surah_number <= len(self.surah_table):
+            return None
+        surah = self.surah_table[surah_number - 1]
+        number_in_surah = number_in_surah or (surah.ayah_count if last else 1)
+        return surah.first_ayah_number + max(1, min(surah.ayah_count, number_in_surah)) - 1
+
+    def _build_bounds(self) -> Dict[str, List[UnitBounds]]:
+        bounds = {}
+        for column in self.UNIT_COLUMNS.values():
+            offsets = self.offsets[column]
+            bounds[column] = [
+                UnitBounds(
+                    number=unit,
+                    first_ayah=Ayah(self, start),
+                    last_ayah=Ayah(self, stop - 1),
+                    ayah_count=stop - start,
+                    surah_names=tuple(surah.name for surah in self.surah_table[self.sura_number[start] - 1:self.sura_number[stop - 1]])
+                )
+                for unit, (start, stop) in enumerate(zip(offsets, offsets[1:]), 1)
+            ]
+        logger.debug(f"Materialized the boundaries of {sum(len(units) for units in bounds.values())} units.")
+        return bounds
+
+    def unit_bounds(self, mode: NavigationMode, unit: int) -> Optional[UnitBounds]:
+        """Return the boundaries of a page, surah, juz, hizb or quarter, None if it does not exist."""
+        if self._bounds is None:
+            self._bounds = self._build_bounds()
+        units = self._bounds[self.UNIT_COLUMNS[mode]]
+        return units[unit - 1] if 1 <= unit <= len(units) else None
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 
-import re
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
 from pydantic import BaseModel
 from .types import MarksType, Ayah
 from .view_content import ViewContent
@@ -9,6 +8,32 @@ from utils.logger import LoggerManager
 
 logger = LoggerManager.get_logger(__name__)
 
+BASMALA = "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ"
+ARABIC_DIGITS_TABLE = str.maketrans("0123456789", "٠١٢٣٤٥٦٧٨٩")
+# str.translate is slow with multi-character replacements, replacing only the marks present in the ayah is faster.
+MARKS_REPLACEMENTS = {
+    MarksType.TEXT: tuple({
+        "۩": "(سجدة)",
+        "ۚ": "(ج)",
+        "ۗ": "(قلى)",
+        "ۖ": "(صلى)",
+        "ۘ": "(م)",
+        "ۙ": "(لا)",
+        "ۛ": "--",
+        "ۜ": "س"
+    }.items()),
+    MarksType.ACCESSIBLE: tuple({
+        "۩": "(سجدة)",
+        "ۚ": "(،)",
+        "ۗ": "(.ء)",
+        "ۖ": "(؛)",
+        "ۘ": "(.)",
+        "ۙ": "(لا)",
+        "ۛ": "--",
+        "ۜ": "س"
+    }.items()),
+}
+
 class FormatterOptions(BaseModel):
     """
     Formatter options for the Quran text.
@@ -17,6 +42,11 @@ class FormatterOptions(BaseModel):
     auto_page_turn: bool = False
     marks_type: MarksType = MarksType.DEFAULT
 
+    @property
+    def cache_key(self) -> tuple:
+        """The values of the options, to key the formatted views with. Changing an option changes the key."""
+        return self.show_ayah_number, self.auto_page_turn, self.marks_type
+
 
 class QuranFormatter:
     def __init__(self, view_content: ViewContent, formatter_options: FormatterOptions):
@@ -42,33 +72,9 @@ class QuranFormatter:
         returns:
             str: The text with replaced marks.
         """
-        
-        if self.formatter_options.marks_type == MarksType.TEXT:
-            marks = {
-                "۩": "(سجدة)",
-                "ۚ": "(ج)",
-                "ۗ": "(قلى)",
-                "ۖ": "(صلى)",
-                "ۘ": "(م)",
-                "ۙ": "(لا)",
-                "ۛ": "--",
-                "ۜ": "س"
-            }
-        elif self.formatter_options.marks_type == MarksType.ACCESSIBLE:
-            marks = {
-                "۩": "(سجدة)",
-                "ۚ": "(،)",
-                "ۗ": "(.ء)",
-                "ۖ": "(؛)",
-                "ۘ": "(.)",
-                "ۙ": "(لا)",
-                "ۛ": "--",
-                "ۜ": "س"
-            }
-
-        for mark, replacement in marks.items():
-            text = text.replace(mark, replacement)
-    
+        for mark, replacement in MARKS_REPLACEMENTS.get(self.formatter_options.marks_type, ()):
+            if mark in text:
+                text = text.replace(mark, replacement)
         return text
     
     @staticmethod
@@ -82,51 +88,62 @@ class QuranFormatter:
         Returns:
             str: A string with Arabic digits (e.g., "١٢٣").
         """
-        english_to_arabic = str.maketrans("0123456789", "٠١٢٣٤٥٦٧٨٩")
-        return str(english_number).translate(english_to_arabic)
+        return str(english_number).translate(ARABIC_DIGITS_TABLE)
 
-    def format_view(self, ayahs: List[Ayah]) -> str:
-        """Format the view content with ayat text and positions."""
-        text = ""
-        current_position = 0
-        final_ayahs = []
+    def iter_chunks(self, ayahs: Iterable[Ayah]) -> Iterator[Tuple[int, str, Optional[Ayah]]]:
+        """
+        Format the ayahs one by one and yield (position, chunk, ayah), the position of the chunk in the view text.
+        Each ayah is added to the view content with its positions before its chunk is yielded, so a large range
+        can be shown while it is formatted. The closing "|" of auto page turn is yielded last with no ayah.
+        The view content text is set once the generator is exhausted.
+        """
+        replace_marks = self.formatter_options.marks_type in MARKS_REPLACEMENTS
+        show_ayah_number = self.formatter_options.show_ayah_number
+        chunks = []
+        position = 0
+        pending = None
 
         for i, ayah in enumerate(ayahs):
-            ayah_text = ayah.text
-            if self.formatter_options.marks_type != MarksType.DEFAULT:
-                ayah_text = self.replace_marks(ayah_text)
+            parts = ["|\n"] if i == 0 and self.view_content.number != 1 else []
+            ayah_text = self.replace_marks(ayah.text) if replace_marks else ayah.text
 
             if ayah.number_in_surah == 1:
-                start_point = f"{ayah.sura_name} ({self.convert_english_to_arabic_number(ayah.sura_number)})\n|\n"
-                ayah_text = start_point + ayah_text
+                parts.append(f"{ayah.sura_name} ({self.convert_english_to_arabic_number(ayah.sura_number)})\n|\n")
                 if ayah.sura_number != 1:
-                    ayah_text = ayah_text.replace(
-                        "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ ", 
-                        "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ\n"
-                    )
-
-            if self.formatter_options.show_ayah_number:
-                ayah_text += f" ({self.convert_english_to_arabic_number(ayah.number_in_surah)})"
-
-            ayah_text = f"{ayah_text}\n"
-            ayah_text = f"|\n{ayah_text}" if i == 0 and self.view_content.number != 1 else ayah_text                
-            text += ayah_text
-
-            # Calculate the positions
-            ayah.first_position = current_position
-            current_position += len(ayah_text)
-            ayah.last_position = current_position - 1
-            final_ayahs.append(ayah)
-
+                    ayah_text = ayah_text.replace(BASMALA + " ", BASMALA + "\n")
+            parts.append(ayah_text)
+            if show_ayah_number:
+                parts.append(f" ({self.convert_english_to_arabic_number(ayah.number_in_surah)})")
+            parts.append("\n")
+            chunk = "".join(parts)
+
+            # Hold each chunk back by one ayah, so the last one can lose its trailing new line.
+            if pending is not None:
+                chunks.append(pending[1])
+                yield pending
+            ayah.first_position = position
+            position += len(chunk)
+            ayah.last_position = position - 1
+            self.view_content.insert(ayah)
+            pending = (ayah.first_position, chunk, ayah)
+
+        if pending is not None:
+            first_position, chunk, ayah = pending
+            if not self.formatter_options.auto_page_turn:
+                chunk = chunk.rstrip()
+            chunks.append(chunk)
+            yield first_position, chunk, ayah
         if self.formatter_options.auto_page_turn:
-            text += "|"
-        else:
-            text = text.strip()
+            chunks.append("|")
+            yield position, "|", None
 
-        self.view_content.text = text
-        self.view_content.insert_bulk(final_ayahs)
-        
-        return text
+        self.view_content.text = "".join(chunks)
+
+    def format_view(self, ayahs: List[Ayah]) -> str:
+        """Format the view content with ayat text and positions."""
+        for _ in self.iter_chunks(ayahs):
+            pass
+        return self.view_content.text
 
     def __repr__(self) -> str:
         return f"QuranFormatter(view_content={self.view_content}, formatter_options={self.formatter_options})"
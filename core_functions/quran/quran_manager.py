@@ -1,14 +1,17 @@
 # -*- coding: utf-8 -*-
 
-from typing import List, Optional
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
 from pathlib import Path
 from functools import lru_cache
-from sqlalchemy import create_engine, func, Column
-from sqlalchemy.orm import sessionmaker, Session
-from .models import Quran, QuranBase
-from .types import QuranFontType, NavigationMode, Surah, Ayah
+from .corpus import QuranCorpus
+from .types import QuranFontType, NavigationMode, Surah, Ayah, WindowEdit
 from .view_content import ViewContent
 from .formatter import FormatterOptions, QuranFormatter
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
 
 
 class QuranManager:
@@ -17,7 +20,22 @@ class QuranManager:
     MAX_JUZ     = 30
     MAX_HIZB    = 60
     MAX_QUARTER = 240
+    UNIT_LABELS = {
+        NavigationMode.PAGE:    "صفحة",
+        NavigationMode.SURAH:   "سورة",
+        NavigationMode.JUZ:     "جزء",
+        NavigationMode.HIZB:    "حزب",
+        NavigationMode.QUARTER: "ربع",
+    }
+    # Prefetched views kept at once: the neighbours of the current unit and of the previous one.
+    PREFETCH_CACHE_SIZE = 4
+    # Formatted views kept for units shown again, such as going back and forth between two pages.
+    VIEW_CACHE_SIZE = 32
+    # Pages kept before and after the current one in continuous mode, and the text between two pages.
+    CONTINUOUS_WINDOW = 3
+    CONTINUOUS_SEPARATOR = "\n"
     formatter_options = FormatterOptions()
+    _prefetch_executor: Optional[ThreadPoolExecutor] = None
 
     def __init__(
         self,
@@ -30,20 +48,22 @@ class QuranManager:
         """
         self._font_type = font_type
         self.db_path: Path = font_type.database
-        self._create_engine_and_session()
+        self.corpus = QuranCorpus.get(font_type)
 
         self._navigation_mode: Optional[NavigationMode] = None
         self.current_position: int = 1
         self.max_position: int = 1
         self.navigation_mode = navigation_mode
         self.view_content: Optional[ViewContent] = None
-
-    def _create_engine_and_session(self):
-        """(Recreate SQLAlchemy engine and session for the current DB path."""
-        self.engine = create_engine(f"sqlite:///{self.db_path}", echo=False)
-        QuranBase.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
-        self.session: Session = self.Session()
+        self._prefetched: OrderedDict[tuple, Future] = OrderedDict()
+        self._views: OrderedDict[tuple, Tuple[ViewContent, str]] = OrderedDict()
+        # The pages of the continuous view, (page, view content, text) in order, and where the current page starts in its text.
+        self._window: deque = deque()
+        self.window_anchor = 0
+        self._served_from_prefetch = False
+        self.page_turns = 0
+        self.prefetch_hits = 0
+        self.view_cache_hits = 0
 
     @property
     def font_type(self) -> QuranFontType:
@@ -53,12 +73,12 @@ class QuranManager:
     def font_type(self, value: QuranFontType):
         """
         Change font type (and underlying DB) at runtime.
-        Recreates engine and session automatically.
+        Switches to the corpus of the new font, loaded once per font.
         """
         if value != self._font_type:
             self._font_type = value
             self.db_path    = value.database
-            self._create_engine_and_session()
+            self.corpus     = QuranCorpus.get(value)
 
     @property
     def navigation_mode(self) -> NavigationMode:
@@ -83,6 +103,7 @@ class QuranManager:
             NavigationMode.JUZ:     cls.MAX_JUZ,
             NavigationMode.HIZB:    cls.MAX_HIZB,
             NavigationMode.QUARTER: cls.MAX_QUARTER,
+            NavigationMode.CONTINUOUS: cls.MAX_PAGE,
         }.get(mode, cls.MAX_PAGE)
 
     @lru_cache(maxsize=1)
@@ -90,67 +111,188 @@ class QuranManager:
         """
         Return a list of Surah objects.
         """
-        rows = (
-            self.session.query(
-                Quran.sura_number,
-                func.replace(Quran.sura_name, "سورة ", "").label("sura_name"),
-                func.count(Quran.number).label("ayah_count"),
-                func.min(Quran.number).label("first_ayah_number"),
-                func.max(Quran.number).label("last_ayah_number")
-            )
-            .group_by(Quran.sura_number)
-            .order_by(Quran.sura_number)
-            .all()
-        )
-        return [Surah(number=row.sura_number, name=row.sura_name, ayah_count=row.ayah_count, first_ayah_number=row.first_ayah_number, last_ayah_number=row.last_ayah_number) for row in rows]
-
-    def get_ayahs(self, col: Column, pos: int) -> List[Ayah]:
+        return self.corpus.surahs()
+
+    def get_ayahs(self, mode: NavigationMode, pos: int) -> List[Ayah]:
         """
-        Fetch Ayahs by a given column and value.
+        Return the Ayahs of a unit of the given mode, a slice of the corpus.
         Helper for page/surah/juz/hizb/quarter getters.
         """
-        rows = (
-            self.session.query(Quran)
-            .filter(col == pos)
-            .order_by(Quran.number)
-            .all()
-        )
-        return [self._row_to_ayah(r) for r in rows]
+        return self.corpus.ayahs(*self.corpus.unit_rows(mode, pos))
 
     def get_view_content(self, number: int, mode: NavigationMode, label: str, ayahs: List[Ayah]) -> str:
         self.view_content = ViewContent(number=number, label=label, mode=mode)
         formatter = QuranFormatter(self.view_content, self.formatter_options)
         return formatter.format_view(ayahs)
 
+    def _view_key(self, mode: NavigationMode, number: int) -> tuple:
+        return mode, number, self._font_type, self.formatter_options.cache_key
+
+    def clear_view_cache(self) -> None:
+        """Drop the formatted and prefetched views, once the font or the formatter options changed."""
+        for future in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
+        self._views.clear()
+        logger.debug("View cache cleared.")
+
+    def _cache_view(self, key: tuple, view: Tuple[ViewContent, str]) -> None:
+        self._views[key] = view
+        if len(self._views) > self.VIEW_CACHE_SIZE:
+            self._views.popitem(last=False)
+
+    def _build_view(self, corpus: QuranCorpus, mode: NavigationMode, number: int, options: FormatterOptions) -> Tuple[ViewContent, str]:
+        """Fetch and format a unit into a new ViewContent, without touching the current view. Runs on the prefetch thread too."""
+        view_content = ViewContent(number=number, label=self.UNIT_LABELS[mode], mode=mode)
+        text = QuranFormatter(view_content, options).format_view(corpus.ayahs(*corpus.unit_rows(mode, number)))
+        return view_content, text
+
+    @classmethod
+    def _get_prefetch_executor(cls) -> ThreadPoolExecutor:
+        if cls._prefetch_executor is None:
+            cls._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="QuranPrefetch")
+        return cls._prefetch_executor
+
+    def _prefetch_neighbours(self, mode: NavigationMode, number: int) -> None:
+        """Format the previous and next units on the prefetch thread, keeping at most PREFETCH_CACHE_SIZE of them."""
+        options = self.formatter_options.model_copy()
+        for neighbour in (number + 1, number - 1):
+            if not 1 <= neighbour <= self.max_position:
+                continue
+            key = self._view_key(mode, neighbour)
+            if key in self._views:
+                continue
+            if key in self._prefetched:
+                self._prefetched.move_to_end(key)
+                continue
+            self._prefetched[key] = self._get_prefetch_executor().submit(self._build_view, self.corpus, mode, neighbour, options)
+            if len(self._prefetched) > self.PREFETCH_CACHE_SIZE:
+                _, evicted = self._prefetched.popitem(last=False)
+                evicted.cancel()
+
+    def _get_view(self, mode: NavigationMode, number: int) -> Tuple[ViewContent, str]:
+        """
+        Return the formatted view of a unit, taken from the formatted views if it was shown recently,
+        or from the prefetched views, before formatting it.
+        """
+        key = self._view_key(mode, number)
+        view = self._views.get(key)
+        self._served_from_prefetch = False
+        if view is not None:
+            self._views.move_to_end(key)
+            self.view_cache_hits += 1
+            return view
+
+        future = self._prefetched.pop(key, None)
+        if future is not None and not future.cancelled():
+            try:
+                view = future.result()
+                self._served_from_prefetch = True
+            except Exception as e:
+                logger.error(f"Prefetching {mode} {number} failed: {e}", exc_info=True)
+        if view is None:
+            view = self._build_view(self.corpus, mode, number, self.formatter_options)
+        self._cache_view(key, view)
+        return view
+
+    def get_unit(self, mode: NavigationMode, number: int) -> str:
+        """Show a page, surah, juz, hizb or quarter and prefetch its neighbours."""
+        self.navigation_mode = mode
+        self.view_content, text = self._get_view(mode, number)
+        self._prefetch_neighbours(mode, number)
+        return text
+
     def get_page(self, page_number: int) -> str:
         """Fetch all Ayahs on a given page."""
-        self.navigation_mode = NavigationMode.PAGE
-        ayahs = self.get_ayahs(Quran.page, page_number)
-        return self.get_view_content(number=page_number, label="صفحة", mode=NavigationMode.PAGE, ayahs=ayahs)
+        return self.get_unit(NavigationMode.PAGE, page_number)
 
     def get_surah(self, surah_number: int) -> str:
         """Fetch all Ayahs in a given surah."""
-        self.navigation_mode = NavigationMode.SURAH
-        ayahs = self.get_ayahs(Quran.sura_number, surah_number)
-        return self.get_view_content(number=surah_number, label="سورة", mode=NavigationMode.SURAH, ayahs=ayahs)
+        return self.get_unit(NavigationMode.SURAH, surah_number)
 
     def get_juz(self, juz_number: int) -> str:
         """Fetch all Ayahs in a given juz."""
-        self.navigation_mode = NavigationMode.JUZ
-        ayahs = self.get_ayahs(Quran.juz, juz_number)   
-        return self.get_view_content(number=juz_number, label="جزء", mode=NavigationMode.JUZ, ayahs=ayahs)
+        return self.get_unit(NavigationMode.JUZ, juz_number)
 
     def get_hizb(self, hizb_number: int) -> str:
         """Fetch all Ayahs in a given hizb."""
-        self.navigation_mode = NavigationMode.HIZB
-        ayahs = self.get_ayahs(Quran.hizb, hizb_number)
-        return self.get_view_content(number=hizb_number, label="حزب", mode=NavigationMode.HIZB, ayahs=ayahs)
+        return self.get_unit(NavigationMode.HIZB, hizb_number)
 
     def get_quarter(self, quarter_number: int) -> str:
         """Fetch all Ayahs in a given hizbQuarter."""
-        self.navigation_mode = NavigationMode.QUARTER
-        ayahs = self.get_ayahs(Quran.hizbQuarter, quarter_number)
-        return self.get_view_content(number=quarter_number, label="ربع", mode=NavigationMode.QUARTER, ayahs=ayahs)
+        return self.get_unit(NavigationMode.QUARTER, quarter_number)
+
+    def _window_bounds(self, page: int) -> Tuple[int, int]:
+        """Return the first and last pages of the continuous window around a page, the same number of pages near both ends of the mushaf."""
+        size = 2 * self.CONTINUOUS_WINDOW
+        first = max(1, min(page - self.CONTINUOUS_WINDOW, self.MAX_PAGE - size))
+        return first, min(self.MAX_PAGE, first + size)
+
+    def _window_segment(self, page: int) -> Tuple[int, ViewContent, str]:
+        view_content, text = self._get_view(NavigationMode.PAGE, page)
+        # The pages are joined by CONTINUOUS_SEPARATOR, the closing "|" of auto page turn has no use between them.
+        return page, view_content, text.rstrip("|").rstrip()
+
+    def _set_window_view(self, page: int) -> None:
+        """Build the view content of the continuous window, the ayahs of each page shifted to where the page starts in the window text."""
+        view_content = ViewContent(number=page, label=self.UNIT_LABELS[NavigationMode.PAGE], mode=NavigationMode.CONTINUOUS)
+        texts = []
+        offset = 0
+        for segment_page, segment_view, text in self._window:
+            if segment_page == page:
+                self.window_anchor = offset
+            view_content.insert_bulk([ayah.shifted(offset) for ayah in segment_view.ayahs])
+            texts.append(text)
+            offset += len(text) + len(self.CONTINUOUS_SEPARATOR)
+        view_content.text = self.CONTINUOUS_SEPARATOR.join(texts)
+        self.view_content = view_content
+        self.current_position = page
+        first, last = self._window[0][0], self._window[-1][0]
+        self._prefetch_neighbours(NavigationMode.PAGE, first)
+        self._prefetch_neighbours(NavigationMode.PAGE, last)
+
+    def get_continuous(self, page: int) -> str:
+        """
+        Show the mushaf as one continuous text: a window of pages around the given one.
+        follow_continuous moves the window as the reader moves, so the text never holds more than 2 * CONTINUOUS_WINDOW + 1 pages.
+        """
+        self.navigation_mode = NavigationMode.CONTINUOUS
+        first, last = self._window_bounds(page)
+        self._window = deque(self._window_segment(window_page) for window_page in range(first, last + 1))
+        self._set_window_view(page)
+        return self.view_content.text
+
+    def follow_continuous(self, page: int) -> List[WindowEdit]:
+        """
+        Center the continuous window on the page the reader reached.
+        Returns the edits that turn the text of the previous window into the new one, in order, so the view only
+        appends and removes the pages at its ends instead of loading the whole text again.
+        """
+        first, last = self._window[0][0], self._window[-1][0]
+        new_first, new_last = self._window_bounds(page)
+        separator = self.CONTINUOUS_SEPARATOR
+        edits = []
+        while last < new_last:
+            last += 1
+            segment = self._window_segment(last)
+            self._window.append(segment)
+            edits.append(WindowEdit(at_end=True, removed=0, inserted=separator + segment[2]))
+        while first < new_first:
+            first += 1
+            segment = self._window.popleft()
+            edits.append(WindowEdit(at_end=False, removed=len(segment[2]) + len(separator), inserted=""))
+        while first > new_first:
+            first -= 1
+            segment = self._window_segment(first)
+            self._window.appendleft(segment)
+            edits.append(WindowEdit(at_end=False, removed=0, inserted=segment[2] + separator))
+        while last > new_last:
+            last -= 1
+            segment = self._window.pop()
+            edits.append(WindowEdit(at_end=True, removed=len(segment[2]) + len(separator), inserted=""))
+        self._set_window_view(page)
+        logger.debug(f"Continuous window moved to pages {new_first} to {new_last} with {len(edits)} edits.")
+        return edits
 
     def get_current_content(self) -> str:
         """Fetch Ayahs for the current position and mode."""
@@ -164,20 +306,31 @@ class QuranManager:
             NavigationMode.JUZ:     self.get_juz,
             NavigationMode.HIZB:    self.get_hizb,
             NavigationMode.QUARTER: self.get_quarter,
+            NavigationMode.CONTINUOUS: self.get_continuous,
         }
         return dispatch.get(mode, self.get_page)(pos)
 
+    def _count_turn(self) -> None:
+        self.page_turns += 1
+        if self._served_from_prefetch:
+            self.prefetch_hits += 1
+        logger.debug(f"Page turns served from prefetch: {self.prefetch_hits} of {self.page_turns}.")
+
     def next(self) -> str:
         """Advance to the next unit (page/surah/etc.) and return its Ayahs."""
         if self.current_position < self.max_position:
             self.current_position += 1
-        return self.get_current_content()
+        text = self.get_current_content()
+        self._count_turn()
+        return text
 
     def back(self) -> str:
         """Go back to the previous unit and return its Ayahs."""
         if self.current_position > 1:
             self.current_position -= 1
-        return self.get_current_content()
+        text = self.get_current_content()
+        self._count_turn()
+        return text
 
     def go_to(self, position: int) -> str:
         """
@@ -198,51 +351,25 @@ class QuranManager:
         from_ayah:  Optional[int] = None,
         to_surah:   Optional[int] = None,
         to_ayah:    Optional[int] = None
-    ) -> List[Ayah]:
+    ) -> str:
         """
         Fetch Ayahs between two points:
           - (from_surah, from_ayah) up to (to_surah, to_ayah)
         If one end is omitted, it defaults to start=1 or end=last Ayah.
         """
         self.navigation_mode = NavigationMode.CUSTOM_RANGE
-        # Determine global numbering for start
-        start_num = None
-        if from_surah is not None:
-            sura_ayahs = (
-                self.session.query(Quran)
-                .filter(Quran.sura_number == from_surah)
-                .order_by(Quran.number)
-                .all()
-            )
-            if sura_ayahs:
-                idx = max(1, min(len(sura_ayahs), from_ayah or 1)) - 1
-                start_num = sura_ayahs[idx].number
-
-        # Determine global numbering for end
-        end_num = None
-        if to_surah is not None:
-            sura_ayahs = (
-                self.session.query(Quran)
-                .filter(Quran.sura_number == to_surah)
-                .order_by(Quran.number)
-                .all()
-            )
-            if sura_ayahs:
-                idx = max(1, min(len(sura_ayahs), to_ayah or len(sura_ayahs))) - 1
-                end_num = sura_ayahs[idx].number
-
-        # Build final query
-        query = self.session.query(Quran).order_by(Quran.number)
-        if start_num is not None and end_num is not None:
-            if start_num > end_num:
-                start_num, end_num = end_num, start_num
-            query = query.filter(Quran.number.between(start_num, end_num))
-        elif start_num is not None:
-            query = query.filter(Quran.number >= start_num)
+        # The bounds are arithmetic on the surah table, and the range is one slice of the corpus.
+        start_number = self.corpus.ayah_number(from_surah, from_ayah) if from_surah is not None else None
+        end_number = self.corpus.ayah_number(to_surah, to_ayah, last=True) if to_surah is not None else None
+
+        if start_number is not None and end_number is not None:
+            start_number, end_number = min(start_number, end_number), max(start_number, end_number)
+            ayahs = self.corpus.ayahs(start_number - 1, end_number)
+        elif start_number is not None:
+            ayahs = self.corpus.ayahs(start_number - 1, len(self.corpus))
         else:
-            query = query.filter(Quran.number > 1)
+            ayahs = self.corpus.ayahs(1, len(self.corpus))
 
-        ayahs = [self._row_to_ayah(r) for r in query.all()]
         view_content = self.get_view_content(number=None, label="نطاق", mode=self.navigation_mode, ayahs=ayahs)
 
         return view_content
@@ -252,45 +379,11 @@ class QuranManager:
         Given a global ayah_number, find which unit (page/surah/juz/etc.) it belongs to
         and return all Ayahs in that unit.
         """
-        # Map navigation_mode to the corresponding Quran column
-        mode_to_column = {
-            NavigationMode.PAGE:    Quran.page,
-            NavigationMode.SURAH:   Quran.sura_number,
-            NavigationMode.QUARTER: Quran.hizbQuarter,
-            NavigationMode.HIZB:    Quran.hizb,
-            NavigationMode.JUZ:     Quran.juz,
-        }
-        col = mode_to_column.get(self._navigation_mode)
-
-        if col is None:
-            return ""
-
-        # Determine group value (e.g. page number, surah number) that ayah belongs to
-        group_value = (
-            self.session.query(col)
-            .filter(Quran.number == ayah_number)
-            .distinct()
-            .first()
-        )
-        if group_value is None:
+        # The continuous view moves by pages
+        mode = NavigationMode.PAGE if self._navigation_mode == NavigationMode.CONTINUOUS else self._navigation_mode
+        if mode not in QuranCorpus.UNIT_COLUMNS or not 1 <= ayah_number <= len(self.corpus):
             return ""
 
         # Set and return that unit’s Ayahs
-        self.current_position = group_value[0]
+        self.current_position = self.corpus.unit_of(mode, ayah_number)
         return self.get_current_content()
-
-    def _row_to_ayah(self, row) -> Ayah:
-        """Convert a SQLAlchemy Quran row to an Ayah dataclass."""
-        return Ayah(
-            number=row.number,
-            text=row.text,
-            sura_name=row.sura_name,
-            sura_number=row.sura_number,
-            number_in_surah=row.numberInSurah,
-            juz=row.juz,
-            hizb=row.hizb,
-            hizbQuarter=row.hizbQuarter,
-            page=row.page,
-            sajda=row.sajda,
-            sajdaObligation=row.sajdaObligation,
-        )
@@ -2,10 +2,13 @@
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from pathlib import Path
 from utils.const import data_folder
 
+if TYPE_CHECKING:
+    from .corpus import QuranCorpus
+
 
 class NavigationMode(Enum):
     PAGE = 0
@@ -14,6 +17,7 @@ class NavigationMode(Enum):
     HIZB = 3
     JUZ = 4
     CUSTOM_RANGE = 5
+    CONTINUOUS = 6
 
     @staticmethod
     def from_int(value: int) -> "NavigationMode":
@@ -56,18 +60,89 @@ class Surah:
     last_ayah_number: int
 
     
-@dataclass(eq=True)
 class Ayah:
+    """
+    An ayah of a QuranCorpus: a view over its row, with the positions of the ayah in the displayed text.
+    first_position and last_position belong to the view that shows the ayah, so every view gets its own Ayah objects.
+    """
+    __slots__ = ("_corpus", "_row", "first_position", "last_position")
+
+    def __init__(self, corpus: "QuranCorpus", row: int, first_position: Optional[int] = None, last_position: Optional[int] = None):
+        self._corpus = corpus
+        self._row = row
+        self.first_position = first_position
+        self.last_position = last_position
+
+    @property
+    def number(self) -> int:
+        return self._row + 1
+
+    @property
+    def text(self) -> str:
+        return self._corpus.texts[self._row]
+
+    @property
+    def sura_name(self) -> str:
+        return self._corpus.sura_names[self._corpus.sura_number[self._row] - 1]
+
+    @property
+    def sura_number(self) -> int:
+        return self._corpus.sura_number[self._row]
+
+    @property
+    def number_in_surah(self) -> int:
+        return self._corpus.number_in_surah[self._row]
+
+    @property
+    def juz(self) -> int:
+        return self._corpus.juz[self._row]
+
+    @property
+    def hizb(self) -> int:
+        return self._corpus.hizb[self._row]
+
+    @property
+    def hizbQuarter(self) -> int:
+        return self._corpus.hizbQuarter[self._row]
+
+    @property
+    def page(self) -> int:
+        return self._corpus.page[self._row]
+
+    @property
+    def sajda(self) -> bool:
+        return bool(self._corpus.sajda[self._row])
+
+    @property
+    def sajdaObligation(self) -> bool:
+        return bool(self._corpus.sajdaObligation[self._row])
+
+    def shifted(self, offset: int) -> "Ayah":
+        """Return the same ayah with its positions moved by offset, for a view that shows it further in its text."""
+        return Ayah(self._corpus, self._row, self.first_position + offset, self.last_position + offset)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Ayah):
+            return NotImplemented
+        return (self._corpus, self._row, self.first_position, self.last_position) == (other._corpus, other._row, other.first_position, other.last_position)
+
+    def __repr__(self) -> str:
+        return f"Ayah(number={self.number}, sura_number={self.sura_number}, number_in_surah={self.number_in_surah}, first_position={self.first_position}, last_position={self.last_position})"
+
+
+@dataclass(frozen=True)
+class UnitBounds:
+    """The boundaries of a page, surah, juz, hizb or quarter: its first and last ayahs, its ayah count and the names of its surahs."""
     number: int
-    text: str
-    sura_name: str
-    sura_number: int
-    number_in_surah: int
-    juz: int
-    hizb: int
-    hizbQuarter: int
-    page: int
-    sajda: bool
-    sajdaObligation: bool
-    first_position: Optional[int] = None
-    last_position: Optional[int] = None
+    first_ayah: Ayah
+    last_ayah: Ayah
+    ayah_count: int
+    surah_names: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class WindowEdit:
+    """A change of the continuous view text: remove the last (at_end) or first characters, then insert the text at the same end."""
+    at_end: bool
+    removed: int
+    inserted: str
@@ -1,25 +1,30 @@
 # -*- coding: utf-8 -*-
 
-from typing import Optional, Dict
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker, Session
-from .models import AyahMapBase, AyahViewMap
+from bisect import bisect_right
+from typing import Optional, Dict, List, Tuple
 from .types import Ayah, NavigationMode
 from utils.logger import LoggerManager
 
 logger = LoggerManager.get_logger(__name__)
 
 class ViewContent:
-    def __init__(self, number: int, label: str, mode: NavigationMode, db_url: str = "sqlite:///:memory:"):
+    """
+    The ayahs of the displayed text and their positions in it.
+
+    The ayahs are kept sorted by first_position next to a parallel list of the first positions,
+    so mapping a cursor position to its ayah is a bisect, and the ayah numbers are looked up in dicts.
+    """
+
+    def __init__(self, number: int, label: str, mode: NavigationMode):
         logger.debug(f"Initializing ViewContent with number: {number}, label: {label}, mode: {mode}")
         self.number = number
         self.label = label
         self.mode = mode
         self.text = ""
-        self.engine = create_engine(db_url, echo=False)
-        self.Session = sessionmaker(bind=self.engine)
-        self.session: Session = self.Session()
-        AyahMapBase.metadata.create_all(self.engine)
+        self._ayahs: List[Ayah] = []
+        self._first_positions: List[int] = []
+        self._by_number: Dict[int, Ayah] = {}
+        self._by_number_in_surah: Dict[Tuple[int, int], Ayah] = {}
         logger.debug(f"Initialized ViewContent with number: {number}, label: {label}, mode: {mode}")
 
     @property
@@ -35,136 +40,64 @@ class ViewContent:
         
     @property
     def start_ayah(self) -> Optional[Ayah]:
-        ayah_row = (
-            self.session.query(AyahViewMap)
-            .order_by(AyahViewMap.first_position.asc())
-            .first()
-        )
-        return self._row_to_ayah(ayah_row) if ayah_row else None
+        return self._ayahs[0] if self._ayahs else None
 
     @property
     def end_ayah(self) -> Optional[Ayah]:
-        ayah_row = (
-            self.session.query(AyahViewMap)
-            .order_by(AyahViewMap.first_position.desc())
-            .first()
-        )
-        return self._row_to_ayah(ayah_row) if ayah_row else None
+        return self._ayahs[-1] if self._ayahs else None
+
+    @property
+    def ayahs(self) -> List[Ayah]:
+        """The ayahs of the view in text order, not to be modified."""
+        return self._ayahs
+
+    def _index(self, ayah: Ayah) -> None:
+        self._by_number.setdefault(ayah.number, ayah)
+        self._by_number_in_surah.setdefault((ayah.sura_number, ayah.number_in_surah), ayah)
 
     def insert(self, ayah: Ayah):
-        ayah_row = AyahViewMap(
-            number=ayah.number,
-            text=ayah.text,
-            sura_name=ayah.sura_name,
-            sura_number=ayah.sura_number,
-            number_in_surah=ayah.number_in_surah,
-            juz=ayah.juz,
-            hizb=ayah.hizb,
-            hizbQuarter=ayah.hizbQuarter,
-            page=ayah.page,
-            first_position=ayah.first_position,
-            last_position=ayah.last_position,
-            sajda=ayah.sajda,
-            sajdaObligation=ayah.sajdaObligation,
-        )
-        self.session.add(ayah_row)
-        self.session.commit()
+        index = bisect_right(self._first_positions, ayah.first_position)
+        self._first_positions.insert(index, ayah.first_position)
+        self._ayahs.insert(index, ayah)
+        self._index(ayah)
 
     def insert_bulk(self, ayahs: list[Ayah]):
-        ayah_rows = [
-            AyahViewMap(
-                number=ayah.number,
-                text=ayah.text,
-                sura_name=ayah.sura_name,
-                sura_number=ayah.sura_number,
-                number_in_surah=ayah.number_in_surah,
-                juz=ayah.juz,
-                hizb=ayah.hizb,
-                hizbQuarter=ayah.hizbQuarter,
-                page=ayah.page,
-                first_position=ayah.first_position,
-                last_position=ayah.last_position,
-                sajda=ayah.sajda,
-                sajdaObligation=ayah.sajdaObligation,
-            )
-            for ayah in ayahs
-        ]
-        self.session.bulk_save_objects(ayah_rows)
-        self.session.commit()
+        if not ayahs:
+            return
+        if self._ayahs and ayahs[0].first_position < self._first_positions[-1] or any(
+            previous.first_position > ayah.first_position for previous, ayah in zip(ayahs, ayahs[1:])
+        ):
+            for ayah in ayahs:
+                self.insert(ayah)
+            return
+        # The formatter hands the ayahs in text order, so they are appended as they are.
+        self._ayahs.extend(ayahs)
+        self._first_positions.extend(ayah.first_position for ayah in ayahs)
+        for ayah in ayahs:
+            self._index(ayah)
 
     def get_by_position(self, position: int) -> Optional[Ayah]:
-        ayah_row = (
-            self.session.query(AyahViewMap)
-            .filter(AyahViewMap.first_position <= position, AyahViewMap.last_position >= position)
-            .first()
-        )
-        ayah = self._row_to_ayah(ayah_row) if ayah_row else None
-        return ayah or self.get_by_position(position - 1)
+        """Return the ayah at the text position, or the last ayah before it when the position falls between two ayahs."""
+        index = bisect_right(self._first_positions, position) - 1
+        return self._ayahs[index] if index >= 0 else None
 
     def get_by_ayah_number(self, ayah_number: int) -> Optional[Ayah]:
         logger.debug(f"Fetching Ayah by number: {ayah_number}")
-        ayah_row = (
-            self.session.query(AyahViewMap)
-            .filter(
-                AyahViewMap.number== ayah_number
-            )
-            .first()
-        )
-        return self._row_to_ayah(ayah_row) if ayah_row else self.start_ayah
+        return self._by_number.get(ayah_number) or self.start_ayah
 
     def get_by_ayah_number_in_surah(self, ayah_number_in_surah: int, surah_number: int) -> Optional[Ayah]:
-        ayah_row = (
-            self.session.query(AyahViewMap)
-            .filter(
-                AyahViewMap.number_in_surah == ayah_number_in_surah,
-                AyahViewMap.sura_number == surah_number
-            )
-            .first()
-        )
-        return self._row_to_ayah(ayah_row) if ayah_row else None
+        return self._by_number_in_surah.get((surah_number, ayah_number_in_surah))
 
     def get_ayah_range(self) -> Dict[int, Dict[str, int]]:
         result = {}
-        rows = (
-            self.session.query(
-                AyahViewMap.sura_number,
-                AyahViewMap.sura_name,
-                func.min(AyahViewMap.number_in_surah).label("min_ayah"),
-                func.max(AyahViewMap.number_in_surah).label("max_ayah"),
-            )
-            .group_by(AyahViewMap.sura_number)
-            .order_by(AyahViewMap.sura_number)
-            .all()
-        )
-        for row in rows:
-            result[row.sura_number] = {"surah_name": row.sura_name, "min_ayah": row.min_ayah, "max_ayah": row.max_ayah}
-        return result
-
-    def _row_to_ayah(self, row) -> Ayah:
-        return Ayah(
-            number=row.number,
-            text=row.text,
-            sura_name=row.sura_name,
-            sura_number=row.sura_number,
-            number_in_surah=row.number_in_surah,
-            juz=row.juz,
-            hizb=row.hizb,
-            hizbQuarter=row.hizbQuarter,
-            page=row.page,
-            sajda=row.sajda,
-            sajdaObligation=row.sajdaObligation,
-            last_position=row.last_position,
-            first_position=row.first_position,
-        )
+        for ayah in self._ayahs:
+            surah = result.get(ayah.sura_number)
+            if surah is None:
+                result[ayah.sura_number] = {"surah_name": ayah.sura_name, "min_ayah": ayah.number_in_surah, "max_ayah": ayah.number_in_surah}
+            else:
+                surah["min_ayah"] = min(surah["min_ayah"], ayah.number_in_surah)
+                surah["max_ayah"] = max(surah["max_ayah"], ayah.number_in_surah)
+        return dict(sorted(result.items()))
 
     def __repr__(self) -> str:
         return f"ViewContent(number={self.number}, label={self.label}, mode={self.mode})"
-    
-    def __del__(self):
-        """Close the session and dispose of the engine when the object is deleted."""
-        if self.session:
-            self.session.close()
-        if self.engine:
-            self.engine.dispose()
-        logger.debug(f"ViewContent {self.label} closed.")
-    
\ No newline at end of file
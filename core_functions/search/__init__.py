@@ -0,0 +1,7 @@
+from .types import SearchCriteria, SearchEngine, SearchMode
+from .search_manager import QuranSearchManager
+from .results import SearchResultCursor
+from .cache import SearchResultCache
+from .corpus import CorpusSearchManager, CorpusSearchResult
+from .regex_search import RegexSearchEngine
+from .highlight import HitHighlighter, TextFinder
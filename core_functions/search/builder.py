@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+import argparse
+from contextlib import closing
+from exceptions.database import DBNotFoundError
+from .fts import FTSSearchEngine
+from .morphology import MORPHOLOGY_TABLE, analyze
+from .normalizer import NormalizationVariant, normalize
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+
+class SearchDatabaseBuilder:
+    """
+    Precompute the search artifacts stored in Verses.DB, so the application never normalizes the Quran text at query time.
+
+    Run from the program folder:
+        python -m core_functions.search.builder
+    """
+
+    def __init__(self, db_path: str = os.path.join("database", "quran", "Verses.DB")):
+        if not os.path.isfile(db_path):
+            logger.error(f"Database file not found: {db_path}")
+            raise DBNotFoundError(db_path)
+        self.db_path = db_path
+
+    def build(self) -> None:
+        """Build every search artifact."""
+        logger.info(f"Building search artifacts in {self.db_path}...")
+        self.build_normalized_columns()
+        self.build_fts()
+        self.build_morphology()
+        logger.info("Search artifacts built successfully.")
+
+    def build_normalized_columns(self) -> None:
+        """Store the text normalized with every NormalizationVariant in its own column."""
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(quran);")}
+            rows = conn.execute("SELECT number, text FROM quran ORDER BY number;").fetchall()
+
+            for variant in NormalizationVariant:
+                if variant == NormalizationVariant.ORIGINAL:
+                    continue
+                if variant.column not in existing_columns:
+                    logger.debug(f"Adding column '{variant.column}'.")
+                    conn.execute(f"ALTER TABLE quran ADD COLUMN {variant.column} TEXT;")
+                conn.executemany(
+                    f"UPDATE quran SET {variant.column} = ? WHERE number = ?;",
+                    ((normalize(text, variant), number) for number, text in rows)
+                )
+                logger.debug(f"Column '{variant.column}' filled for {len(rows)} ayahs.")
+
+    def build_fts(self) -> None:
+        """(Re)create the FTS5 table over the normalized columns. Requires build_normalized_columns to have run."""
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute(f"DROP TABLE IF EXISTS {FTSSearchEngine.TABLE_NAME};")
+            conn.execute(FTSSearchEngine.create_table_query())
+            conn.execute(f"INSERT INTO {FTSSearchEngine.TABLE_NAME}({FTSSearchEngine.TABLE_NAME}) VALUES ('rebuild');")
+            conn.execute(f"INSERT INTO {FTSSearchEngine.TABLE_NAME}({FTSSearchEngine.TABLE_NAME}) VALUES ('optimize');")
+        logger.debug(f"FTS5 table '{FTSSearchEngine.TABLE_NAME}' built.")
+
+    def build_morphology(self) -> None:
+        """
+        Store the stem and root of every distinct word of the fully normalized text.
+        Word occurrences are resolved through the inverted index, so one row per word form is enough.
+        """
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            words = set()
+            for (text,) in conn.execute("SELECT text FROM quran;"):
+                words.update(normalize(text, NormalizationVariant.FULL).split())
+
+            conn.execute(f"DROP TABLE IF EXISTS {MORPHOLOGY_TABLE};")
+            conn.execute(f"CREATE TABLE {MORPHOLOGY_TABLE} (word TEXT PRIMARY KEY, stem TEXT NOT NULL, root TEXT NOT NULL) WITHOUT ROWID;")
+            conn.executemany(
+                f"INSERT INTO {MORPHOLOGY_TABLE} (word, stem, root) VALUES (?, ?, ?);",
+                ((word, *analyze(word)) for word in sorted(words))
+            )
+            conn.execute(f"CREATE INDEX idx_{MORPHOLOGY_TABLE}_stem ON {MORPHOLOGY_TABLE} (stem);")
+            conn.execute(f"CREATE INDEX idx_{MORPHOLOGY_TABLE}_root ON {MORPHOLOGY_TABLE} (root);")
+        logger.debug(f"Morphology table '{MORPHOLOGY_TABLE}' built with {len(words)} words.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the search artifacts of the Quran database.")
+    parser.add_argument("--db", default=os.path.join("database", "quran", "Verses.DB"), help="Path to Verses.DB.")
+    args = parser.parse_args()
+    SearchDatabaseBuilder(args.db).build()
+
+
+if __name__ == "__main__":
+    main()
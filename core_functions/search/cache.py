@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+
+class SearchResultCache:
+    """
+    Bounded LRU cache of search results.
+
+    Keys are built by QuranSearchManager from the database, the parsed query and every search option,
+    and values are the matching ayah numbers packed in an array("H"), so a cached result costs two bytes per ayah.
+    The cache clears itself when the database file changes on disk, and clear() is called when the font type changes.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[Hashable, array] = OrderedDict()
+        self._db_signatures = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _db_signature(db_path: str) -> Tuple[float, int]:
+        stat = os.stat(db_path)
+        return stat.st_mtime, stat.st_size
+
+    def _check_db(self, db_path: str) -> None:
+        signature = self._db_signature(db_path)
+        if self._db_signatures.get(db_path, signature) != signature:
+            logger.info(f"Database {db_path} changed on disk, clearing the search result cache.")
+            self._results.clear()
+        self._db_signatures[db_path] = signature
+
+    def get(self, db_path: str, key: Hashable) -> Optional[array]:
+        """Return the cached ayah numbers of a key, or None on a miss."""
+        with self._lock:
+            self._check_db(db_path)
+            numbers = self._results.get((db_path, key))
+            if numbers is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end((db_path, key))
+            self.hits += 1
+            logger.debug(f"Search result cache hit ({self.hits} hits, {self.misses} misses).")
+            return numbers
+
+    def put(self, db_path: str, key: Hashable, numbers) -> array:
+        """Cache the ayah numbers of a key and return them as stored."""
+        numbers = array("H", numbers)
+        with self._lock:
+            self._results[(db_path, key)] = numbers
+            self._results.move_to_end((db_path, key))
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return numbers
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._db_signatures.clear()
+        logger.debug("Search result cache cleared.")
+
+    def info(self) -> dict:
+        """Return the hit and miss counters and the current size, like functools.lru_cache's cache_info."""
+        return {"hits": self.hits, "misses": self.misses, "maxsize": self.maxsize, "size": len(self._results)}
+
+    def __len__(self) -> int:
+        return len(self._results)
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+"""
+Search the texts that accompany the Quran: the tafaseer, asbab al-nuzul (tanzil.db) and i'rab (e3rab.db).
+
+Every corpus keys its rows by the global ayah number, so a corpus is indexed like the Quran itself:
+one entry per ayah, tokenized into an inverted index, and searched with the same query plans (see query.py).
+Each corpus is searched in its own worker process at the same time. A worker builds the index of a corpus
+on its first query and keeps it, so the hundreds of tables behind the corpora are read once per session,
+and the results of the corpora are merged and streamed back grouped by ayah as each one finishes.
+"""
+
+import os
+import sqlite3
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from core_functions.tafaseer import Category
+from exceptions.database import InvalidSearchTextError
+from .index import InvertedIndex
+from .normalizer import NormalizationVariant, normalize
+from .query import QueryNode, QueryParser
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+SURAH_COUNT = 114
+# Punctuation and brackets glued to the words of the commentaries, stripped before indexing.
+PUNCTUATION = ".,:;!?()[]{}<>«»\"'-_*/\\…،؛؟"
+
+
+@dataclass(frozen=True)
+class Corpus:
+    """A database of texts keyed by the global ayah number, spread over one or more tables with text and number columns."""
+    name: str
+    arabic_name: str
+    db_path: str
+    tables: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CorpusMatch:
+    corpus: str
+    arabic_name: str
+    number: int
+    snippet: str
+
+
+@dataclass
+class CorpusSearchResult:
+    """The matches of a cross-corpus search, merged as the corpora finish and grouped by ayah number."""
+    corpora: List[str]
+    completed: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    by_ayah: Dict[int, List[CorpusMatch]] = field(default_factory=dict)
+
+    def snapshot(self) -> "CorpusSearchResult":
+        """Return a copy that later updates of the search do not change, to hand over to another thread."""
+        return CorpusSearchResult(list(self.corpora), list(self.completed), list(self.failed), dict(self.by_ayah))
+
+    def add(self, corpus: str, matches: List[CorpusMatch]) -> None:
+        for match in matches:
+            self.by_ayah.setdefault(match.number, []).append(match)
+        self.by_ayah = dict(sorted(self.by_ayah.items()))
+        self.completed.append(corpus)
+
+    @property
+    def is_complete(self) -> bool:
+        return len(self.completed) + len(self.failed) == len(self.corpora)
+
+    @property
+    def total(self) -> int:
+        return sum(len(matches) for matches in self.by_ayah.values())
+
+    def __len__(self) -> int:
+        return len(self.by_ayah)
+
+
+class CorpusIndex(InvertedIndex):
+    """
+    Inverted index of one corpus. Commentaries are much longer than ayahs, so postings keep 16 bits for the word offset;
+    words past the 65536th of an entry are not indexed.
+    """
+    POSITION_BITS = 16
+    POSITION_MASK = (1 << POSITION_BITS) - 1
+    SNIPPET_WORDS_BEFORE = 5
+    SNIPPET_WORDS_AFTER = 15
+
+    def __init__(self, postings: Dict[str, array], numbers: List[int], texts: Dict[int, str]):
+        super().__init__(postings)
+        self.numbers = numbers
+        self.texts = texts
+
+    @classmethod
+    def load(cls, corpus: Corpus, variant: NormalizationVariant) -> "CorpusIndex":
+        """Read every table of the corpus in ayah number order and index the words of each entry, normalized with the variant."""
+        postings: Dict[str, array] = {}
+        texts: Dict[int, str] = {}
+        with closing(sqlite3.connect(f"file:{corpus.db_path}?mode=ro", uri=True)) as conn:
+            for table in corpus.tables:
+                for number, text in conn.execute(f"SELECT number, text FROM {table} ORDER BY number;"):
+                    if not text:
+                        continue
+                    texts[number] = text
+                    for offset, word in enumerate(text.split()[:cls.POSITION_MASK + 1]):
+                        token = normalize(word.strip(PUNCTUATION), variant)
+                        if not token:
+                            continue
+                        posting_list = postings.get(token)
+                        if posting_list is None:
+                            posting_list = postings[token] = array("Q")
+                        posting_list.append(number << cls.POSITION_BITS | offset)
+        logger.info(f"Indexed {len(texts)} entries and {len(postings)} tokens of {corpus.name}.")
+        return cls(postings, sorted(texts), texts)
+
+    @classmethod
+    def split_posting(cls, posting: int) -> Tuple[int, int]:
+        return posting >> cls.POSITION_BITS, posting & cls.POSITION_MASK
+
+    @classmethod
+    def numbers_of(cls, postings: List[int]) -> List[int]:
+        numbers = []
+        for posting in postings:
+            number = posting >> cls.POSITION_BITS
+            if not numbers or numbers[-1] != number:
+                numbers.append(number)
+        return numbers
+
+    def find(self, query: QueryNode, match_whole_word: bool = False, number_range: Optional[Tuple[int, int]] = None) -> List[Tuple[int, str]]:
+        """
+        Return the (ayah number, snippet) of the entries matching the query, the snippet around the first matched word.
+        number_range limits the search to the entries of a (first, last) interval of ayah numbers.
+        """
+        numbers = query.evaluate(self, self.numbers, match_whole_word)
+        if number_range is not None:
+            numbers = numbers[bisect_left(numbers, number_range[0]):bisect_right(numbers, number_range[1])]
+        first_offsets: Dict[int, int] = {}
+        for term in query.terms():
+            for posting in term.postings(self, match_whole_word):
+                number, offset = self.split_posting(posting)
+                if offset < first_offsets.get(number, offset + 1):
+                    first_offsets[number] = offset
+        return [(number, self.snippet(number, first_offsets.get(number, 0))) for number in numbers]
+
+    def snippet(self, number: int, offset: int) -> str:
+        words = self.texts[number].split()
+        start = max(0, offset - self.SNIPPET_WORDS_BEFORE)
+        snippet = " ".join(words[start:offset + self.SNIPPET_WORDS_AFTER])
+        return ("..." if start > 0 else "") + snippet + ("..." if offset + self.SNIPPET_WORDS_AFTER < len(words) else "")
+
+
+# Indexes built by this worker process, kept between queries. Every worker serves a single corpus, one entry per variant.
+_worker_indexes: Dict[Tuple[Corpus, NormalizationVariant], CorpusIndex] = {}
+
+
+def _search_corpus(
+    corpus: Corpus,
+    query: QueryNode,
+    variant: NormalizationVariant,
+    match_whole_word: bool,
+    number_range: Optional[Tuple[int, int]]
+) -> List[CorpusMatch]:
+    """Run in a worker process: search one corpus, building its index on first use."""
+    index = _worker_indexes.get((corpus, variant))
+    if index is None:
+        index = _worker_indexes[(corpus, variant)] = CorpusIndex.load(corpus, variant)
+    return [CorpusMatch(corpus.name, corpus.arabic_name, number, snippet) for number, snippet in index.find(query, match_whole_word, number_range)]
+
+
+def _find_db_file(directory: str, name: str) -> Optional[str]:
+    """Return the path of name.db in directory whatever the case of its extension, or None if it is missing."""
+    if not os.path.isdir(directory):
+        return None
+    for file_name in os.listdir(directory):
+        base, extension = os.path.splitext(file_name)
+        if base.lower() == name.lower() and extension.lower() == ".db":
+            return os.path.abspath(os.path.join(directory, file_name))
+    return None
+
+
+def _surah_tables(prefix: str) -> Tuple[str, ...]:
+    return tuple(f"{prefix}_{surah_number}" for surah_number in range(1, SURAH_COUNT + 1))
+
+
+def available_corpora() -> List[Corpus]:
+    """Return the corpora whose database is installed, the tafaseer first."""
+    corpora = []
+
+    for arabic_name in Category.get_categories_in_arabic():
+        category = Category.get_category_by_arabic_name(arabic_name)
+        db_path = _find_db_file(os.path.join("database", "tafaseer"), category)
+        if db_path is not None:
+            corpora.append(Corpus(f"tafsir_{category}", f"تفسير {arabic_name}", db_path, _surah_tables("tafsir")))
+
+    db_path = _find_db_file(os.path.join("database", "other"), "tanzil")
+    if db_path is not None:
+        corpora.append(Corpus("tanzil", "أسباب النزول", db_path, ("tanzil",)))
+    db_path = _find_db_file(os.path.join("database", "other"), "e3rab")
+    if db_path is not None:
+        corpora.append(Corpus("e3rab", "الإعراب", db_path, _surah_tables("e3rab")))
+
+    logger.debug(f"Available corpora: {[corpus.name for corpus in corpora]}.")
+    return corpora
+
+
+class CorpusSearchManager:
+    """
+    Search several corpora in parallel, one worker process per corpus.
+    Every corpus has its own single-worker executor, started on its first search, so its queries always reach the process
+    that holds its index and each process keeps the index of one corpus only. shutdown() stops them when the application exits.
+    """
+    _executors: Dict[Corpus, ProcessPoolExecutor] = {}
+
+    def __init__(self, corpora: Optional[List[Corpus]] = None):
+        self.corpora = corpora if corpora is not None else available_corpora()
+        self.variant = NormalizationVariant.NO_TASHKIL_NO_HAMZA
+        self.match_whole_word = False
+        self.number_range = None
+
+    def set(
+        self,
+        no_tashkil: bool = True,
+        no_hamza: bool = True,
+        match_whole_word: bool = False,
+        full_normalization: bool = False,
+        number_range: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """
+        Set the search options, with the same meaning as in QuranSearchManager.set.
+        number_range limits the search to the entries of a (first, last) interval of ayah numbers, see QuranSearchManager.number_range.
+        """
+        self.variant = NormalizationVariant.from_options(no_tashkil, no_hamza, full_normalization)
+        self.match_whole_word = match_whole_word
+        self.number_range = number_range
+        logger.info(f"Corpus search parameters set: variant={self.variant}, match_whole_word={self.match_whole_word}, number_range={self.number_range}.")
+
+    @classmethod
+    def _get_executor(cls, corpus: Corpus) -> ProcessPoolExecutor:
+        executor = cls._executors.get(corpus)
+        if executor is None:
+            logger.debug(f"Starting the search worker process of {corpus.name}.")
+            executor = cls._executors[corpus] = ProcessPoolExecutor(max_workers=1)
+        return executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        for executor in cls._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        if cls._executors:
+            logger.debug(f"Stopped {len(cls._executors)} corpus search worker processes.")
+        cls._executors = {}
+
+    def search(self, search_text: str, is_cancelled: Optional[Callable[[], bool]] = None) -> Iterator[CorpusSearchResult]:
+        """
+        Search every corpus for the text (see query.py for the syntax) and yield the merged result
+        each time a corpus finishes, so the caller can show the matches found so far.
+        Stops early, leaving the remaining corpora out, if is_cancelled reports that the search became stale.
+        Raises InvalidQueryError for a malformed query.
+        """
+        if not search_text.strip():
+            raise InvalidSearchTextError(search_text)
+        query = QueryParser.parse(normalize(search_text, self.variant))
+        result = CorpusSearchResult([corpus.name for corpus in self.corpora])
+        if not self.corpora:
+            logger.warning("No corpus database is installed.")
+            yield result
+            return
+
+        futures: Dict[Future, Corpus] = {
+            self._get_executor(corpus).submit(_search_corpus, corpus, query, self.variant, self.match_whole_word, self.number_range): corpus
+            for corpus in self.corpora
+        }
+        logger.debug(f"Searching {len(futures)} corpora for {query!r}.")
+        pending = set(futures)
+        try:
+            while pending:
+                if is_cancelled is not None and is_cancelled():
+                    logger.debug("Corpus search cancelled.")
+                    return
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    corpus = futures[future]
+                    try:
+                        result.add(corpus.name, future.result())
+                    except Exception as e:
+                        logger.error(f"Searching {corpus.name} failed: {e}", exc_info=True)
+                        result.failed.append(corpus.name)
+                        continue
+                    logger.debug(f"{corpus.name} returned {len(result.by_ayah)} ayahs so far.")
+                if done:
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+from typing import List, Optional, Tuple
+from exceptions.database import InvalidQueryError
+from .normalizer import NormalizationVariant, TASHKIL, TATWEEL, SUPERSCRIPT_ALEF
+from .query import QueryNode
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+
+class FTSSearchEngine:
+    """
+    Full-text search over the FTS5 table built by SearchDatabaseBuilder.
+
+    Python's sqlite3 module cannot register custom FTS5 tokenizers, so the folding is done before tokenization:
+    the table indexes one column per NormalizationVariant, the unicode61 tokenizer keeps diacritics inside tokens,
+    and queries are normalized with the same variant and restricted to its column.
+    """
+    TABLE_NAME = "quran_fts"
+    TOKENIZER = f"unicode61 tokenchars '{TASHKIL}{TATWEEL}{SUPERSCRIPT_ALEF}'"
+
+    @classmethod
+    def columns(cls) -> List[str]:
+        return [variant.column for variant in NormalizationVariant]
+
+    @classmethod
+    def create_table_query(cls) -> str:
+        return f"""
+        CREATE VIRTUAL TABLE {cls.TABLE_NAME} USING fts5(
+            {", ".join(cls.columns())},
+            content='quran',
+            content_rowid='number',
+            tokenize="{cls.TOKENIZER}"
+        );
+        """
+
+    @classmethod
+    def is_available(cls, conn: sqlite3.Connection) -> bool:
+        """Return True if the FTS5 table exists in the connected database."""
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (cls.TABLE_NAME,)).fetchone()
+        return row is not None
+
+    @staticmethod
+    def build_match_expression(query: QueryNode, variant: NormalizationVariant, match_whole_word: bool = False) -> str:
+        """
+        Build an FTS5 MATCH expression for a query plan, restricted to the column of the variant.
+        Raises InvalidQueryError if the query cannot be expressed in FTS5 (see supports).
+        """
+        return f"{variant.column} : ({query.to_fts5(match_whole_word)})"
+
+    @classmethod
+    def supports(cls, query: QueryNode, match_whole_word: bool = False) -> bool:
+        """
+        Return True if FTS5 finds exactly the ayahs the index engine finds for the query plan.
+        It does not for words matched as substrings, the default unless match_whole_word is set, since FTS5 has no infix
+        matching and a prefix phrase would miss the words containing the text in their middle, nor for a NOT without a positive side.
+        """
+        try:
+            query.to_fts5(match_whole_word)
+        except InvalidQueryError as e:
+            logger.debug(f"Query not supported by FTS5: {e.reason}")
+            return False
+        return True
+
+    @classmethod
+    def find(
+        cls,
+        conn: sqlite3.Connection,
+        query: QueryNode,
+        variant: NormalizationVariant = NormalizationVariant.ORIGINAL,
+        match_whole_word: bool = False,
+        number_range: Optional[Tuple[int, int]] = None,
+        ranked: bool = False
+    ) -> List[int]:
+        """
+        Return the numbers of the ayahs matching the query plan, optionally limited to a (first, last) ayah number range.
+        The range constrains the rowid, which FTS5 answers with a range scan.
+        The numbers are sorted, or best matches first by FTS5's bm25 rank if ranked is set.
+        """
+        expression = cls.build_match_expression(query, variant, match_whole_word)
+
+        sql = f"SELECT rowid FROM {cls.TABLE_NAME} WHERE {cls.TABLE_NAME} MATCH ?"
+        params = [expression]
+        if number_range is not None:
+            sql += " AND rowid BETWEEN ? AND ?"
+            params.extend(number_range)
+        sql += " ORDER BY rank;" if ranked else " ORDER BY rowid;"
+
+        logger.debug(f"Running FTS5 query with expression: {expression}")
+        return [row[0] for row in conn.execute(sql, params)]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+TRIGRAM_SIZE = 3
+
+
+def trigrams(text: str) -> set:
+    """Return the distinct character trigrams of a text."""
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+def max_edit_distance(pattern: str) -> int:
+    """
+    The number of typos tolerated for a pattern: none for very short patterns, then one, then two.
+    It is also capped so every candidate keeps at least one trigram of the pattern, which lets the index prune.
+    """
+    letters = len(pattern.strip())
+    distance = 0 if letters < 4 else 1 if letters < 8 else 2
+    return max(0, min(distance, (len(trigrams(pattern)) - 1) // TRIGRAM_SIZE))
+
+
+def approximate_distance(pattern: str, text: str, max_distance: int) -> Optional[int]:
+    """
+    Return the smallest edit distance between the pattern and any substring of the text,
+    or None if it is larger than max_distance.
+
+    Uses Myers' bit-parallel algorithm, one pass over the text with the pattern columns packed in an integer,
+    and stops as soon as an exact occurrence is found.
+    """
+    m = len(pattern)
+    if m == 0:
+        return 0
+
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last_bit = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    best = m
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last_bit:
+            score += 1
+        elif mh & last_bit:
+            score -= 1
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score < best:
+            best = score
+            if best == 0:
+                break
+    return best if best <= max_distance else None
+
+
+class TrigramIndex:
+    """Map every character trigram of the indexed texts to the sorted positions of the texts containing it."""
+
+    def __init__(self, postings: Dict[str, array]):
+        self._postings = postings
+
+    @classmethod
+    def build(cls, texts: List[str]) -> "TrigramIndex":
+        postings: Dict[str, array] = {}
+        for position, text in enumerate(texts):
+            for trigram in trigrams(text):
+                posting_list = postings.get(trigram)
+                if posting_list is None:
+                    posting_list = postings[trigram] = array("H")
+                posting_list.append(position)
+        return cls(postings)
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def candidates(self, pattern: str, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        Return (position, shared trigrams) of the texts that may hold the pattern within max_distance edits,
+        the texts sharing the most trigrams first.
+
+        An edit changes at most TRIGRAM_SIZE trigrams, so a text holding a close enough substring
+        shares at least len(trigrams(pattern)) - TRIGRAM_SIZE * max_distance trigrams with the pattern.
+        """
+        pattern_trigrams = trigrams(pattern)
+        min_overlap = max(1, len(pattern_trigrams) - TRIGRAM_SIZE * max_distance)
+        overlaps: Dict[int, int] = {}
+        for trigram in pattern_trigrams:
+            for position in self._postings.get(trigram, ()):
+                overlaps[position] = overlaps.get(position, 0) + 1
+        candidates = [(position, overlap) for position, overlap in overlaps.items() if overlap >= min_overlap]
+        candidates.sort(key=lambda candidate: (-candidate[1], candidate[0]))
+        logger.debug(f"Trigram index kept {len(candidates)} of {len(overlaps)} texts sharing at least {min_overlap} trigrams.")
+        return candidates
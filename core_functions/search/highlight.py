@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""
+Locate search hits and find phrases in the displayed Quran text.
+
+Searches match normalized text, while the view shows the text with its tashkil and Quranic marks.
+Folding only deletes characters or replaces one character by another, so every character of the folded text
+comes from one character of the original, and its original offset is its folded offset plus the number of
+characters deleted before it. That count is stored per ayah as an array("H") of deltas, built once and cached,
+so mapping a hit back to the view is a lookup.
+"""
+
+import re
+from array import array
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from .normalizer import TASHKIL, HAMZAT, TATWEEL, SUPERSCRIPT_ALEF, ALEF_MAQSURA, TA_MARBUTA
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+ALEF_WASLA = "ٱ"
+# The small high and low signs of the Uthmani script: waqf marks, small letters and the other annotations.
+QURANIC_MARKS = "".join(chr(code) for code in range(0x0610, 0x061B)) + "ٕٖٓٔٗ٘" + "".join(chr(code) for code in range(0x06D6, 0x06EE))
+
+# Broader than NormalizationVariant.FULL so the words of either font match the search text.
+# The Uthmani font also spells some words differently (الصلوٰة for الصلاة), those are not highlighted.
+_FOLD_MAP = {ord(char): None for char in TASHKIL + TATWEEL + SUPERSCRIPT_ALEF + QURANIC_MARKS}
+_FOLD_MAP.update({ord(char): "ا" for char in HAMZAT + ALEF_WASLA})
+_FOLD_MAP.update({ord(ALEF_MAQSURA): "ي", ord(TA_MARBUTA): "ه"})
+
+
+def fold(text: str) -> str:
+    return text.translate(_FOLD_MAP)
+
+
+class OffsetMap:
+    """A text folded for matching, and the deltas mapping each folded offset back to the original text."""
+    __slots__ = ("folded", "deltas", "length")
+
+    def __init__(self, text: str, typecode: str = "H"):
+        """
+        args:
+            text (str): The original text.
+            typecode (str): The array type of the deltas, "H" fits an ayah, use "I" for a text that may drop more than 65535 marks.
+        """
+        folded = []
+        deltas = array(typecode)
+        deleted = 0
+        for char in text:
+            replacement = _FOLD_MAP.get(ord(char), char)
+            if replacement is None:
+                deleted += 1
+                continue
+            folded.append(replacement)
+            deltas.append(deleted)
+        self.folded = "".join(folded)
+        self.deltas = deltas
+        self.length = len(text)
+
+    def to_original(self, start: int, end: int) -> Tuple[int, int]:
+        """Map the folded span [start, end) to the original text. The span keeps the marks of its last letter."""
+        original_start = start + self.deltas[start]
+        original_end = end + self.deltas[end] if end < len(self.deltas) else self.length
+        return original_start, original_end
+
+
+@lru_cache(maxsize=2048)
+def offset_map(text: str) -> OffsetMap:
+    """Return the offset map of a text, built once per distinct ayah text."""
+    return OffsetMap(text)
+
+
+class HitHighlighter:
+    """Find the spans of the search terms, or of a regular expression, in the displayed text of an ayah."""
+
+    def __init__(self, terms: List[str] = None, pattern: Optional[str] = None):
+        """
+        args:
+            terms (List[str]): The words and phrases of the query, in any normalization, empty ones are ignored.
+            pattern (str): A regular expression to highlight instead of the terms.
+        """
+        self._regex = None
+        if pattern is not None:
+            try:
+                self._regex = re.compile(fold(pattern))
+            except re.error as e:
+                logger.warning(f"Cannot highlight invalid pattern '{pattern}': {e}")
+        else:
+            terms = sorted({" ".join(fold(term).split()) for term in terms or []} - {""}, key=len, reverse=True)
+            if terms:
+                self._regex = re.compile("|".join(re.escape(term) for term in terms))
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """Return the (start, end) offsets of the hits in the original text."""
+        if self._regex is None:
+            return []
+        mapping = offset_map(text)
+        return [mapping.to_original(*match.span()) for match in self._regex.finditer(mapping.folded) if match.end() > match.start()]
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+
+class TextFinder:
+    """
+    Find a phrase in a whole displayed text, such as a page, a surah or a juz, folded once with an OffsetMap.
+    Every search after that is a substring scan of the folded text, so it can run on each keystroke.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._map = OffsetMap(text, "I")
+
+    def find_all(self, phrase: str) -> List[Tuple[int, int]]:
+        """Return the (start, end) offsets in the original text of every occurrence of the phrase, ignoring tashkil and hamzat."""
+        needle = " ".join(fold(phrase).split())
+        if not needle:
+            return []
+        folded = self._map.folded
+        spans = []
+        start = folded.find(needle)
+        while start != -1:
+            spans.append(self._map.to_original(start, start + len(needle)))
+            start = folded.find(needle, start + len(needle))
+        return spans
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import closing
+from typing import Callable, Dict, List, Optional, Tuple
+from exceptions.database import DBNotFoundError, DatabaseConnectionError
+from .normalizer import NormalizationVariant, normalize
+from .fuzzy import TrigramIndex, approximate_distance, max_edit_distance
+from .query import QueryNode, Literal, TermNode
+from .morphology import MORPHOLOGY_TABLE, analyze
+from .types import SearchCriteria, SearchMode
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+# A posting packs the ayah number and the token offset in one integer: (number << POSITION_BITS) | offset.
+# The longest ayah has far fewer than 1024 words, so offsets never spill into the ayah number.
+POSITION_BITS = 10
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+
+class InvertedIndex:
+    """Map every normalized token to the sorted list of its postings."""
+
+    def __init__(self, postings: Dict[str, array], vocabulary: Optional[List[str]] = None):
+        self._postings = postings
+        self.vocabulary = vocabulary if vocabulary is not None else sorted(postings)
+
+    @classmethod
+    def build(cls, numbers: array, texts: List[str]) -> "InvertedIndex":
+        postings: Dict[str, array] = {}
+        for number, text in zip(numbers, texts):
+            for offset, token in enumerate(text.split()):
+                posting_list = postings.get(token)
+                if posting_list is None:
+                    posting_list = postings[token] = array("I")
+                posting_list.append(number << POSITION_BITS | offset)
+        return cls(postings)
+
+    def get(self, token: str) -> array:
+        """Return the postings of a token, or an empty array if it is not indexed."""
+        return self._postings.get(token, array("I"))
+
+    def tokens_with_prefix(self, prefix: str) -> List[str]:
+        tokens = []
+        for i in range(bisect_left(self.vocabulary, prefix), len(self.vocabulary)):
+            token = self.vocabulary[i]
+            if not token.startswith(prefix):
+                break
+            tokens.append(token)
+        return tokens
+
+    def tokens_with_suffix(self, suffix: str) -> List[str]:
+        return [token for token in self.vocabulary if token.endswith(suffix)]
+
+    def tokens_containing(self, part: str) -> List[str]:
+        return [token for token in self.vocabulary if part in token]
+
+    def union(self, tokens: List[str]) -> List[int]:
+        """Return the sorted union of the postings of the given tokens."""
+        if len(tokens) == 1:
+            return list(self.get(tokens[0]))
+        merged = set()
+        for token in tokens:
+            merged.update(self.get(token))
+        return sorted(merged)
+
+    def candidates(self, query_tokens: List[str], match_whole_word: bool = False, prefix: bool = False) -> List[List[str]]:
+        """
+        Return, for every query token, the indexed tokens it may match.
+
+        When match_whole_word is False the query behaves like a substring search:
+        a single token may appear anywhere inside a word, and for several tokens the first one
+        must end a word, the last one must start a word and the ones in between must match whole words.
+        When prefix is True the last query token only has to start a word.
+        """
+        if not query_tokens:
+            return []
+
+        if match_whole_word:
+            candidates = [[token] for token in query_tokens]
+        elif len(query_tokens) == 1:
+            candidates = [self.tokens_containing(query_tokens[0])]
+        else:
+            candidates = [self.tokens_with_suffix(query_tokens[0])]
+            candidates.extend([token] for token in query_tokens[1:-1])
+            candidates.append(self.tokens_with_prefix(query_tokens[-1]))
+
+        if prefix:
+            candidates[-1] = self.tokens_with_prefix(query_tokens[-1])
+        return candidates
+
+    def sequence_postings(self, candidates: List[List[str]]) -> List[int]:
+        """Return the sorted postings where the candidate tokens appear as consecutive words, pointing at the first word."""
+        if not candidates:
+            return []
+
+        postings = self.union(candidates[0])
+        for distance, tokens in enumerate(candidates[1:], start=1):
+            if not postings:
+                break
+            following = set(self.union(tokens))
+            postings = [posting for posting in postings if posting + distance in following]
+        return postings
+
+    def match_phrase(self, query_tokens: List[str], match_whole_word: bool = False) -> List[int]:
+        """Return the sorted ayah numbers containing the query tokens as consecutive words (see candidates)."""
+        return self.numbers_of(self.sequence_postings(self.candidates(query_tokens, match_whole_word)))
+
+    @staticmethod
+    def split_posting(posting: int) -> Tuple[int, int]:
+        """Return the (ayah number, word offset) packed in a posting."""
+        return posting >> POSITION_BITS, posting & POSITION_MASK
+
+    @staticmethod
+    def numbers_of(postings: List[int]) -> List[int]:
+        """Return the unique sorted ayah numbers of sorted postings."""
+        numbers = []
+        for posting in postings:
+            number = posting >> POSITION_BITS
+            if not numbers or numbers[-1] != number:
+                numbers.append(number)
+        return numbers
+
+
+class MorphologicalIndex(InvertedIndex):
+    """
+    Inverted index whose query tokens match every indexed word sharing their stem or root.
+    The analyses come from the morphology table built offline, so a query costs a dictionary lookup per token.
+    """
+
+    def __init__(self, inverted_index: InvertedIndex, analyses: Dict[str, Tuple[str, str]], mode: str):
+        super().__init__(inverted_index._postings, inverted_index.vocabulary)
+        self._analyses = analyses
+        self._key_position = 0 if mode == SearchMode.stem else 1
+        self._words_by_key: Dict[str, List[str]] = {}
+        for word, analysis in analyses.items():
+            self._words_by_key.setdefault(analysis[self._key_position], []).append(word)
+
+    def key_of(self, token: str) -> str:
+        """Return the stem or root of a query token. A token that is itself a known stem or root is used as is."""
+        analysis = self._analyses.get(token)
+        if analysis is not None:
+            return analysis[self._key_position]
+        if token in self._words_by_key:
+            return token
+        return analyze(token)[self._key_position]
+
+    def candidates(self, query_tokens: List[str], match_whole_word: bool = False, prefix: bool = False) -> List[List[str]]:
+        return [self._words_by_key.get(self.key_of(token), []) for token in query_tokens]
+
+
+class QuranIndex:
+    """
+    In-memory copy of the Quran search database with lazily built inverted indexes.
+    The rows are loaded once per database file and shared by all QuranSearchManager instances.
+    """
+    _instances: Dict[str, "QuranIndex"] = {}
+    _lock = threading.Lock()
+    REFINE_CHUNK_SIZE = 1024
+
+    def __init__(self, db_path: str):
+        logger.debug(f"Loading Quran index from: {db_path}...")
+        self.db_path = db_path
+        self.numbers = array("H")
+        self.texts: List[str] = []
+        self.columns: Dict[str, array] = {criteria: array("H") for criteria in SearchCriteria.get_criteria()}
+        # For every criteria, the number of the first ayah of each unit: boundaries[criteria][unit - 1].
+        self.boundaries: Dict[str, array] = {}
+        self._positions: Dict[int, int] = {}
+        self._inverted_indexes: Dict[NormalizationVariant, InvertedIndex] = {}
+        self._spaced_texts: Dict[NormalizationVariant, List[str]] = {}
+        self._trigram_indexes: Dict[NormalizationVariant, TrigramIndex] = {}
+        self._morphological_indexes: Dict[str, MorphologicalIndex] = {}
+        self._load()
+        logger.info(f"Quran index loaded with {len(self.numbers)} ayahs.")
+
+    @classmethod
+    def get(cls, db_path: str) -> "QuranIndex":
+        """Return the shared index of the given database, loading it on first use."""
+        with cls._lock:
+            index = cls._instances.get(db_path)
+            if index is None:
+                index = cls._instances[db_path] = cls(db_path)
+            return index
+
+    def _load(self) -> None:
+        if not os.path.isfile(self.db_path):
+            logger.error(f"Database file not found: {self.db_path}")
+            raise DBNotFoundError(self.db_path)
+
+        criteria_columns = ", ".join(self.columns)
+        try:
+            with closing(sqlite3.connect(self.db_path)) as conn:
+                rows = conn.execute(f"SELECT number, text, {criteria_columns} FROM quran ORDER BY number;").fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load Quran index: {e}")
+            raise DatabaseConnectionError(cause=e)
+
+        for position, (number, text, *values) in enumerate(rows):
+            self._positions[number] = position
+            self.numbers.append(number)
+            self.texts.append(text)
+            for column, value in zip(self.columns.values(), values):
+                column.append(value)
+
+        # Surahs, juz, hizbs, quarters and pages are contiguous and numbered in Quran order,
+        # so each unit is the interval between two consecutive boundaries.
+        for criteria, column in self.columns.items():
+            boundaries = self.boundaries[criteria] = array("H")
+            for number, value in zip(self.numbers, column):
+                if len(boundaries) < value:
+                    boundaries.append(number)
+
+    def _load_variant_texts(self, variant: NormalizationVariant) -> List[str]:
+        """Return the texts normalized with the given variant, read from the column stored by the builder when it exists."""
+        if variant == NormalizationVariant.ORIGINAL:
+            return self.texts
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(quran);")}
+            if variant.column in columns:
+                logger.debug(f"Reading precomputed column '{variant.column}'.")
+                return [row[0] for row in conn.execute(f"SELECT {variant.column} FROM quran ORDER BY number;")]
+
+        logger.warning(f"Column '{variant.column}' not found in {self.db_path}, normalizing texts in memory. Run the search database builder to precompute it.")
+        return [normalize(text, variant) for text in self.texts]
+
+    def inverted_index(self, variant: NormalizationVariant) -> InvertedIndex:
+        """Return the inverted index of the given normalization variant, building it on first use."""
+        with self._lock:
+            inverted_index = self._inverted_indexes.get(variant)
+            if inverted_index is None:
+                logger.debug(f"Building inverted index for {variant}...")
+                texts = self._load_variant_texts(variant)
+                inverted_index = self._inverted_indexes[variant] = InvertedIndex.build(self.numbers, texts)
+                # One space between and around the words, so a phrase can be checked with a plain substring test.
+                self._spaced_texts[variant] = [" {} ".format(" ".join(text.split())) for text in texts]
+                logger.debug(f"Inverted index built with {len(inverted_index.vocabulary)} tokens.")
+            return inverted_index
+
+    def unit_of(self, criteria: str, number: int) -> int:
+        """Return the unit (surah, juz, hizb, quarter or page) holding an ayah number, using the boundary arrays."""
+        return bisect_right(self.boundaries[criteria], number)
+
+    def unit_range(self, criteria: str, unit: int) -> Tuple[int, int]:
+        """Return the first and last ayah numbers of a unit."""
+        boundaries = self.boundaries[criteria]
+        last = boundaries[unit] - 1 if unit < len(boundaries) else self.numbers[-1]
+        return boundaries[unit - 1], last
+
+    def facets(self, numbers: List[int]) -> Dict[str, Dict[int, int]]:
+        """
+        Count the ayah numbers per surah, juz, hizb, quarter and page in one pass.
+        Returns {criteria: {unit: count}} with the units in ascending order.
+        """
+        facets = {}
+        for criteria, boundaries in self.boundaries.items():
+            counts: Dict[int, int] = {}
+            for number in numbers:
+                unit = bisect_right(boundaries, number)
+                counts[unit] = counts.get(unit, 0) + 1
+            facets[criteria] = dict(sorted(counts.items()))
+        return facets
+
+    def value(self, criteria: str, number: int) -> int:
+        """Return the value of a criteria column (page, sura_number, ...) for the given ayah number."""
+        return self.columns[criteria][self._positions[number]]
+
+    def find(self, query: QueryNode, variant: NormalizationVariant = NormalizationVariant.ORIGINAL, match_whole_word: bool = False, mode: str = SearchMode.text) -> List[int]:
+        """
+        Return the sorted numbers of the ayahs matching a query.
+
+        args:
+            query (QueryNode | str): A plan built by QueryParser, or a literal search text.
+            variant (NormalizationVariant): The normalization the plan was built with. Stem and root modes require FULL.
+            match_whole_word (bool): Whether bare words must match whole words.
+            mode (str): Match words as written, or every word sharing their stem or root (see SearchMode).
+        """
+        if isinstance(query, str):
+            query = Literal(normalize(query, variant).split())
+        if mode == SearchMode.text:
+            inverted_index = self.inverted_index(variant)
+        else:
+            inverted_index = self.morphological_index(mode)
+        return query.evaluate(inverted_index, self.numbers, match_whole_word)
+
+    def _load_morphology(self, vocabulary: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Return the (stem, root) of every fully normalized word, read from the table stored by the builder when it exists."""
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (MORPHOLOGY_TABLE,)).fetchone()
+            if row is not None:
+                logger.debug(f"Reading morphology table '{MORPHOLOGY_TABLE}'.")
+                return {word: (stem, root) for word, stem, root in conn.execute(f"SELECT word, stem, root FROM {MORPHOLOGY_TABLE};")}
+
+        logger.warning(f"Table '{MORPHOLOGY_TABLE}' not found in {self.db_path}, analyzing words in memory. Run the search database builder to precompute it.")
+        return {word: analyze(word) for word in vocabulary}
+
+    def morphological_index(self, mode: str) -> MorphologicalIndex:
+        """Return the stem or root index over the fully normalized text, building it on first use."""
+        inverted_index = self.inverted_index(NormalizationVariant.FULL)
+        with self._lock:
+            morphological_index = self._morphological_indexes.get(mode)
+            if morphological_index is None:
+                logger.debug(f"Building {mode} index...")
+                morphological_index = self._morphological_indexes[mode] = MorphologicalIndex(inverted_index, self._load_morphology(inverted_index.vocabulary), mode)
+            return morphological_index
+
+    def trigram_index(self, variant: NormalizationVariant) -> TrigramIndex:
+        """Return the trigram index of the given normalization variant, building it on first use."""
+        self.inverted_index(variant)
+        with self._lock:
+            trigram_index = self._trigram_indexes.get(variant)
+            if trigram_index is None:
+                logger.debug(f"Building trigram index for {variant}...")
+                trigram_index = self._trigram_indexes[variant] = TrigramIndex.build(self._spaced_texts[variant])
+                logger.debug(f"Trigram index built with {len(trigram_index)} trigrams.")
+            return trigram_index
+
+    def fuzzy_find(
+        self,
+        query: TermNode,
+        variant: NormalizationVariant = NormalizationVariant.ORIGINAL,
+        match_whole_word: bool = False,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Optional[List[int]]:
+        """
+        Return the numbers of the ayahs holding the words of the query with a few typos, best matches first.
+
+        The trigram index keeps the ayahs sharing enough trigrams with the query, and only those are checked
+        with a bounded edit distance (see max_edit_distance). Matches are ranked by edit distance, then by shared trigrams.
+        Returns None if is_cancelled reports that the search became stale.
+        """
+        trigram_index = self.trigram_index(variant)
+        texts = self._spaced_texts[variant]
+        pattern = self._needle(query, query.is_whole_word(match_whole_word))
+        max_distance = max_edit_distance(pattern)
+        logger.debug(f"Fuzzy search for '{pattern}' tolerating {max_distance} edits.")
+
+        matches = []
+        for i, (position, overlap) in enumerate(trigram_index.candidates(pattern, max_distance)):
+            if is_cancelled is not None and i % self.REFINE_CHUNK_SIZE == 0 and is_cancelled():
+                logger.debug("Fuzzy search cancelled.")
+                return None
+            distance = approximate_distance(pattern, texts[position], max_distance)
+            if distance is not None:
+                matches.append((distance, -overlap, self.numbers[position]))
+        matches.sort()
+        return [number for *_, number in matches]
+
+    def refine(
+        self,
+        numbers: List[int],
+        query: Literal,
+        variant: NormalizationVariant = NormalizationVariant.ORIGINAL,
+        match_whole_word: bool = False,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Optional[List[int]]:
+        """
+        Filter the result of a previous query with a literal that refines it (see Literal.refines),
+        testing the text of those ayahs only instead of searching the whole index.
+        Returns None if is_cancelled reports that the search became stale.
+        """
+        self.inverted_index(variant)
+        texts = self._spaced_texts[variant]
+        needle = self._needle(query, match_whole_word)
+        refined = []
+        for start in range(0, len(numbers), self.REFINE_CHUNK_SIZE):
+            if is_cancelled is not None and is_cancelled():
+                logger.debug("Refinement cancelled.")
+                return None
+            refined.extend(number for number in numbers[start:start + self.REFINE_CHUNK_SIZE] if needle in texts[self._positions[number]])
+        return refined
+
+    @staticmethod
+    def _needle(query: TermNode, match_whole_word: bool) -> str:
+        """
+        Return the substring a spaced text contains exactly when it matches the literal.
+        Without match_whole_word, "a b c" found inside the text means a ends a word, b is a word and c starts a word,
+        the same rules as InvertedIndex.candidates. Surrounding spaces anchor the ends to word boundaries.
+        """
+        needle = " ".join(query.tokens)
+        if match_whole_word:
+            return " " + needle + ("" if query.prefix else " ")
+        if query.prefix and len(query.tokens) == 1:
+            return " " + needle
+        return needle
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+Light rule-based Arabic morphology used to build the root/stem index of the search database.
+
+The analyzer follows the ISRI stemmer (Taghva et al., 2005): strip the longest known prefix and suffix to get the stem,
+then match the stem against the common derivation patterns (أفعل، فاعل، مفعول، افتعل، استفعل...) to extract a
+three-letter root. It works on text folded with NormalizationVariant.FULL, so hamzat are already alef.
+It is not a full morphological analyzer, but it groups the usual derivations of a root together.
+"""
+
+from typing import Tuple
+
+MORPHOLOGY_TABLE = "quran_morphology"
+
+PREFIXES_3 = ("كال", "بال", "ولل", "وال", "فال", "فلل")
+PREFIXES_2 = ("ال", "لل")
+PREFIXES_1 = ("ل", "ب", "ف", "س", "و", "ي", "ت", "ن", "ا")
+SUFFIXES_3 = ("تمل", "همل", "تان", "تين", "كمل", "هما", "كما")
+SUFFIXES_2 = ("ون", "ات", "ان", "ين", "تن", "كم", "هن", "نا", "يا", "ها", "تم", "كن", "ني", "وا", "ما", "هم")
+SUFFIXES_1 = ("ه", "ي", "ك", "ت", "ا", "ن")
+
+
+def _strip_prefix(word: str, prefixes: Tuple[str, ...], min_length: int) -> str:
+    if len(word) >= min_length:
+        for prefix in prefixes:
+            if word.startswith(prefix):
+                return word[len(prefix):]
+    return word
+
+
+def _strip_suffix(word: str, suffixes: Tuple[str, ...], min_length: int) -> str:
+    if len(word) >= min_length:
+        for suffix in suffixes:
+            if word.endswith(suffix):
+                return word[:-len(suffix)]
+    return word
+
+
+def stem(word: str) -> str:
+    """Return the word without its prefixes and suffixes (definite article, conjunctions, pronouns, plural endings...)."""
+    stripped = _strip_prefix(word, PREFIXES_3, 6)
+    if stripped == word:
+        stripped = _strip_prefix(word, PREFIXES_2, 5)
+    word = stripped
+
+    stripped = _strip_suffix(word, SUFFIXES_3, 6)
+    if stripped == word:
+        stripped = _strip_suffix(word, SUFFIXES_2, 5)
+    word = stripped
+
+    if len(word) >= 4 and word.startswith("وو"):
+        word = word[1:]
+    return word
+
+
+def _root_of_4(word: str) -> str:
+    if word[0] == "م":                      # مفعل
+        return word[1:]
+    if word[1] == "ا":                      # فاعل
+        return word[0] + word[2:]
+    if word[2] in "اوي":                    # فعال، فعول، فعيل
+        return word[:2] + word[3]
+    if word[3] == "ه":                      # فعلة
+        return word[:3]
+    if word[0] in "ات":                     # أفعل، تفعل
+        return word[1:]
+    return _strip_affix_letter(word)
+
+
+def _root_of_5(word: str) -> str:
+    if word[0] == "م" and word[3] in "وي":      # مفعول، مفعيل
+        return word[1:3] + word[4]
+    if word[0] in "امت" and word[2] == "ت":     # افتعل، مفتعل
+        return word[1] + word[3:]
+    if word[0] in "مت" and word[2] == "ا":      # مفاعل، تفاعل
+        return word[1] + word[3:]
+    if word[0] == "ت" and word[3] == "ي":       # تفعيل
+        return word[1:3] + word[4]
+    if word[:2] == "ان":                        # انفعل
+        return word[2:]
+    if word[2] == "ا" and word[3] in "ئي":      # فعائل، فعايل
+        return word[:2] + word[4]
+    if word[1] == "ا" and word[3] in "وي":      # فاعول، فاعيل
+        return word[0] + word[2] + word[4]
+    if word[2] == "ا" and word[4] == "ه":       # فعالة
+        return word[:2] + word[3]
+    if word[0] == "ا" and word[3] == "ا":       # إفعال
+        return word[1:3] + word[4]
+    return _strip_affix_letter(word)
+
+
+def _root_of_6(word: str) -> str:
+    if word[:3] in ("است", "مست"):              # استفعل، مستفعل
+        return word[3:]
+    if word[0] in "ام" and word[2] == "ت" and word[4] == "ا":    # افتعال، مفتعال
+        return word[1] + word[3] + word[5]
+    if word[0] == "م" and word[2] == "ا" and word[5] == "ه":     # مفاعلة
+        return word[1] + word[3:5]
+    if word[0] == "ت" and word[2] == "ا" and word[5] == "ه":     # تفاعلة
+        return word[1] + word[3:5]
+    return _strip_affix_letter(word)
+
+
+def _strip_affix_letter(word: str) -> str:
+    """Drop one prefix or suffix letter and try the patterns again, or give up and keep the word."""
+    stripped = _strip_suffix(word, SUFFIXES_1, 4)
+    if stripped == word:
+        stripped = _strip_prefix(word, PREFIXES_1, 4)
+    if stripped == word:
+        return word
+    return _root_of_stem(stripped)
+
+
+def _root_of_stem(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if len(word) == 4:
+        return _root_of_4(word)
+    if len(word) == 5:
+        return _root_of_5(word)
+    if len(word) == 6:
+        return _root_of_6(word)
+    return _strip_affix_letter(word)
+
+
+def analyze(word: str) -> Tuple[str, str]:
+    """
+    Return the (stem, root) of a word folded with NormalizationVariant.FULL.
+    The root has three letters when one of the known patterns matched, otherwise it is the stem itself.
+    """
+    word_stem = stem(word)
+    return word_stem, _root_of_stem(word_stem)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+from enum import Enum
+
+TASHKIL = "\u064e\u064b\u064f\u064c\u0650\u064d\u0652\u0651"  # Fatha, tanween, damma, kasra, sukun and shadda.
+HAMZAT = "أإآءؤ"
+TATWEEL = "\u0640"
+SUPERSCRIPT_ALEF = "\u0670"
+ALEF_MAQSURA = "ى"
+TA_MARBUTA = "ة"
+
+
+class NormalizationVariant(Enum):
+    ORIGINAL = 0
+    NO_TASHKIL = 1
+    NO_HAMZA = 2
+    NO_TASHKIL_NO_HAMZA = 3
+    FULL = 4
+
+    @staticmethod
+    def from_options(no_tashkil: bool = False, no_hamza: bool = False, full_normalization: bool = False) -> "NormalizationVariant":
+        if full_normalization:
+            return NormalizationVariant.FULL
+        if no_tashkil and no_hamza:
+            return NormalizationVariant.NO_TASHKIL_NO_HAMZA
+        if no_tashkil:
+            return NormalizationVariant.NO_TASHKIL
+        if no_hamza:
+            return NormalizationVariant.NO_HAMZA
+        return NormalizationVariant.ORIGINAL
+
+    @property
+    def column(self) -> str:
+        """The Verses.DB column that stores the text normalized with this variant."""
+        columns = {
+            NormalizationVariant.ORIGINAL: "text",
+            NormalizationVariant.NO_TASHKIL: "text_No_tashkil",
+            NormalizationVariant.NO_HAMZA: "text_no_hamza",
+            NormalizationVariant.NO_TASHKIL_NO_HAMZA: "text_no_tashkil_no_hamza",
+            NormalizationVariant.FULL: "text_normalized",
+        }
+        return columns[self]
+
+
+_TRANSLATION_TABLES = {
+    NormalizationVariant.ORIGINAL: {},
+    NormalizationVariant.NO_TASHKIL: str.maketrans("", "", TASHKIL),
+    NormalizationVariant.NO_HAMZA: str.maketrans(HAMZAT, "ا" * len(HAMZAT)),
+    NormalizationVariant.NO_TASHKIL_NO_HAMZA: str.maketrans(HAMZAT, "ا" * len(HAMZAT), TASHKIL),
+    NormalizationVariant.FULL: str.maketrans(
+        HAMZAT + ALEF_MAQSURA + TA_MARBUTA,
+        "ا" * len(HAMZAT) + "ي" + "ه",
+        TASHKIL + TATWEEL + SUPERSCRIPT_ALEF
+    ),
+}
+
+
+def normalize(text: str, variant: NormalizationVariant = NormalizationVariant.ORIGINAL) -> str:
+    """
+    Normalize Arabic text for searching.
+
+    args:
+        text (str): The text to normalize.
+        variant (NormalizationVariant): Which characters to remove or fold.
+
+    returns:
+        str: The normalized text.
+    """
+    if variant == NormalizationVariant.ORIGINAL:
+        return text
+    return text.translate(_TRANSLATION_TABLES[variant])
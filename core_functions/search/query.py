@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+
+"""
+A small query language for the Quran search.
+
+    word1 word2      consecutive words, matched like a plain search (substring unless match_whole_word is set).
+    word*            a word starting with the given letters.
+    "word1 word2"    an exact phrase of whole words, "word1 word2"* makes its last word a prefix.
+    a AND b, a b     both must appear in the ayah. Juxtaposition is an implicit AND between groups.
+    a OR b           either may appear.
+    a NOT b, NOT a   a without b, or every ayah without a.
+    a NEAR b         both within 10 words of each other, NEAR/n sets the distance.
+    ( ... )          grouping.
+
+Operators are written in upper-case English so they never collide with the Arabic text.
+Precedence from loosest to tightest: OR, AND / NOT, NEAR.
+
+The parser builds a tree of QueryNode objects. Term nodes (words and phrases) are resolved to sorted postings
+of the inverted index, and boolean nodes combine the sorted ayah numbers of their children with linear merges,
+so a whole query costs one pass over the posting lists involved instead of one database scan per part.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from heapq import merge
+from typing import TYPE_CHECKING, Dict, List, Optional
+from exceptions.database import InvalidQueryError
+from utils.logger import LoggerManager
+
+if TYPE_CHECKING:
+    from .index import InvertedIndex
+
+logger = LoggerManager.get_logger(__name__)
+
+DEFAULT_NEAR_DISTANCE = 10
+
+
+def intersect(left: List[int], right: List[int]) -> List[int]:
+    """Return the intersection of two sorted lists of unique integers."""
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] == right[j]:
+            result.append(left[i])
+            i += 1
+            j += 1
+        elif left[i] < right[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def unite(left: List[int], right: List[int]) -> List[int]:
+    """Return the union of two sorted lists of unique integers."""
+    result = []
+    for value in merge(left, right):
+        if not result or result[-1] != value:
+            result.append(value)
+    return result
+
+
+def subtract(left: List[int], right: List[int]) -> List[int]:
+    """Return the items of the sorted list left that are not in the sorted list right."""
+    result = []
+    j = 0
+    for value in left:
+        while j < len(right) and right[j] < value:
+            j += 1
+        if j == len(right) or right[j] != value:
+            result.append(value)
+    return result
+
+
+class QueryNode(ABC):
+    """Base class of the nodes of a parsed query."""
+
+    @abstractmethod
+    def evaluate(self, index: "InvertedIndex", universe: List[int], match_whole_word: bool = False) -> List[int]:
+        """Return the sorted numbers of the ayahs matching this node. universe holds every ayah number, for NOT."""
+        pass
+
+    @abstractmethod
+    def terms(self) -> List["TermNode"]:
+        """Return the words and phrases the matching ayahs contain, ignoring the negated ones."""
+        pass
+
+    @abstractmethod
+    def to_fts5(self, match_whole_word: bool = False) -> str:
+        """Return the equivalent FTS5 query expression."""
+        pass
+
+
+class TermNode(QueryNode):
+    """A sequence of consecutive words."""
+
+    def __init__(self, tokens: List[str], prefix: bool = False):
+        self.tokens = tokens
+        self.prefix = prefix
+
+    @abstractmethod
+    def is_whole_word(self, match_whole_word: bool) -> bool:
+        """Return True if the words are matched whole, False if as substrings, with the given match_whole_word option."""
+        pass
+
+    def postings(self, index: "InvertedIndex", match_whole_word: bool = False) -> List[int]:
+        """Return the sorted postings of the first word of every occurrence."""
+        candidates = index.candidates(self.tokens, self.is_whole_word(match_whole_word), self.prefix)
+        return index.sequence_postings(candidates)
+
+    def evaluate(self, index: "InvertedIndex", universe: List[int], match_whole_word: bool = False) -> List[int]:
+        return index.numbers_of(self.postings(index, match_whole_word))
+
+    def terms(self) -> List["TermNode"]:
+        return [self]
+
+    def to_fts5(self, match_whole_word: bool = False) -> str:
+        # FTS5 has no infix matching: only whole words, and a single word or the last word of a whole-word phrase as a prefix.
+        if not self.is_whole_word(match_whole_word) and not (self.prefix and len(self.tokens) == 1):
+            raise InvalidQueryError(repr(self), "FTS5 cannot match part of a word, only whole words and prefixes.")
+        expression = '"{}"'.format(" ".join(self.tokens))
+        if self.prefix:
+            expression += " *"
+        return expression
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.tokens!r}, prefix={self.prefix})"
+
+
+class Literal(TermNode):
+    """Bare words, matched with the search options exactly like a plain search."""
+
+    def is_whole_word(self, match_whole_word: bool) -> bool:
+        return match_whole_word
+
+    def refines(self, previous: QueryNode, match_whole_word: bool = False) -> bool:
+        """
+        Return True if every ayah matching this literal also matches the previous query,
+        which is the case when the text was only extended, as while typing.
+        The result of the previous query can then be filtered instead of searching the whole Quran.
+        """
+        if not isinstance(previous, Literal) or len(self.tokens) < len(previous.tokens):
+            return False
+
+        count = len(previous.tokens)
+        if self.tokens[:count - 1] != previous.tokens[:count - 1]:
+            return False
+
+        token, previous_token = self.tokens[count - 1], previous.tokens[-1]
+        if match_whole_word and not previous.prefix:
+            return token == previous_token and not (self.prefix and len(self.tokens) == count)
+        if previous.prefix:
+            if match_whole_word or count > 1:
+                return token.startswith(previous_token)
+            return token.startswith(previous_token) and self.prefix and len(self.tokens) == 1
+        if count == 1:
+            return previous_token in token
+        return token.startswith(previous_token)
+
+
+class Phrase(TermNode):
+    """A quoted phrase, always matched as whole words."""
+
+    def is_whole_word(self, match_whole_word: bool) -> bool:
+        return True
+
+
+class Near(QueryNode):
+    """Terms appearing in the same ayah with at most `distance` words between them, in any order."""
+
+    def __init__(self, operands: List[TermNode], distance: int = DEFAULT_NEAR_DISTANCE):
+        self.operands = operands
+        self.distance = distance
+
+    def evaluate(self, index: "InvertedIndex", universe: List[int], match_whole_word: bool = False) -> List[int]:
+        offsets_by_operand: List[Dict[int, List[int]]] = []
+        numbers = None
+        for operand in self.operands:
+            offsets: Dict[int, List[int]] = {}
+            for posting in operand.postings(index, match_whole_word):
+                number, offset = index.split_posting(posting)
+                offsets.setdefault(number, []).append(offset)
+            offsets_by_operand.append(offsets)
+            numbers = sorted(offsets) if numbers is None else intersect(numbers, sorted(offsets))
+            if not numbers:
+                return []
+
+        return [number for number in numbers if self._is_near([offsets[number] for offsets in offsets_by_operand])]
+
+    def _is_near(self, offsets_by_operand: List[List[int]]) -> bool:
+        """Slide a window over the merged occurrences and look for one holding every operand close enough."""
+        occurrences = sorted(
+            (offset, i) for i, offsets in enumerate(offsets_by_operand) for offset in offsets
+        )
+        counts = [0] * len(self.operands)
+        covered = 0
+        start = 0
+        for offset, i in occurrences:
+            if counts[i] == 0:
+                covered += 1
+            counts[i] += 1
+            while covered == len(self.operands):
+                first_offset, first = occurrences[start]
+                if offset - (first_offset + len(self.operands[first])) <= self.distance:
+                    return True
+                counts[first] -= 1
+                if counts[first] == 0:
+                    covered -= 1
+                start += 1
+        return False
+
+    def terms(self) -> List[TermNode]:
+        return list(self.operands)
+
+    def to_fts5(self, match_whole_word: bool = False) -> str:
+        phrases = " ".join(operand.to_fts5(match_whole_word) for operand in self.operands)
+        return f"NEAR({phrases}, {self.distance})"
+
+    def __repr__(self) -> str:
+        return f"Near({self.operands!r}, distance={self.distance})"
+
+
+class Not(QueryNode):
+    """Every ayah that does not match the child."""
+
+    def __init__(self, child: QueryNode):
+        self.child = child
+
+    def evaluate(self, index: "InvertedIndex", universe: List[int], match_whole_word: bool = False) -> List[int]:
+        return subtract(universe, self.child.evaluate(index, universe, match_whole_word))
+
+    def terms(self) -> List[TermNode]:
+        return []
+
+    def to_fts5(self, match_whole_word: bool = False) -> str:
+        raise InvalidQueryError(repr(self), "FTS5 only supports NOT between two expressions.")
+
+    def __repr__(self) -> str:
+        return f"Not({self.child!r})"
+
+
+class And(QueryNode):
+    """Ayahs matching every child. Negated children are subtracted instead of being complemented."""
+
+    def __init__(self, children: List[QueryNode]):
+        self.children = children
+
+    def evaluate(self, index: "InvertedIndex", universe: List[int], match_whole_word: bool = False) -> List[int]:
+        positives = [child for child in self.children if not isinstance(child, Not)]
+        negatives = [child.child for child in self.children if isinstance(child, Not)]
+
+        numbers = universe if not positives else None
+        for child in positives:
+            child_numbers = child.evaluate(index, universe, match_whole_word)
+            numbers = child_numbers if numbers is None else intersect(numbers, child_numbers)
+            if not numbers:
+                return []
+        for child in negatives:
+            numbers = subtract(numbers, child.evaluate(index, universe, match_whole_word))
+            if not numbers:
+                return []
+        return list(numbers)
+
+    def terms(self) -> List[TermNode]:
+        return [term for child in self.children for term in child.terms()]
+
+    def to_fts5(self, match_whole_word: bool = False) -> str:
+        positives = [child.to_fts5(match_whole_word) for child in self.children if not isinstance(child, Not)]
+        negatives = [child.child.to_fts5(match_whole_word) for child in self.children if isinstance(child, Not)]
+        if not positives:
+            raise InvalidQueryError(repr(self), "FTS5 only supports NOT between two expressions.")
+        expression = "({})".format(" AND ".join(positives))
+        for negative in negatives:
+            expression = f"({expression} NOT {negative})"
+        return expression
+
+    def __repr__(self) -> str:
+        return f"And({self.children!r})"
+
+
+class Or(QueryNode):
+    """Ayahs matching any child."""
+
+    def __init__(self, children: List[QueryNode]):
+        self.children = children
+
+    def evaluate(self, index: "InvertedIndex", universe: List[int], match_whole_word: bool = False) -> List[int]:
+        numbers: List[int] = []
+        for child in self.children:
+            numbers = unite(numbers, child.evaluate(index, universe, match_whole_word))
+        return numbers
+
+    def terms(self) -> List[TermNode]:
+        return [term for child in self.children for term in child.terms()]
+
+    def to_fts5(self, match_whole_word: bool = False) -> str:
+        return "({})".format(" OR ".join(child.to_fts5(match_whole_word) for child in self.children))
+
+    def __repr__(self) -> str:
+        return f"Or({self.children!r})"
+
+
+class QueryParser:
+    """Parse a search text into a QueryNode tree. A text without operators becomes a single Literal."""
+
+    _TOKEN_PATTERN = re.compile(r'\s*(?:(?P<paren>[()])|"(?P<phrase>[^"]*)"(?P<phrase_prefix>\*?)|(?P<quote>")|(?P<near>NEAR(?:/(?P<distance>\d+))?)(?=[\s()"]|$)|(?P<operator>AND|OR|NOT)(?=[\s()"]|$)|(?P<word>[^\s()"]+))')
+
+    def __init__(self, text: str):
+        self.text = text
+        self._tokens = self._tokenize(text)
+        self._position = 0
+
+    @classmethod
+    def parse(cls, text: str) -> QueryNode:
+        """
+        Parse a search text.
+
+        args:
+            text (str): The search text, already normalized like the indexed text.
+
+        returns:
+            QueryNode: The root of the query plan.
+
+        raises:
+            InvalidQueryError: If the text is not a valid query.
+        """
+        parser = cls(text)
+        if not parser._tokens:
+            raise InvalidQueryError(text, "The query is empty.")
+        node = parser._parse_or()
+        if parser._peek() is not None:
+            raise InvalidQueryError(text, f"Unexpected '{parser._peek()[1]}'.")
+        logger.debug(f"Parsed query '{text}' into {node!r}.")
+        return node
+
+    def _tokenize(self, text: str) -> List[tuple]:
+        tokens = []
+        for match in self._TOKEN_PATTERN.finditer(text.strip()):
+            if match.group("paren"):
+                tokens.append(("paren", match.group("paren")))
+            elif match.group("phrase") is not None:
+                words = match.group("phrase").split()
+                if not words:
+                    raise InvalidQueryError(text, "Empty phrase.")
+                tokens.append(("phrase", words, bool(match.group("phrase_prefix"))))
+            elif match.group("quote"):
+                raise InvalidQueryError(text, "Unterminated phrase.")
+            elif match.group("near"):
+                distance = match.group("distance")
+                tokens.append(("near", int(distance) if distance else DEFAULT_NEAR_DISTANCE))
+            elif match.group("operator"):
+                tokens.append(("operator", match.group("operator")))
+            else:
+                word = match.group("word")
+                prefix = word.endswith("*")
+                word = word.rstrip("*")
+                if not word or "*" in word:
+                    raise InvalidQueryError(text, "The wildcard '*' is only allowed at the end of a word.")
+                tokens.append(("word", word, prefix))
+        return tokens
+
+    def _peek(self) -> Optional[tuple]:
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _next(self) -> tuple:
+        token = self._peek()
+        if token is None:
+            raise InvalidQueryError(self.text, "The query ends unexpectedly.")
+        self._position += 1
+        return token
+
+    def _parse_or(self) -> QueryNode:
+        children = [self._parse_and()]
+        while self._peek() == ("operator", "OR"):
+            self._next()
+            children.append(self._parse_and())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def _parse_and(self) -> QueryNode:
+        children = [self._parse_unary()]
+        while True:
+            token = self._peek()
+            if token is None or token == ("paren", ")") or token == ("operator", "OR"):
+                break
+            if token == ("operator", "AND"):
+                self._next()
+                children.append(self._parse_unary())
+            elif token == ("operator", "NOT"):
+                self._next()
+                children.append(Not(self._parse_near()))
+            else:
+                children.append(self._parse_unary())
+        return children[0] if len(children) == 1 else And(children)
+
+    def _parse_unary(self) -> QueryNode:
+        if self._peek() == ("operator", "NOT"):
+            self._next()
+            return Not(self._parse_unary())
+        return self._parse_near()
+
+    def _parse_near(self) -> QueryNode:
+        node = self._parse_primary()
+        if self._peek() is None or self._peek()[0] != "near":
+            return node
+
+        operands = [node]
+        distance = None
+        while self._peek() is not None and self._peek()[0] == "near":
+            token_distance = self._next()[1]
+            if distance is not None and token_distance != distance:
+                raise InvalidQueryError(self.text, "All NEAR operators of a group must use the same distance.")
+            distance = token_distance
+            operands.append(self._parse_primary())
+
+        if not all(isinstance(operand, TermNode) for operand in operands):
+            raise InvalidQueryError(self.text, "NEAR only accepts words and phrases.")
+        return Near(operands, distance)
+
+    def _parse_primary(self) -> QueryNode:
+        token = self._next()
+        kind = token[0]
+        if token == ("paren", "("):
+            node = self._parse_or()
+            if self._next() != ("paren", ")"):
+                raise InvalidQueryError(self.text, "Missing ')'.")
+            return node
+        if kind == "phrase":
+            return Phrase(token[1], token[2])
+        if kind == "word":
+            words = [token[1]]
+            prefix = token[2]
+            while not prefix and self._peek() is not None and self._peek()[0] == "word":
+                _, word, prefix = self._next()
+                words.append(word)
+            return Literal(words, prefix)
+        raise InvalidQueryError(self.text, f"Unexpected '{token[1]}'.")
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+"""
+Regular expression search over the ayah texts, bounded in time and in matches.
+
+Python's re module holds the GIL and cannot be interrupted while it backtracks, so a pathological pattern
+such as (ا+)+ب would freeze the whole application if it ran in the GUI process, even in a thread.
+Patterns therefore run in a dedicated worker process that keeps the ayah texts in memory:
+the worker checks the time budget between ayahs and stops with the matches found so far,
+and if a single ayah takes longer than the budget allows, the worker is killed and restarted on the next search.
+"""
+
+import re
+import threading
+import time
+from functools import lru_cache
+from multiprocessing import Event, Pipe, Process
+from multiprocessing.connection import Connection
+from typing import Callable, Dict, List, Optional, Tuple
+from exceptions.database import DatabaseConnectionError, InvalidQueryError
+from .normalizer import NormalizationVariant
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+TIME_BUDGET = 2.0
+MAX_MATCHES = 2000
+CHUNK_SIZE = 256
+# Time given to the worker past the budget, or after a cancellation, to report what it found before it is killed.
+KILL_GRACE = 1.0
+
+
+@lru_cache(maxsize=64)
+def compile_pattern(pattern: str) -> "re.Pattern":
+    """Compile a pattern once, raising InvalidQueryError if it is not a valid regular expression."""
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise InvalidQueryError(pattern, str(e))
+
+
+def _scan(
+    texts: List[str],
+    numbers: List[int],
+    pattern: "re.Pattern",
+    number_range: Optional[Tuple[int, int]],
+    deadline: float,
+    max_matches: int,
+    cancel_event,
+    send: Callable[[tuple], None]
+) -> bool:
+    """Send the numbers of the matching ayahs chunk by chunk and return True if a budget stopped the scan early."""
+    first, last = number_range if number_range is not None else (numbers[0], numbers[-1])
+    matches = 0
+    chunk = []
+    for scanned, (number, text) in enumerate(zip(numbers, texts)):
+        if number < first:
+            continue
+        if number > last:
+            break
+        if pattern.search(text) is not None:
+            chunk.append(number)
+            matches += 1
+        if matches >= max_matches or time.monotonic() > deadline:
+            send(("matches", chunk))
+            return True
+        if scanned % CHUNK_SIZE == 0:
+            send(("matches", chunk))
+            chunk = []
+            if cancel_event.is_set():
+                return False
+    send(("matches", chunk))
+    return False
+
+
+def _worker_main(conn: Connection, db_path: str, cancel_event) -> None:
+    """
+    Entry point of the worker process: answer (pattern, variant, range, time budget, max matches) requests until the pipe closes.
+    An invalid pattern is reported as ("invalid", reason), any other failure, such as an error reading the database, as ("failed", message).
+    """
+    from .index import QuranIndex
+
+    index = None
+    texts: Dict[NormalizationVariant, List[str]] = {}
+    numbers: List[int] = []
+    while True:
+        try:
+            pattern, variant, number_range, time_budget, max_matches = conn.recv()
+        except EOFError:
+            return
+        try:
+            compiled = compile_pattern(pattern)
+            if index is None:
+                index = QuranIndex.get(db_path)
+                numbers = list(index.numbers)
+            if variant not in texts:
+                texts[variant] = index._load_variant_texts(variant)
+            conn.send(("started", None))
+            deadline = time.monotonic() + time_budget
+            stopped_early = _scan(texts[variant], numbers, compiled, number_range, deadline, max_matches, cancel_event, conn.send)
+            conn.send(("done", stopped_early))
+        except InvalidQueryError as e:
+            conn.send(("invalid", e.reason))
+        except Exception as e:
+            conn.send(("failed", f"{type(e).__name__}: {e}"))
+
+
+class RegexSearchEngine:
+    """Run regular expression searches in a worker process, one search at a time."""
+    _lock = threading.Lock()
+    _process: Optional[Process] = None
+    _conn: Optional[Connection] = None
+    _cancel_event = None
+    _db_path: Optional[str] = None
+
+    @classmethod
+    def _ensure_worker(cls, db_path: str) -> None:
+        if cls._process is not None and cls._process.is_alive() and cls._db_path == db_path:
+            return
+        cls._stop_worker()
+        logger.debug(f"Starting regex search worker for {db_path}.")
+        cls._conn, child_conn = Pipe()
+        cls._cancel_event = Event()
+        cls._process = Process(target=_worker_main, args=(child_conn, db_path, cls._cancel_event), daemon=True)
+        cls._process.start()
+        cls._db_path = db_path
+
+    @classmethod
+    def _stop_worker(cls) -> None:
+        if cls._process is not None:
+            if cls._process.is_alive():
+                cls._process.kill()
+            cls._process.join()
+            cls._conn.close()
+            logger.debug("Regex search worker stopped.")
+        cls._process = cls._conn = cls._cancel_event = cls._db_path = None
+
+    @classmethod
+    def shutdown(cls) -> None:
+        with cls._lock:
+            cls._stop_worker()
+
+    @classmethod
+    def find(
+        cls,
+        db_path: str,
+        pattern: str,
+        variant: NormalizationVariant = NormalizationVariant.ORIGINAL,
+        number_range: Optional[Tuple[int, int]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        time_budget: float = TIME_BUDGET,
+        max_matches: int = MAX_MATCHES
+    ) -> Optional[Tuple[List[int], bool]]:
+        """
+        Return the sorted numbers of the ayahs whose text, normalized with the variant, matches the pattern,
+        and whether the search stopped early because it ran out of time or reached max_matches.
+        Returns None if is_cancelled reports that the search became stale.
+        Raises InvalidQueryError if the pattern does not compile, and DatabaseConnectionError if the worker cannot read the ayah texts.
+        """
+        compile_pattern(pattern)
+        with cls._lock:
+            cls._ensure_worker(db_path)
+            cls._cancel_event.clear()
+            cls._conn.send((pattern, variant, number_range, time_budget, max_matches))
+            # The budget starts once the worker has the texts, loading them on its first search does not count.
+            hard_deadline = None
+            numbers: List[int] = []
+            while True:
+                if is_cancelled is not None and is_cancelled() and not cls._cancel_event.is_set():
+                    cls._cancel_event.set()
+                    hard_deadline = min(hard_deadline or float("inf"), time.monotonic() + KILL_GRACE)
+                if hard_deadline is not None and time.monotonic() > hard_deadline:
+                    logger.warning(f"Regex '{pattern}' overran its time budget inside one ayah, killing the worker.")
+                    cls._stop_worker()
+                    return None if is_cancelled is not None and is_cancelled() else (numbers, True)
+                if not cls._conn.poll(0.05):
+                    continue
+                try:
+                    kind, value = cls._conn.recv()
+                except EOFError:
+                    logger.error("Regex search worker exited unexpectedly.")
+                    cls._stop_worker()
+                    return numbers, True
+                if kind == "started":
+                    hard_deadline = time.monotonic() + time_budget + KILL_GRACE
+                elif kind == "matches":
+                    numbers.extend(value)
+                elif kind == "invalid":
+                    raise InvalidQueryError(pattern, value)
+                elif kind == "failed":
+                    logger.error(f"Regex search worker failed to search '{pattern}': {value}")
+                    raise DatabaseConnectionError(value)
+                else:
+                    if is_cancelled is not None and is_cancelled():
+                        return None
+                    if value:
+                        logger.info(f"Regex '{pattern}' stopped early with {len(numbers)} matches.")
+                    return numbers, value
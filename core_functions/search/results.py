@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+from utils.logger import LoggerManager
+
+if TYPE_CHECKING:
+    from .index import QuranIndex
+
+logger = LoggerManager.get_logger(__name__)
+
+
+class SearchResultCursor:
+    """
+    Lazy search result.
+
+    Holds only the ayah numbers of the matches, in result order, so the total is known up front,
+    and fetches the rows from the database a page at a time when they are read.
+    A bounded number of pages is kept, so scrolling back and forth does not refetch them.
+    With the index of the searched database, it also counts the results per unit (facets) and narrows them to one unit
+    without running the search again.
+    """
+    PAGE_SIZE = 100
+    MAX_CACHED_PAGES = 20
+
+    def __init__(
+        self,
+        numbers: List[int],
+        fetch_rows: Callable[[List[int]], List[sqlite3.Row]],
+        index: Optional["QuranIndex"] = None,
+        stopped_early: bool = False
+    ):
+        """
+        args:
+            numbers (List[int]): The numbers of the matching ayahs, in result order.
+            fetch_rows (Callable): Returns the rows of a list of ayah numbers, in the same order.
+            index (QuranIndex): The index of the searched database, needed for facets and narrowing.
+            stopped_early (bool): True if the search hit its time or match budget, so the numbers are only part of the matches.
+        """
+        self.numbers = numbers
+        self._fetch_rows = fetch_rows
+        self._index = index
+        self.stopped_early = stopped_early
+        self._facets = None
+        self._pages: OrderedDict[int, List[sqlite3.Row]] = OrderedDict()
+
+    @property
+    def total(self) -> int:
+        return len(self.numbers)
+
+    def _get_page(self, page: int) -> List[sqlite3.Row]:
+        rows = self._pages.get(page)
+        if rows is not None:
+            self._pages.move_to_end(page)
+            return rows
+
+        start = page * self.PAGE_SIZE
+        logger.debug(f"Fetching result rows {start} to {start + self.PAGE_SIZE} of {self.total}.")
+        rows = self._pages[page] = self._fetch_rows(self.numbers[start:start + self.PAGE_SIZE])
+        if len(self._pages) > self.MAX_CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return rows
+
+    @property
+    def facets(self) -> Dict[str, Dict[int, int]]:
+        """The number of results per unit, {criteria: {unit: count}} for every SearchCriteria, computed on first use."""
+        if self._facets is None:
+            self._facets = self._index.facets(self.numbers) if self._index is not None else {}
+        return self._facets
+
+    def narrow(self, criteria: str, unit: int) -> "SearchResultCursor":
+        """Return the results inside one unit (for example surah 2), keeping their order."""
+        first, last = self._index.unit_range(criteria, unit)
+        numbers = [number for number in self.numbers if first <= number <= last]
+        logger.debug(f"Narrowed {self.total} results to {len(numbers)} in {criteria} {unit}.")
+        return SearchResultCursor(numbers, self._fetch_rows, self._index, self.stopped_early)
+
+    def rows(self) -> Iterator[sqlite3.Row]:
+        """Yield the rows in order, fetching them page by page."""
+        for page in range((self.total + self.PAGE_SIZE - 1) // self.PAGE_SIZE):
+            yield from self._get_page(page)
+
+    def __iter__(self) -> Iterator[sqlite3.Row]:
+        return self.rows()
+
+    def __getitem__(self, index: int) -> sqlite3.Row:
+        if index < 0:
+            index += self.total
+        if not 0 <= index < self.total:
+            raise IndexError(f"Search result index out of range: {index}")
+        page, offset = divmod(index, self.PAGE_SIZE)
+        return self._get_page(page)[offset]
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+    def __repr__(self) -> str:
+        return f"SearchResultCursor(total={self.total}, stopped_early={self.stopped_early})"
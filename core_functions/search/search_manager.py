@@ -0,0 +1,341 @@
+import sqlite3
+import os
+from typing import Callable, List, Optional, Tuple
+from exceptions.database import DBNotFoundError, InvalidSearchTextError, InvalidCriteriaError, InvalidQueryError
+from utils.connection_pool import ConnectionPool
+from .cache import SearchResultCache
+from .fts import FTSSearchEngine
+from .highlight import HitHighlighter
+from .regex_search import RegexSearchEngine
+from .index import QuranIndex
+from .normalizer import NormalizationVariant, normalize
+from .query import Literal, QueryNode, QueryParser, TermNode
+from .results import SearchResultCursor
+from .types import SearchCriteria, SearchEngine, SearchMode
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+class QuranSearchManager:
+    FETCH_CHUNK_SIZE = 500
+    # Shared by every instance, so repeating a search in a new search dialog is answered from memory.
+    result_cache = SearchResultCache()
+
+    def __init__(self):
+        """Initialize the QuranSearchManager class."""
+        logger.debug("Initializing QuranSearchManager...")
+        self.no_tashkil = False
+        self.no_hamza = False
+        self.match_whole_word = False
+        self.full_normalization = False
+        self.fuzzy = False
+        self.mode = SearchMode.text
+        self.engine = SearchEngine.index
+        self.regex = False
+        self.ranked = False
+        self._criteria = None
+        self._from = None
+        self._to = None
+        self._from_ayah = None
+        self._to_ayah = None
+        self._number_range = None
+        self._db_path = os.path.join("database", "quran", 'Verses.DB')
+        self._last_search = None
+        self._connect()
+        logger.debug("QuranSearchManager initialized.")
+
+    def set(self, no_tashkil:bool=False, no_hamza:bool=False, match_whole_word:bool=False, criteria:str = SearchCriteria.page, _from:int = 1, _to:int = 604, from_ayah:int=None, to_ayah:int=None, full_normalization:bool=False, engine:str = SearchEngine.index, fuzzy:bool=False, mode:str = SearchMode.text, regex:bool=False, ranked:bool=False) -> None:
+        """
+        Set the parameters for the search.
+
+        :param 
+        no_tashkil: If True, ignore tashkil (diacritics) in the search.
+        no_hamza: If True, ignore hamza in the search.
+        match_whole_word: If True, match the whole word in the search.
+        criteria: The criteria for the search (e.g., page, sura_number, hizb, juz, quarter).
+        _from: The starting value for the criteria.
+        _to: The ending value for the criteria.
+        from_ayah: The starting ayah. With the sura criteria it is the ayah number inside the _from surah, otherwise a global ayah number.
+        to_ayah: The ending ayah. With the sura criteria it is the ayah number inside the _to surah, otherwise a global ayah number.
+        full_normalization: If True, also fold tatweel, alef maqsura, ta marbuta and superscript alef, on top of ignoring tashkil and hamza.
+        engine: The search engine, the in-memory index or the FTS5 table (see SearchEngine). Queries FTS5 cannot answer exactly, like words matched as substrings, use the index engine.
+        fuzzy: If True, also find the ayahs matching the text with a few typos, best matches first. Uses the index engine.
+        mode: Match the words as written, or every word sharing their stem or root (see SearchMode). Uses the index engine.
+        regex: If True, the search text is a regular expression matched against the normalized ayah texts, see regex_search.
+        ranked: If True, the FTS5 engine returns the best matches first by bm25 rank instead of in Quran order.
+        """
+        logger.debug(f"Setting parameters: no_tashkil={no_tashkil}, no_hamza={no_hamza}, match_whole_word={match_whole_word}, fuzzy={fuzzy}, mode={mode}, ranked={ranked}, full_normalization={full_normalization}, engine={engine}, criteria={criteria}, _from={_from}, _to={_to}, from_ayah={from_ayah}, to_ayah={to_ayah}")
+
+        if not  SearchCriteria.is_valid(criteria):
+            logger.error(f"Invalid criteria: {criteria}. Must be one of {SearchCriteria.get_arabic_criteria()}.")
+            raise InvalidCriteriaError(criteria)
+
+        if not SearchMode.is_valid(mode):
+            logger.warning(f"Invalid search mode: {mode}. Matching the words as written.")
+            mode = SearchMode.text
+
+        if not SearchEngine.is_valid(engine):
+            logger.warning(f"Invalid search engine: {engine}. Using the index engine.")
+            engine = SearchEngine.index
+
+        #Get surah number if the input is surah  name
+        if  criteria == SearchCriteria.sura and isinstance(_from, str):
+            logger.debug(f"Converting surah name '{_from}' to surah number...")
+            _from = self._fetchone("SELECT DISTINCT sura_number AS 'number' FROM quran WHERE sura_name LIKE '%' || ? || '%';", (_from,))['number']
+        if  criteria == SearchCriteria.sura and isinstance(_to, str):
+            logger.debug(f"Converting surah name '{_to}' to surah number...")
+            _to = self._fetchone("SELECT DISTINCT sura_number AS 'number' FROM quran WHERE sura_name LIKE '%' || ? || '%';", (_to,))['number']
+
+        if not isinstance(_from, int) or _from < 1:
+            logger.warning(f"Invalid 'from' value: {_from}. Setting to 1.")
+            _from = 1
+
+        if _to < _from:
+            logger.warning(f"Invalid 'to' value: {_to}. Setting 'to' to 'from' value: {_from}.")
+            _to = _from
+
+        if not isinstance(_to, int) or _to <1:
+            logger.debug(f"Invalid 'to' value: {_to}. Fetching max value for {criteria}.")
+            _to = self._fetchone(f"SELECT DISTINCT MAX({criteria}) AS 'max' FROM quran;")["max"]
+
+# Set attributes
+        self.no_tashkil = no_tashkil
+        self.no_hamza = no_hamza
+        self.match_whole_word = match_whole_word
+        self.full_normalization = full_normalization
+        self.fuzzy = fuzzy
+        self.mode = mode
+        self.engine = engine
+        self.regex = regex
+        self.ranked = ranked
+        self._from = _from
+        self._to = _to
+        self._from_ayah = from_ayah
+        self._to_ayah = to_ayah
+        self._criteria = criteria
+        self._number_range = None
+        logger.info(f"Parameters set: no_tashkil={self.no_tashkil}, no_hamza={self.no_hamza}, match_whole_word={self.match_whole_word}, fuzzy={self.fuzzy}, mode={self.mode}, ranked={self.ranked}, full_normalization={self.full_normalization}, engine={self.engine}, regex={self.regex}, criteria={self._criteria}, _from={self._from}, _to={self._to}, from_ayah={self._from_ayah}, to_ayah={self._to_ayah}.")
+
+    def _connect(self):
+        """Check the Quran database, its connections are taken from the connection pool for each query."""
+        file_path = self._db_path
+        if not os.path.isfile(file_path):
+            logger.error(f"Database file not found: {file_path}")
+            raise DBNotFoundError(file_path)
+
+    def _fetchone(self, query: str, parameters: tuple = ()) -> Optional[sqlite3.Row]:
+        """Run a query on a pooled read-only connection and return its first row."""
+        with ConnectionPool.connection(self._db_path) as conn:
+            return conn.execute(query, parameters).fetchone()
+
+    def _fts_available(self) -> bool:
+        with ConnectionPool.connection(self._db_path) as conn:
+            return FTSSearchEngine.is_available(conn)
+    
+    @property
+    def normalization_variant(self) -> NormalizationVariant:
+        """The normalization variant matching the current options. Stem and root search always fold the text fully."""
+        if self.mode != SearchMode.text:
+            return NormalizationVariant.FULL
+        return NormalizationVariant.from_options(self.no_tashkil, self.no_hamza, self.full_normalization)
+
+    @property
+    def options_key(self) -> tuple:
+        """Every option that changes the result of a query."""
+        return (self.normalization_variant, self.match_whole_word, self.fuzzy, self.mode, self.engine, self.ranked, self.number_range)
+
+    @property
+    def number_range(self) -> Optional[Tuple[int, int]]:
+        """
+        The searched range as an interval of global ayah numbers, or None to search the whole Quran.
+        Every unit is contiguous in the Quran, so the criteria range and the ayah range always resolve to one interval,
+        which is computed from the unit boundaries of the index once per set().
+        """
+        if self._number_range is None and (self._criteria is not None or self._from_ayah is not None or self._to_ayah is not None):
+            self._number_range = self._resolve_number_range(QuranIndex.get(self._db_path))
+        return self._number_range
+
+    def _resolve_number_range(self, index: QuranIndex) -> Tuple[int, int]:
+        first, last = index.numbers[0], index.numbers[-1]
+        if self._criteria is not None:
+            first = index.unit_range(self._criteria, self._from)[0]
+            last = index.unit_range(self._criteria, self._to)[1]
+
+        if self._criteria == SearchCriteria.sura:
+            if self._from_ayah is not None:
+                first = min(first + self._from_ayah - 1, index.unit_range(self._criteria, self._from)[1])
+            if self._to_ayah is not None:
+                surah_first, surah_last = index.unit_range(self._criteria, self._to)
+                last = min(surah_first + self._to_ayah - 1, surah_last)
+        else:
+            if self._from_ayah is not None:
+                first = max(first, self._from_ayah)
+            if self._to_ayah is not None:
+                last = min(last, self._to_ayah)
+
+        if last < first:
+            logger.warning(f"Empty search range: {first} to {last}.")
+        logger.debug(f"Search range resolved to ayah numbers {first} to {last}.")
+        return first, last
+
+    def ayah_position(self, number: int) -> Tuple[int, int]:
+        """Return the (surah number, ayah number in the surah) of a global ayah number."""
+        index = QuranIndex.get(self._db_path)
+        sura_number = index.unit_of(SearchCriteria.sura, number)
+        return sura_number, number - index.unit_range(SearchCriteria.sura, sura_number)[0] + 1
+
+    def search(self, search_text:str, is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[SearchResultCursor]:
+        """
+        Search for the given text in the Quran database.
+        The text may use the query language of core_functions.search.query (AND, OR, NOT, "phrases", NEAR/n, prefix*).
+        Raises InvalidQueryError if the query cannot be parsed.
+
+        When the text only extends the previous search with the same options, as while typing,
+        the previous result is refined instead of searching the whole Quran again.
+        is_cancelled is polled during long searches, which return None once it reports True.
+
+        Returns a SearchResultCursor: the total is known immediately and the rows are fetched as they are read.
+        """
+        logger.debug(f"Starting search with text: '{search_text}'")
+        
+        if  not isinstance(search_text, str):
+            logger.error(f"Invalid search text type: {type(search_text)}. Must be a string.")
+            raise InvalidSearchTextError(search_text)
+
+        if not search_text:
+            logger.warning("Empty search text provided. Returning None.")
+            return None
+
+        if self.regex:
+            return self._search_regex(search_text, is_cancelled)
+
+        query = self.parse_query(search_text)
+        options_key = self.options_key
+        cache_key = (repr(query), options_key)
+
+        try:
+            numbers = cached_numbers = self.result_cache.get(self._db_path, cache_key)
+            if cached_numbers is not None:
+                logger.debug(f"Search result for '{search_text}' found in cache.")
+            elif self.mode != SearchMode.text:
+                numbers = self._find_in_index(query)
+            elif self.fuzzy and isinstance(query, TermNode):
+                numbers = self._find_fuzzy(query, is_cancelled)
+            elif self._can_refine(query, options_key):
+                logger.debug(f"Refining the {len(self._last_search[2])} results of the previous search.")
+                numbers = QuranIndex.get(self._db_path).refine(self._last_search[2], query, self.normalization_variant, self.match_whole_word, is_cancelled)
+            elif self.engine == SearchEngine.fts5 and not self.fuzzy and self._fts_available() and FTSSearchEngine.supports(query, self.match_whole_word):
+                with ConnectionPool.connection(self._db_path) as conn:
+                    numbers = FTSSearchEngine.find(conn, query, self.normalization_variant, self.match_whole_word, self.number_range, self.ranked)
+                logger.debug(f"FTS5 lookup returned {len(numbers)} ayahs.")
+            else:
+                if self.fuzzy:
+                    logger.warning("Fuzzy search only applies to plain text, running the query as is.")
+                elif self.engine == SearchEngine.fts5 and not self._fts_available():
+                    logger.warning(f"FTS5 table not found in {self._db_path}, falling back to the index engine. Run the search database builder to create it.")
+                elif self.engine == SearchEngine.fts5:
+                    logger.info("The query matches part of a word or negates alone, which FTS5 cannot answer exactly, falling back to the index engine.")
+                numbers = self._find_in_index(query)
+        except sqlite3.Error as e:
+            logger.error(f"Search query execution failed: {e}", exc_info=True)
+            return SearchResultCursor([], self._fetch_rows, QuranIndex.get(self._db_path))
+
+        if numbers is None or (is_cancelled is not None and is_cancelled()):
+            logger.debug(f"Search for '{search_text}' cancelled.")
+            return None
+
+        if cached_numbers is None:
+            numbers = self.result_cache.put(self._db_path, cache_key, numbers)
+        self._last_search = (options_key, query, numbers)
+        logger.info(f"Search completed. Found {len(numbers)} results.")
+        return SearchResultCursor(numbers, self._fetch_rows, QuranIndex.get(self._db_path))
+
+    def highlighter(self, search_text: str) -> HitHighlighter:
+        """Return a HitHighlighter finding the words of the search text, or its pattern in regex mode, in the displayed ayahs."""
+        if self.regex:
+            return HitHighlighter(pattern=normalize(search_text, self.normalization_variant))
+        try:
+            query = self.parse_query(search_text)
+        except InvalidQueryError:
+            return HitHighlighter()
+        return HitHighlighter([" ".join(term.tokens) for term in query.terms()])
+
+    def _search_regex(self, search_text: str, is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[SearchResultCursor]:
+        """
+        Search with a regular expression in a worker process, bounded in time and in matches (see RegexSearchEngine).
+        A result cut short by a budget is flagged with stopped_early and is not cached.
+        """
+        pattern = normalize(search_text, self.normalization_variant)
+        cache_key = ("regex", pattern, self.options_key)
+        self._last_search = None
+        numbers = self.result_cache.get(self._db_path, cache_key)
+        stopped_early = False
+        if numbers is None:
+            found = RegexSearchEngine.find(self._db_path, pattern, self.normalization_variant, self.number_range, is_cancelled)
+            if found is None:
+                logger.debug(f"Regex search for '{search_text}' cancelled.")
+                return None
+            numbers, stopped_early = found
+            if not stopped_early:
+                numbers = self.result_cache.put(self._db_path, cache_key, numbers)
+        logger.info(f"Regex search completed. Found {len(numbers)} results{', stopped early' if stopped_early else ''}.")
+        return SearchResultCursor(numbers, self._fetch_rows, QuranIndex.get(self._db_path), stopped_early)
+
+    def _can_refine(self, query: QueryNode, options_key: tuple) -> bool:
+        """Return True if the previous result can be filtered to answer the query (see Literal.refines)."""
+        if self._last_search is None or self.engine != SearchEngine.index or self.fuzzy or self.mode != SearchMode.text:
+            return False
+        last_options_key, last_query, _ = self._last_search
+        return last_options_key == options_key and isinstance(query, Literal) and query.refines(last_query, self.match_whole_word)
+
+    def parse_query(self, search_text: str) -> QueryNode:
+        """Normalize the search text with the current options and parse it into a query plan."""
+        return QueryParser.parse(normalize(search_text, self.normalization_variant))
+
+    def _find_in_index(self, query: QueryNode) -> List[int]:
+        """Return the numbers of the ayahs matching the query plan using the in-memory inverted index."""
+        index = QuranIndex.get(self._db_path)
+        numbers = index.find(query, self.normalization_variant, self.match_whole_word, self.mode)
+        logger.debug(f"Index lookup returned {len(numbers)} ayahs.")
+        return self._filter_by_range(numbers)
+
+    def _find_fuzzy(self, query: TermNode, is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[List[int]]:
+        """Return the numbers of the ayahs matching the query with a few typos, best matches first."""
+        index = QuranIndex.get(self._db_path)
+        numbers = index.fuzzy_find(query, self.normalization_variant, self.match_whole_word, is_cancelled)
+        if numbers is None:
+            return None
+        logger.debug(f"Fuzzy lookup returned {len(numbers)} ayahs.")
+        return self._filter_by_range(numbers)
+
+    def _filter_by_range(self, numbers: List[int]) -> List[int]:
+        """Keep the numbers inside the searched range (see number_range), preserving their order."""
+        if self.number_range is None:
+            return numbers
+        first, last = self.number_range
+        return [number for number in numbers if first <= number <= last]
+
+    def _fetch_rows(self, numbers: List[int]) -> list:
+        """
+        Fetch the rows of the given ayah numbers by primary key, in chunks to stay below SQLite's variable limit.
+        The rows keep the order of the numbers, which fuzzy search ranks by relevance.
+        """
+        rows = []
+        with ConnectionPool.connection(self._db_path) as conn:
+            for start in range(0, len(numbers), self.FETCH_CHUNK_SIZE):
+                chunk = numbers[start:start + self.FETCH_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                rows_by_number = {row["number"]: row for row in conn.execute(f"SELECT * FROM quran WHERE number IN ({placeholders});", chunk)}
+                rows.extend(rows_by_number[number] for number in chunk)
+        return rows
+
+    def __str__(self) -> str:
+        """Return a string representation of the QuranSearchManager."""
+        return "Quran Search Manager Information:\n" \
+            "No Tashkil: {}\n" \
+            "No Hamza: {}\n" \
+            "Criteria: {}\n" \
+            "From: {}\n" \
+            "To: {}\n" \
+            "From Ayah: {}\n" \
+            "To Ayah: {}\n".format(self.no_tashkil, self.no_hamza, self._criteria, self._from, self._to, self._from_ayah, self._to_ayah)
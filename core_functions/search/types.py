@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+
+class SearchCriteria:
+    page = "page"
+    sura = "sura_number"
+    hizb = "hizb"
+    juz = "juz"
+    quarter = "hizbQuarter"
+    _arabic_criteria_dict = {
+        "صفحة": page,
+        "سورة": sura,
+        "الحزب": hizb,
+        "الجزء": juz,
+        "الربع": quarter
+    }
+
+    @classmethod
+    def is_valid(cls, criteria) -> bool:
+        return criteria in cls._arabic_criteria_dict.values()
+
+    @classmethod
+    def get_criteria_by_arabic_name(cls, arabic_criteria) -> str:
+        return cls._arabic_criteria_dict.get(arabic_criteria)
+
+    @classmethod
+    def get_arabic_criteria(cls) -> list:
+        return list(cls._arabic_criteria_dict.keys())
+
+    @classmethod
+    def get_criteria(cls) -> list:
+        return list(cls._arabic_criteria_dict.values())
+
+
+class SearchEngine:
+    index = "index"
+    fts5 = "fts5"
+
+    @classmethod
+    def is_valid(cls, engine) -> bool:
+        return engine in (cls.index, cls.fts5)
+
+
+class SearchMode:
+    text = "text"
+    stem = "stem"
+    root = "root"
+    _arabic_mode_dict = {
+        "الكلمة كما كتبت": text,
+        "الجذع": stem,
+        "الجذر": root
+    }
+
+    @classmethod
+    def is_valid(cls, mode) -> bool:
+        return mode in cls._arabic_mode_dict.values()
+
+    @classmethod
+    def get_mode_by_arabic_name(cls, arabic_mode) -> str:
+        return cls._arabic_mode_dict.get(arabic_mode)
+
+    @classmethod
+    def get_arabic_modes(cls) -> list:
+        return list(cls._arabic_mode_dict.keys())
@@ -1,6 +1,7 @@
 import sqlite3
 import os
 from exceptions.database import DBNotFoundError
+from utils.connection_pool import ConnectionPool
 from utils.logger import LoggerManager
 
 logger = LoggerManager.get_logger(__name__)
@@ -40,7 +41,7 @@ class TafaseerManager:
     def __init__(self) -> None:
         logger.debug("Initializing TafaseerManager...")
         self._tafaseer_category = None
-        self._conn = None  
+        self._file_path = None
         logger.debug("TafaseerManager initialized.")
 
     def set(self, tafaseer_category: str) -> None:
@@ -64,22 +65,21 @@ class TafaseerManager:
             logger.error(f"Database file not found: {file_path}")
             raise DBNotFoundError(file_path)
         
-        self._conn = sqlite3.connect(file_path)
-        self._conn.row_factory = sqlite3.Row 
-        self._cursor = self._conn.cursor()
+        # The connections are taken from the connection pool for each query.
+        self._file_path = file_path
         logger.info(f"Database connection established successfully: {file_path}.")
 
     def get_tafaseer(self, surah_number, ayah_number) -> str:
         """Fetch tafseer for a specific Surah and Ayah."""
         logger.debug(f"Fetching tafseer for Surah {surah_number}, Ayah {ayah_number}...")
-        assert self._conn is not None, "You must connect to database first."
+        assert self._file_path is not None, "You must connect to database first."
         assert 1 <= surah_number <= 114, "Out of surah range."
         assert 1 <= ayah_number, "Out of ayah range."
         
         query = "SELECT text FROM tafsir_{} WHERE number = ?".format(surah_number)
         try:
-            self._cursor.execute(query, [ayah_number])
-            result = self._cursor.fetchone()
+            with ConnectionPool.connection(self._file_path) as conn:
+                result = conn.execute(query, [ayah_number]).fetchone()
             logger.info(f"Fetched tafseer for Surah {surah_number}, Ayah {ayah_number}.")
             return self.get_text(result)
         except sqlite3.Error as e:
@@ -106,10 +106,3 @@ class TafaseerManager:
 
     def __str__(self) -> str:
         return "Category: {}".format(self._tafaseer_category)
-
-    def __del__(self):
-        """Close the database connection when the object is deleted."""
-        logger.debug("Deleting TafaseerManager object and closing database connecting...")
-        if self._conn:
-            self._conn.close()
-            logger.info("Deleted TafaseerManager object Database connection closed.")          
@@ -16,3 +16,8 @@ class InvalidSearchTextError(BaseException):
     def __init__(self, search_text):
         super().__init__(f"Invalid search text: '{search_text}'", None, 104)
 
+
+class InvalidQueryError(BaseException):
+    def __init__(self, query: str, reason: str = ""):
+        super().__init__(f"Invalid search query: '{query}' {reason}".rstrip(), None, 105)
+        self.reason = reason
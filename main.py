@@ -27,6 +27,7 @@ from PyQt6.QtCore import QTimer, Qt, QSharedMemory, QEvent
 from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 from ui.quran_interface import QuranInterface
 from core_functions.athkar.athkar_scheduler import AthkarScheduler
+from core_functions.search import CorpusSearchManager, RegexSearchEngine
 from utils.update import UpdateManager
 from utils.audio_player import StartupSoundEffectPlayer, VolumeController
 
@@ -168,6 +169,8 @@ def main():
         logger.info("QApplication initialized successfully.")
         app.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
         logger.info("Layout direction set to RightToLeft.")
+        app.aboutToQuit.connect(CorpusSearchManager.shutdown)
+        app.aboutToQuit.connect(RegexSearchEngine.shutdown)
         main_window = QuranInterface(program_name)
         logger.info("Main window initialized successfully.")
         app.set_main_window(main_window)
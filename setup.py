@@ -18,9 +18,17 @@ def get_pyqt_dll_files():
     dll_files = ["Qt6Core.dll", "Qt6Gui.dll", "Qt6Widgets.dll", "Qt6Network.dll"]
     return [(os.path.join(pyqt_path, "Qt6", "bin", file), os.path.join("lib", file)) for file in dll_files]
 
+def get_database_folder():
+    # build.bat builds the optimized databases first (python -m core_functions.database_builder), fall back to the sources.
+    database_dir = os.environ.get("ALBAYAN_DATABASE_DIR", "albayan_database")
+    if os.path.isfile(os.path.join(database_dir, "manifest.json")):
+        return database_dir
+    print(f"Optimized databases not found in {database_dir}, packaging the database folder as is.")
+    return "database"
+
 def get_include_files():
     base_files = [
-        ("database", "database"),
+        (get_database_folder(), "database"),
         ("documentation", "documentation"),
         ("Audio", "Audio"),
         ("bass.dll", "bass.dll"),
@@ -112,7 +112,9 @@ class CustomRangeDialog(QDialog):
             )
             for combo, value in widgets:
                 if value is not None:
-                    index = combo.findData(value)
+                    index = combo.findData(value) if combo in (self.combo_surah_from, self.combo_surah_to) else value - 1
+                    if index >= combo.count():
+                        index = -1
                     if index != -1:
                         combo.setCurrentIndex(index)
                     else:
@@ -127,8 +129,8 @@ class CustomRangeDialog(QDialog):
         surah_number = combo_surah.currentData()
         if surah_number is not None and 1 <= surah_number <= len(self.surahs):
             surah = self.surahs[surah_number - 1]
-            for ayah_number in range(1, surah.ayah_count + 1):
-                combo_ayah.addItem(str(ayah_number), ayah_number)
+            # Item i is ayah i + 1, so the items are added in one call without per item data.
+            combo_ayah.addItems([str(ayah_number) for ayah_number in range(1, surah.ayah_count + 1)])
         else:
             logger.warning("Invalid surah number for updating ayahs.")
 
@@ -145,11 +147,16 @@ class CustomRangeDialog(QDialog):
         """
         return {
             "from_surah": self.combo_surah_from.currentData(),
-            "from_ayah": self.combo_ayah_from.currentData(),
+            "from_ayah": self.get_ayah_number(self.combo_ayah_from),
             "to_surah": self.combo_surah_to.currentData(),
-            "to_ayah": self.combo_ayah_to.currentData()
+            "to_ayah": self.get_ayah_number(self.combo_ayah_to)
         }
 
+    @staticmethod
+    def get_ayah_number(combo_ayah: QComboBox) -> Optional[int]:
+        index = combo_ayah.currentIndex()
+        return index + 1 if index != -1 else None
+
 
 
     def reject(self):
@@ -12,13 +12,15 @@ from PyQt6.QtWidgets import (
     QGroupBox,
     QLineEdit,
     QCheckBox,
-QListWidget,
-QListWidgetItem,
+QListView,
 QMessageBox,
+    QTreeWidget,
+    QTreeWidgetItem,
 )
-from PyQt6.QtCore import Qt, QRegularExpression, pyqtSignal
+from PyQt6.QtCore import Qt, QRegularExpression, pyqtSignal, QAbstractListModel, QModelIndex, QThread, QTimer
 from PyQt6.QtGui import QKeyEvent, QKeySequence,  QRegularExpressionValidator, QShortcut
-from core_functions.search import SearchCriteria, QuranSearchManager
+from core_functions.search import SearchCriteria, SearchMode, QuranSearchManager, SearchResultCursor, CorpusSearchManager, CorpusSearchResult, HitHighlighter
+from exceptions.database import InvalidQueryError
 from core_functions.quran.quran_manager import QuranManager
 from ui.widgets.search_box import ArabicSearchBox
 from utils.settings import Config
@@ -28,8 +30,81 @@ from utils.logger import LoggerManager
 
 logger = LoggerManager.get_logger(__name__)
 
+STOPPED_EARLY_NOTE = " توقف البحث مبكرًا لطول مدته أو لكثرة النتائج، لذا قد لا تظهر كل النتائج."
+
+class SearchWorker(QThread):
+    """
+    Run one search off the GUI thread.
+    A search that is no longer wanted is retired instead of waited for: it stops reporting at once and its thread ends
+    on its own, so a regular expression that takes a while to stop never blocks the window.
+    """
+    search_finished = pyqtSignal(str, object)
+    # The search text and the reason the query is invalid.
+    search_failed = pyqtSignal(str, str)
+    # The search text of a search that failed for another reason, a database error for instance.
+    search_error = pyqtSignal(str)
+    # Retired workers whose thread still runs, kept alive until it ends.
+    _retired = set()
+
+    def __init__(self, search_manager: QuranSearchManager, search_text: str, parent=None):
+        super().__init__(parent)
+        self.search_manager = search_manager
+        self.search_text = search_text
+
+    def retire(self):
+        self.requestInterruption()
+        if self.isRunning():
+            logger.debug(f"Cancelling search for '{self.search_text}'.")
+            self.setParent(None)
+            SearchWorker._retired.add(self)
+            self.finished.connect(lambda: SearchWorker._retired.discard(self))
+
+    def run(self):
+        search_text = self.search_text
+        try:
+            search_result = self.search_manager.search(search_text, is_cancelled=self.isInterruptionRequested)
+        except InvalidQueryError as e:
+            self.search_failed.emit(search_text, e.reason)
+            return
+        except Exception as e:
+            logger.error(f"Search for '{search_text}' failed: {e}", exc_info=True)
+            self.search_error.emit(search_text)
+            return
+
+        if search_result is not None and not self.isInterruptionRequested():
+            self.search_finished.emit(search_text, search_result)
+
+
+class CorpusSearchWorker(QThread):
+    """Search the tafaseer and the other corpora off the GUI thread, reporting the merged result each time a corpus finishes."""
+    result_updated = pyqtSignal(object)
+    search_failed = pyqtSignal(str)
+
+    def __init__(self, corpus_search_manager: CorpusSearchManager, search_text: str, parent=None):
+        super().__init__(parent)
+        self.corpus_search_manager = corpus_search_manager
+        self.search_text = search_text
+
+    def cancel(self):
+        if self.isRunning():
+            logger.debug(f"Cancelling corpus search for '{self.search_text}'.")
+            self.requestInterruption()
+            self.wait()
+
+    def run(self):
+        try:
+            for search_result in self.corpus_search_manager.search(self.search_text, is_cancelled=self.isInterruptionRequested):
+                self.result_updated.emit(search_result.snapshot())
+        except InvalidQueryError:
+            self.search_failed.emit(self.search_text)
+        except Exception as e:
+            logger.error(f"Corpus search for '{self.search_text}' failed: {e}", exc_info=True)
+            self.search_failed.emit(self.search_text)
+
+
 class SearchDialog(QDialog):
     search_submitted = pyqtSignal(str)
+    LIVE_SEARCH_DELAY = 250
     
     def __init__(self, parent, title, default_search_phrase: str = ""):
         super().__init__(parent)
@@ -40,6 +115,10 @@ class SearchDialog(QDialog):
         self.search_manager = QuranSearchManager()
         self.reset_search_options()
         self.criteria = None
+        # The text of the search started by the search button, its results are shown when the worker finishes.
+        self.submitted_text = None
+        # The last (search text, options, result) found by the worker, reused when the same search is submitted.
+        self.last_result = None
         self.initUI()
         logger.debug(f"SearchDialog initialized with title: {title}.")
 
@@ -47,12 +126,24 @@ class SearchDialog(QDialog):
         self.search_label = QLabel('اكتب ما تريد البحث عنه:')
         self.search_box = ArabicSearchBox(self)
         self.search_box.setText(self.default_search_phrase)
-        regex = QRegularExpression("[\u0621-\u0652\u0670\u0671[:space:]]+")  # Arabic letters, hamzas, diacritics, and spaces.
-        validator = QRegularExpressionValidator(regex)
-        self.search_box.setValidator(validator)
+        regex = QRegularExpression("[\u0621-\u0652\u0670\u0671A-Z0-9\"*()/[:space:]]+")  # Arabic letters, hamzas, diacritics, spaces and the query operators.
+        self.search_validator = QRegularExpressionValidator(regex)
+        self.search_box.setValidator(self.search_validator)
         self.search_box.inputRejected.connect(QApplication.beep)
         self.search_box.textChanged.connect(self.OnEdit)
         self.search_box.setAccessibleName(self.search_label.text())
+        self.search_scope_label = QLabel('البحث في:')
+        self.search_scope_combobox = QComboBox()
+        self.search_scope_combobox.addItem('القرآن الكريم', False)
+        self.search_scope_combobox.addItem('التفاسير وأسباب النزول والإعراب', True)
+        self.search_scope_combobox.setAccessibleName(self.search_scope_label.text())
+        self.search_scope_combobox.currentIndexChanged.connect(self.OnEdit)
+        self.live_results_label = QLabel()
+        self.live_search_timer = QTimer(self)
+        self.live_search_timer.setSingleShot(True)
+        self.live_search_timer.setInterval(self.LIVE_SEARCH_DELAY)
+        self.live_search_timer.timeout.connect(self.start_live_search)
+        self.search_worker = None
         self.advanced_search_checkbox = QCheckBox('البحث المتقدم')
         self.advanced_search_checkbox.toggled.connect(self.show_advanced_options)
         self.search_button = QPushButton('بحث')
@@ -76,12 +167,26 @@ class SearchDialog(QDialog):
         self.search_to_label = QLabel('إلى:')
         self.search_to_combobox = QComboBox()
         self.search_to_combobox.setAccessibleName(self.search_to_label.text())
+        self.ayah_from_label = QLabel('من الآية:')
+        self.ayah_from_combobox = QComboBox()
+        self.ayah_from_combobox.setAccessibleName(self.ayah_from_label.text())
+        self.ayah_to_label = QLabel('إلى الآية:')
+        self.ayah_to_combobox = QComboBox()
+        self.ayah_to_combobox.setAccessibleName(self.ayah_to_label.text())
         self.ignore_diacritics_checkbox = QCheckBox('تجاهل التشكيل')
         self.ignore_diacritics_checkbox.setChecked(Config.search.ignore_tashkeel)
         self.ignore_hamza_checkbox = QCheckBox('تجاهل الهمزات')
         self.ignore_hamza_checkbox.setChecked(Config.search.ignore_hamza)
         self.match_whole_word_checkbox = QCheckBox('تطابق الكلمة بأكملها')
         self.match_whole_word_checkbox.setChecked(Config.search.match_whole_word)
+        self.fuzzy_search_checkbox = QCheckBox('البحث التقريبي')
+        self.fuzzy_search_checkbox.setChecked(Config.search.fuzzy_search)
+        self.regex_search_checkbox = QCheckBox('البحث بالتعابير النمطية')
+        self.regex_search_checkbox.toggled.connect(self.update_validator)
+        self.search_mode_label = QLabel('البحث عن:')
+        self.search_mode_combobox = QComboBox()
+        self.search_mode_combobox.addItems(SearchMode.get_arabic_modes())
+        self.search_mode_combobox.setAccessibleName(self.search_mode_label.text())
 
         self.search_type_layout = QVBoxLayout()
         self.search_type_layout.addWidget(self.search_type_radio_page)
@@ -96,19 +201,33 @@ class SearchDialog(QDialog):
         self.search_from_to_layout.addWidget(self.search_to_label)
         self.search_from_to_layout.addWidget(self.search_to_combobox)
 
+        self.ayah_from_to_layout = QHBoxLayout()
+        self.ayah_from_to_layout.addWidget(self.ayah_from_label)
+        self.ayah_from_to_layout.addWidget(self.ayah_from_combobox)
+        self.ayah_from_to_layout.addWidget(self.ayah_to_label)
+        self.ayah_from_to_layout.addWidget(self.ayah_to_combobox)
+
         self.search_options_layout = QVBoxLayout()
         self.search_options_layout.addWidget(self.search_type_label)
         self.search_options_layout.addLayout(self.search_type_layout)
         self.search_options_layout.addLayout(self.search_from_to_layout)
+        self.search_options_layout.addLayout(self.ayah_from_to_layout)
         self.search_options_layout.addWidget(self.ignore_diacritics_checkbox)
         self.search_options_layout.addWidget(self.ignore_hamza_checkbox)
         self.search_options_layout.addWidget(self.match_whole_word_checkbox)
+        self.search_options_layout.addWidget(self.fuzzy_search_checkbox)
+        self.search_options_layout.addWidget(self.regex_search_checkbox)
+        self.search_options_layout.addWidget(self.search_mode_label)
+        self.search_options_layout.addWidget(self.search_mode_combobox)
 
         self.advanced_search_groupbox.setLayout(self.search_options_layout)
 
         main_layout = QVBoxLayout()
         main_layout.addWidget(self.search_label)
         main_layout.addWidget(self.search_box)
+        main_layout.addWidget(self.search_scope_label)
+        main_layout.addWidget(self.search_scope_combobox)
+        main_layout.addWidget(self.live_results_label)
         main_layout.addWidget(self.advanced_search_checkbox)
         main_layout.addWidget(self.advanced_search_groupbox)
         main_layout.addWidget(self.search_button)
@@ -116,7 +235,8 @@ class SearchDialog(QDialog):
 
         self.setLayout(main_layout)
 
-        self.sura = [surah.name for surah in self.parent.quran_manager.get_surahs()]
+        self.surahs = self.parent.quran_manager.get_surahs()
+        self.sura = [surah.name for surah in self.surahs]
         self.pages = ["{}".format(i) for i in range(1, QuranManager.MAX_PAGE + 1)]
         self.quarters = ["{}".format(i) for i in range(1, QuranManager.MAX_QUARTER + 1)]
         self.jus = ["{}".format(i) for i in range(1, QuranManager.MAX_JUZ + 1)]
@@ -129,6 +249,8 @@ class SearchDialog(QDialog):
         self.search_type_radio_juz.toggled.connect(self.on_radio_toggled)
         self.search_type_radio_hizb.toggled.connect(self.on_radio_toggled)
         self.search_type_radio_quarter.toggled.connect(self.on_radio_toggled)
+        self.search_from_combobox.currentIndexChanged.connect(lambda: self.update_ayahs(self.search_from_combobox, self.ayah_from_combobox))
+        self.search_to_combobox.currentIndexChanged.connect(lambda: self.update_ayahs(self.search_to_combobox, self.ayah_to_combobox))
         close_shortcut = QShortcut(QKeySequence("Ctrl+F4"), self)
         close_shortcut.activated.connect(self.reject)
 
@@ -136,23 +258,103 @@ class SearchDialog(QDialog):
         self.OnEdit()
 
     def OnEdit(self):
+        self.submitted_text = None
         self.search_button.setEnabled(bool(self.search_box.text()))
         logger.debug(f"User edited search box: {self.search_box.text()}.")
+        self.live_search_timer.start()
+
+    def start_live_search(self):
+        """Search the current text in the background, refining the previous result when the text was only extended."""
+        self.cancel_search()
+        search_text = self.search_box.text()
+        if not search_text.strip() or self.search_scope_combobox.currentData():
+            self.live_results_label.clear()
+            return
+        self.set_options_search()
+        self.start_search(search_text)
+
+    def start_search(self, search_text: str):
+        self.search_worker = SearchWorker(self.search_manager, search_text, self)
+        self.search_worker.search_finished.connect(self.on_live_search_finished)
+        self.search_worker.search_failed.connect(self.on_live_search_failed)
+        self.search_worker.search_error.connect(self.on_search_error)
+        self.search_worker.start()
+
+    def cancel_search(self):
+        if self.search_worker is not None:
+            self.search_worker.retire()
+            self.search_worker = None
+
+    def on_live_search_finished(self, search_text: str, search_result: SearchResultCursor):
+        if self.sender() is not self.search_worker or search_text != self.search_box.text():
+            return
+        self.last_result = (search_text, self.search_manager.options_key, search_result)
+        self.live_results_label.setText("عدد النتائج: {}.{}".format(len(search_result), STOPPED_EARLY_NOTE if search_result.stopped_early else ""))
+        logger.debug(f"Live search for '{search_text}' found {len(search_result)} results.")
+        if search_text == self.submitted_text:
+            self.submitted_text = None
+            self.search_button.setEnabled(True)
+            self.show_results(search_text, search_result)
+
+    def on_live_search_failed(self, search_text: str, reason: str):
+        if self.sender() is not self.search_worker or search_text != self.search_box.text():
+            return
+        if search_text == self.submitted_text:
+            self.submitted_text = None
+            self.search_button.setEnabled(True)
+            logger.warning(f"Invalid search query '{search_text}': {reason}")
+            if self.search_manager.regex:
+                QMessageBox.warning(self, "خطأ في صيغة البحث", "التعبير النمطي غير صالح: {}".format(reason))
+            else:
+                QMessageBox.warning(self, "خطأ في صيغة البحث", "تعذر فهم صيغة البحث، تأكد من إغلاق الأقواس وعلامات التنصيص ومن كتابة العوامل AND وOR وNOT وNEAR بين كلمات البحث.")
+            return
+        self.live_results_label.setText("صيغة البحث غير مكتملة.")
+
+    def on_search_error(self, search_text: str):
+        if self.sender() is not self.search_worker or search_text != self.search_box.text():
+            return
+        self.live_results_label.setText("تعذر إجراء البحث.")
+        if search_text == self.submitted_text:
+            self.submitted_text = None
+            self.search_button.setEnabled(True)
+            QMessageBox.critical(self, "خطأ", "حدث خطأ أثناء البحث، حاول مرة أخرى.")
 
     def show_advanced_options(self):
         enabled = self.advanced_search_checkbox.isChecked()
         self.advanced_search_groupbox.setEnabled(enabled)
+        self.update_validator()
         logger.debug(f"Advanced search {'enabled' if enabled else 'disabled'}.")
         if not enabled:
             self.reset_search_options()
             
+    def update_validator(self):
+        """Regular expressions need every character, the plain search only accepts Arabic letters and the query operators."""
+        regex = self.advanced_search_checkbox.isChecked() and self.regex_search_checkbox.isChecked()
+        self.search_box.setValidator(None if regex else self.search_validator)
+        self.OnEdit()
+
     def on_submit(self):
         logger.debug("Search button clicked.")
+        self.live_search_timer.stop()
+        self.cancel_search()
         self.set_options_search()
         search_text = self.search_box. text()
         self.search_submitted.emit(search_text)
         logger.debug(f"Searching for: {search_text}")
-        search_result = self.search_manager.search(search_text)
+        if self.search_scope_combobox.currentData():
+            return self.search_corpora(search_text)
+
+        # The result of the live search is reused when nothing changed since, a regex that ran out of time is not run again.
+        if self.last_result is not None and self.last_result[:2] == (search_text, self.search_manager.options_key):
+            return self.show_results(search_text, self.last_result[2])
+
+        # The search runs on the worker, so a slow pattern never blocks the window, and the results open when it finishes.
+        self.submitted_text = search_text
+        self.search_button.setEnabled(False)
+        self.live_results_label.setText("جارٍ البحث...")
+        self.start_search(search_text)
+
+    def show_results(self, search_text: str, search_result: SearchResultCursor):
         if not search_result:
             logger.warning(f"No results found for '{search_text}'.")
             msg_box = QMessageBox(self)
@@ -165,20 +367,45 @@ class SearchDialog(QDialog):
 
             return
         logger.info(f"Search successful. {len(search_result)} results found.")
-        result_dialog = SearchResultsDialog(self, search_result)
+        result_dialog = SearchResultsDialog(self, search_result, self.sura)
         if result_dialog.exec():
-            selected_result = result_dialog.list_widget.currentRow()
-            selected_result = search_result[selected_result]
-            ayah_number = selected_result["number"]
-            self.parent.quran_manager.navigation_mode = self.parent.get_valid_navigation_mode()
-            ayah_result = self.parent.quran_manager.get_by_ayah_number(ayah_number)
+            selected_result = result_dialog.search_result[result_dialog.current_row()]
             logger.info(f"User selected result {selected_result}")
-            self.parent.quran_view.setText(ayah_result)
-            self.parent.set_focus_to_ayah(ayah_number)
-            self.parent.quran_view.setFocus()
+            self.go_to_ayah(selected_result["number"], self.search_manager.highlighter(search_text), result_dialog.search_result.numbers)
             logger.info(f"Moved to Ayah: {selected_result['numberInSurah']} in Surah: {selected_result['sura_name']}")
-            self.accept()
-            self.deleteLater()
+
+    def search_corpora(self, search_text: str):
+        """Search the tafaseer, asbab al-nuzul and i'rab with the current options, showing the results as they arrive."""
+        corpus_search_manager = CorpusSearchManager()
+        if not corpus_search_manager.corpora:
+            QMessageBox.warning(self, "لا توجد نتائج", "لم يتم العثور على أي من قواعد بيانات التفاسير.")
+            return
+        corpus_search_manager.set(
+            no_tashkil=self.search_manager.no_tashkil,
+            no_hamza=self.search_manager.no_hamza,
+            match_whole_word=self.search_manager.match_whole_word,
+            full_normalization=self.search_manager.full_normalization,
+            number_range=self.search_manager.number_range
+        )
+        result_dialog = CorpusSearchResultsDialog(self, corpus_search_manager, search_text)
+        if result_dialog.exec():
+            self.go_to_ayah(result_dialog.selected_ayah_number())
+
+    def format_ayah_position(self, number: int) -> str:
+        sura_number, number_in_surah = self.search_manager.ayah_position(number)
+        return "الآية {} من {}".format(number_in_surah, self.sura[sura_number - 1])
+
+    def go_to_ayah(self, ayah_number: int, highlighter: HitHighlighter = None, hit_numbers: list = ()):
+        """Show the unit of the ayah and move to it, highlighting the search hits of the view if a highlighter is given."""
+        self.parent.quran_manager.navigation_mode = self.parent.get_valid_navigation_mode()
+        ayah_result = self.parent.quran_manager.get_by_ayah_number(ayah_number)
+        self.parent.quran_view.setText(ayah_result)
+        if highlighter:
+            self.parent.quran_view.highlight_hits(highlighter, hit_numbers)
+        self.parent.set_focus_to_ayah(ayah_number)
+        self.parent.quran_view.setFocus()
+        self.accept()
+        self.deleteLater()
 
     def on_radio_toggled(self):
         logger.debug(f"Radio button toggled. Selected: {self.sender().text()}")
@@ -208,8 +435,21 @@ class SearchDialog(QDialog):
             self.search_from_combobox.addItems(self.quarters)
             self.search_to_combobox.addItems(self.quarters)
         self.search_to_combobox.setCurrentIndex(self.search_to_combobox.count() - 1)
+        for widget in (self.ayah_from_label, self.ayah_from_combobox, self.ayah_to_label, self.ayah_to_combobox):
+            widget.setVisible(self.criteria == SearchCriteria.sura)
         logger.debug(f"Search type changed to: {self.criteria}.")
 
+    def update_ayahs(self, combo_surah: QComboBox, combo_ayah: QComboBox):
+        """Fill the ayah combo box with the ayahs of the surah selected in combo_surah, when searching by surah."""
+        combo_ayah.clear()
+        if self.criteria != SearchCriteria.sura or combo_surah.currentIndex() < 0:
+            return
+        surah = self.surahs[combo_surah.currentIndex()]
+        for ayah_number in range(1, surah.ayah_count + 1):
+            combo_ayah.addItem(str(ayah_number), ayah_number)
+        if combo_ayah is self.ayah_to_combobox:
+            combo_ayah.setCurrentIndex(combo_ayah.count() - 1)
+
     def set_options_search(self):
         logger.debug("Setting search options.")
         if not self.advanced_search_checkbox.isChecked():
@@ -222,41 +462,99 @@ class SearchDialog(QDialog):
             no_tashkil=self.ignore_diacritics_checkbox.isChecked(),
             no_hamza=self.ignore_hamza_checkbox.isChecked(),
             match_whole_word=self.match_whole_word_checkbox.isChecked(),
+            fuzzy=self.fuzzy_search_checkbox.isChecked(),
+            regex=self.regex_search_checkbox.isChecked(),
+            mode=SearchMode.get_mode_by_arabic_name(self.search_mode_combobox.currentText()),
             criteria=self.criteria,
             _from=search_from,
-_to=search_to
+_to=search_to,
+            from_ayah=self.ayah_from_combobox.currentData(),
+            to_ayah=self.ayah_to_combobox.currentData()
         )
-        logger.debug(f"Search options set: from {search_from} to {search_to}, criteria {self.criteria}, no_tashkil {self.ignore_diacritics_checkbox.isChecked()}, no_hamza {self.ignore_hamza_checkbox.isChecked()}, match_whole_word {self.match_whole_word_checkbox.isChecked()}.")
+        logger.debug(f"Search options set: from {search_from} to {search_to}, criteria {self.criteria}, no_tashkil {self.ignore_diacritics_checkbox.isChecked()}, no_hamza {self.ignore_hamza_checkbox.isChecked()}, match_whole_word {self.match_whole_word_checkbox.isChecked()}, fuzzy {self.fuzzy_search_checkbox.isChecked()}, mode {self.search_mode_combobox.currentText()}.")
 
     def reset_search_options(self):
             self.search_manager.set(
                 no_tashkil=Config.search.ignore_tashkeel,
                                    no_hamza=Config.search.ignore_hamza,
                                    match_whole_word=Config.search.match_whole_word,
+                                   fuzzy=Config.search.fuzzy_search,
             )
 
+    def done(self, result):
+        self.live_search_timer.stop()
+        self.cancel_search()
+        super().done(result)
+
     def closeEvent(self, a0):
         logger.debug("SearchDialog closed.")
         return super().closeEvent(a0)
     
     
+class SearchResultsModel(QAbstractListModel):
+    """List model over a SearchResultCursor. Rows are fetched and formatted only when the view asks for them."""
+
+    def __init__(self, search_result: SearchResultCursor, parent=None):
+        super().__init__(parent)
+        self.search_result = search_result
+
+    def set_search_result(self, search_result: SearchResultCursor):
+        self.beginResetModel()
+        self.search_result = search_result
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.search_result)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.search_result):
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.format_result(self.search_result[index.row()])
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            return self.search_result[index.row()]["text"]
+        elif role == Qt.ItemDataRole.AccessibleDescriptionRole:
+            return f"{index.row() + 1} من {len(self.search_result)}"
+        return None
+
+    @staticmethod
+    def format_result(row: dict) -> str:
+        text = row["text"]
+        # take first 5 words from text
+        words = text.split()
+        text = " ".join(words[:5])
+        text += "..." if len(words) > 5 else ""
+
+        return "{} | الآية {} من {}".format(text, row["numberInSurah"], row["sura_name"])
+
+
 class SearchResultsDialog(QDialog):
-    def __init__(self, parent=None, search_result=[]):
+    def __init__(self, parent=None, search_result: SearchResultCursor = None, sura_names: list = None):
         super().__init__(parent)
+        self.all_results = search_result
         self.search_result = search_result
+        self.sura_names = sura_names or []
         self.setWindowTitle("نتائج البحث")
         logger.debug(f"SearchResultsDialog opened with {len(search_result)} results.")
-        self.total_label = QLabel("عدد النتائج: {}.".format(len(search_result)))
+        self.total_label = QLabel("عدد النتائج: {}.{}".format(len(search_result), STOPPED_EARLY_NOTE if search_result.stopped_early else ""))
+        self.filter_label = QLabel("تصفية النتائج حسب:")
+        self.filter_criteria_combobox = QComboBox()
+        self.filter_criteria_combobox.addItem("كل النتائج", None)
+        for arabic_criteria in SearchCriteria.get_arabic_criteria():
+            self.filter_criteria_combobox.addItem(arabic_criteria, SearchCriteria.get_criteria_by_arabic_name(arabic_criteria))
+        self.filter_criteria_combobox.setAccessibleName(self.filter_label.text())
+        self.filter_criteria_combobox.currentIndexChanged.connect(self.on_filter_criteria_changed)
+        self.filter_unit_combobox = QComboBox()
+        self.filter_unit_combobox.setEnabled(False)
+        self.filter_unit_combobox.currentIndexChanged.connect(self.on_filter_unit_changed)
         self.label = QLabel("النتائج:")
-        self.list_widget = QListWidget(self)
-        self.list_widget.setAccessibleDescription(self.label.text())
-
-        for i, row in enumerate(search_result):
-            item = QListWidgetItem(self.format_result(row))
-            item.setData(Qt.ItemDataRole.AccessibleDescriptionRole, f"{i+1} من {len(search_result)}")
-            item.setToolTip(row["text"])
-            self.list_widget.addItem(item)
-            
+        self.model = SearchResultsModel(search_result, self)
+        self.list_view = QListView(self)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setModel(self.model)
+        self.list_view.setAccessibleDescription(self.label.text())
+
         self.go_to_button = QPushButton("الذهاب للنتيجة")
         self.go_to_button.clicked.connect(self.accept)
         self.go_to_button.clicked.connect(lambda: Globals.effects_manager.play("move"))
@@ -269,23 +567,51 @@ class SearchResultsDialog(QDialog):
 
         layout = QVBoxLayout()
         layout.addWidget(self.total_label)
+        layout.addWidget(self.filter_label)
+        layout.addWidget(self.filter_criteria_combobox)
+        layout.addWidget(self.filter_unit_combobox)
         layout.addWidget(self.label)
-        layout.addWidget(self.list_widget)
+        layout.addWidget(self.list_view)
         layout.addWidget(self.go_to_button)
         layout.addWidget(self.cancel_button)
         
         self.setLayout(layout)
-        self.list_widget.setCurrentRow(0)
+        self.list_view.setCurrentIndex(self.model.index(0))
         logger.debug("SearchResultsDialog initialized successfully.")
 
-    def format_result(self, row:dict) -> str:
-        text = row["text"]
-        # take first 5 words from text
-        words = text.split()
-        text = " ".join(words[:5])
-        text += "..." if len(words) > 5 else ""
+    def current_row(self) -> int:
+        return self.list_view.currentIndex().row()
 
-        return "{} | الآية {} من {}".format(text, row["numberInSurah"], row["sura_name"])
+    def format_unit(self, criteria: str, unit: int) -> str:
+        if criteria == SearchCriteria.sura and 0 < unit <= len(self.sura_names):
+            return self.sura_names[unit - 1]
+        return "{} {}".format(self.filter_criteria_combobox.currentText(), unit)
+
+    def on_filter_criteria_changed(self):
+        """Fill the units list with the result counts of the chosen criteria, taken from the facets of the search."""
+        criteria = self.filter_criteria_combobox.currentData()
+        self.filter_unit_combobox.blockSignals(True)
+        self.filter_unit_combobox.clear()
+        if criteria is not None:
+            for unit, count in self.all_results.facets.get(criteria, {}).items():
+                self.filter_unit_combobox.addItem("{} ({})".format(self.format_unit(criteria, unit), count), unit)
+            self.filter_unit_combobox.setAccessibleName(self.filter_criteria_combobox.currentText())
+        self.filter_unit_combobox.blockSignals(False)
+        self.filter_unit_combobox.setEnabled(criteria is not None)
+        logger.debug(f"Results filter criteria changed to: {criteria}.")
+        self.on_filter_unit_changed()
+
+    def on_filter_unit_changed(self):
+        criteria = self.filter_criteria_combobox.currentData()
+        unit = self.filter_unit_combobox.currentData()
+        if criteria is None or unit is None:
+            self.search_result = self.all_results
+            self.total_label.setText("عدد النتائج: {}.{}".format(len(self.all_results), STOPPED_EARLY_NOTE if self.all_results.stopped_early else ""))
+        else:
+            self.search_result = self.all_results.narrow(criteria, unit)
+            self.total_label.setText("عدد النتائج: {} من {}.".format(len(self.search_result), len(self.all_results)))
+        self.model.set_search_result(self.search_result)
+        self.list_view.setCurrentIndex(self.model.index(0))
 
     def keyPressEvent(self, event: QKeyEvent | None) -> None:
 
@@ -293,7 +619,7 @@ class SearchResultsDialog(QDialog):
             UniversalSpeech.say(self.total_label.text())
             logger.debug("Ctrl+I pressed: Announcing total results count.")
         elif event.key() == Qt.Key.Key_R and event.modifiers() == Qt.KeyboardModifier.ControlModifier:
-            current_row = self.list_widget.currentRow()
+            current_row = self.current_row()
             text = self.search_result[current_row]["text"]
             UniversalSpeech.say(text)
             logger.debug(f"Ctrl+R pressed: Reading search result at index {current_row}.")
@@ -305,4 +631,95 @@ class SearchResultsDialog(QDialog):
     def closeEvent(self, a0):
         logger.debug("SearchResultsDialog closed.")
         return super().closeEvent(a0)
-    
\ No newline at end of file
+    
+
+
+class CorpusSearchResultsDialog(QDialog):
+    """Results of a search in the tafaseer and the other corpora, grouped by ayah and filled in as each corpus finishes."""
+
+    def __init__(self, parent: SearchDialog, corpus_search_manager: CorpusSearchManager, search_text: str):
+        super().__init__(parent)
+        self.parent = parent
+        self.search_result = None
+        self.setWindowTitle("نتائج البحث في التفاسير")
+        self.resize(600, 450)
+        self.total_label = QLabel("جاري البحث...")
+        self.label = QLabel("النتائج:")
+        self.tree_widget = QTreeWidget()
+        self.tree_widget.setHeaderHidden(True)
+        self.tree_widget.setAccessibleName(self.label.text())
+        self.tree_widget.itemActivated.connect(self.accept)
+
+        self.go_to_button = QPushButton("الذهاب للآية")
+        self.go_to_button.setEnabled(False)
+        self.go_to_button.clicked.connect(self.accept)
+        self.go_to_button.clicked.connect(lambda: Globals.effects_manager.play("move"))
+        self.cancel_button = QPushButton("إلغاء")
+        self.cancel_button.setShortcut(QKeySequence("Ctrl+W"))
+        self.cancel_button.clicked.connect(self.reject)
+        close_shortcut = QShortcut(QKeySequence("Ctrl+F4"), self)
+        close_shortcut.activated.connect(self.reject)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.total_label)
+        layout.addWidget(self.label)
+        layout.addWidget(self.tree_widget)
+        layout.addWidget(self.go_to_button)
+        layout.addWidget(self.cancel_button)
+        self.setLayout(layout)
+
+        self.search_worker = CorpusSearchWorker(corpus_search_manager, search_text, self)
+        self.search_worker.result_updated.connect(self.on_result_updated)
+        self.search_worker.search_failed.connect(self.on_search_failed)
+        self.search_worker.start()
+        logger.debug(f"CorpusSearchResultsDialog opened for '{search_text}'.")
+
+    def on_result_updated(self, search_result: CorpusSearchResult):
+        """Rebuild the tree with the matches found so far, keeping the ayah the user is on."""
+        current_number = self.selected_ayah_number()
+        self.search_result = search_result
+        self.tree_widget.clear()
+        for number, matches in search_result.by_ayah.items():
+            ayah_item = QTreeWidgetItem(["{} ({})".format(self.parent.format_ayah_position(number), len(matches))])
+            ayah_item.setData(0, Qt.ItemDataRole.UserRole, number)
+            for match in matches:
+                match_item = QTreeWidgetItem(["{}: {}".format(match.arabic_name, match.snippet)])
+                match_item.setData(0, Qt.ItemDataRole.UserRole, number)
+                match_item.setToolTip(0, match.snippet)
+                ayah_item.addChild(match_item)
+            self.tree_widget.addTopLevelItem(ayah_item)
+            if number == current_number:
+                self.tree_widget.setCurrentItem(ayah_item)
+        if self.tree_widget.currentItem() is None and self.tree_widget.topLevelItemCount():
+            self.tree_widget.setCurrentItem(self.tree_widget.topLevelItem(0))
+        self.go_to_button.setEnabled(bool(search_result.by_ayah))
+
+        status = "عدد الآيات: {}، عدد النتائج: {}.".format(len(search_result), search_result.total)
+        if not search_result.is_complete:
+            status += " جاري البحث في {} من {}...".format(len(search_result.corpora) - len(search_result.completed) - len(search_result.failed), len(search_result.corpora))
+        elif not search_result.by_ayah:
+            status = "لا توجد نتائج متاحة لبحثك."
+        self.total_label.setText(status)
+        logger.debug(f"Corpus search results updated: {len(search_result)} ayahs, {len(search_result.completed)} of {len(search_result.corpora)} corpora done.")
+
+    def on_search_failed(self, search_text: str):
+        self.total_label.setText("تعذر البحث، تأكد من صيغة البحث.")
+
+    def selected_ayah_number(self):
+        item = self.tree_widget.currentItem()
+        return item.data(0, Qt.ItemDataRole.UserRole) if item is not None else None
+
+    def accept(self):
+        if self.selected_ayah_number() is None:
+            return
+        self.search_worker.cancel()
+        super().accept()
+
+    def keyPressEvent(self, event: QKeyEvent | None) -> None:
+        if event.key() == Qt.Key.Key_I and event.modifiers() == Qt.KeyboardModifier.ControlModifier:
+            UniversalSpeech.say(self.total_label.text())
+        return super().keyPressEvent(event)
+
+    def done(self, result):
+        self.search_worker.cancel()
+        super().done(result)
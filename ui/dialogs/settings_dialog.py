@@ -23,6 +23,7 @@ from PyQt6.QtCore import Qt
 from ui.widgets.spin_box import SpinBox
 from core_functions.quran.types import QuranFontType, MarksType
 from core_functions.Reciters import AyahReciter
+from core_functions.search import QuranSearchManager
 from utils.const import data_folder, program_english_name, Globals
 from utils.settings import Config
 from utils.logger import LogLevel, LoggerManager
@@ -245,10 +246,12 @@ class SettingsDialog(QDialog):
         self.ignore_tashkeel_checkbox = QCheckBox("تجاهل التشكيل")
         self.ignore_hamza_checkbox = QCheckBox("تجاهل الهمزات")
         self.match_whole_word_checkbox = QCheckBox("تطابق الكلمة بأكملها")
+        self.fuzzy_search_checkbox = QCheckBox("البحث التقريبي مع تجاوز الأخطاء الإملائية")
 
         self.group_search_layout.addWidget(self.ignore_tashkeel_checkbox)
         self.group_search_layout.addWidget(self.ignore_hamza_checkbox)
         self.group_search_layout.addWidget(self.match_whole_word_checkbox)
+        self.group_search_layout.addWidget(self.fuzzy_search_checkbox)
         self.group_search_layout.addSpacerItem(QSpacerItem(20, 40, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding))
         self.group_search.setLayout(self.group_search_layout)
 
@@ -355,17 +358,21 @@ class SettingsDialog(QDialog):
             new_font_type = self.font_type_combo.currentData()
             logger.info(f"Font type changed from {QuranFontType.from_int(Config.reading.font_type)} to {new_font_type}. Reloading Quran text.")
             self.parent.quran_manager.get_surahs.cache_clear()
+            QuranSearchManager.result_cache.clear()
             self.parent.quran_manager.font_type = new_font_type
+            self.parent.quran_manager.clear_view_cache()
             self.parent.quran_view.setText(self.parent.quran_manager.get_current_content())
             Globals.effects_manager.play("change")
         if Config.reading.marks_type != self.marks_type_combo.currentData().value:
             new_marks_type = self.marks_type_combo.currentData()
             self.parent.quran_manager.formatter_options.marks_type = new_marks_type
+            self.parent.quran_manager.clear_view_cache()
             logger.info(f"Marks type changed from {MarksType.from_int(Config.reading.marks_type)} to {new_marks_type}. Reloading Quran text.")
             self.parent.quran_view.setText(self.parent.quran_manager.get_current_content())
             Globals.effects_manager.play("change")
         if Config.reading.auto_page_turn != self.turn_pages_checkbox.isChecked():
             self.parent.quran_manager.formatter_options.auto_page_turn = self.turn_pages_checkbox.isChecked()
+            self.parent.quran_manager.clear_view_cache()
             self.parent.quran_view.setText(self.parent.quran_manager.get_current_content())
                 
         # Update settings in Config
@@ -399,6 +406,7 @@ class SettingsDialog(QDialog):
         Config.search.ignore_tashkeel = self.ignore_tashkeel_checkbox.isChecked()
         Config.search.ignore_hamza = self.ignore_hamza_checkbox.isChecked()
         Config.search.match_whole_word = self.match_whole_word_checkbox.isChecked()
+        Config.search.fuzzy_search = self.fuzzy_search_checkbox.isChecked()
 
         # Save settings to file
         logger.debug("Saving settings to configuration file.")
@@ -443,6 +451,7 @@ class SettingsDialog(QDialog):
         self.ignore_tashkeel_checkbox.setChecked(Config.search.ignore_tashkeel)
         self.ignore_hamza_checkbox.setChecked(Config.search.ignore_hamza)
         self.match_whole_word_checkbox.setChecked(Config.search.match_whole_word)
+        self.fuzzy_search_checkbox.setChecked(Config.search.fuzzy_search)
 
         combo_config = [
             (self.log_levels_combo, Config.general.log_level),
@@ -32,6 +32,7 @@ from ui.dialogs.find import SearchDialog
 from ui.widgets.button import EnterButton
 from ui.widgets.menu_bar import MenuBar
 from ui.widgets.qText_edit import QuranViewer
+from ui.widgets.find_bar import FindBar
 from ui.dialogs.tafaseer_Dialog import TafaseerDialog
 from ui.dialogs.info_dialog import InfoDialog
 from ui.dialogs.custom_range import CustomRangeDialog
@@ -102,6 +103,7 @@ class QuranInterface(QMainWindow):
         self.quran_view = QuranViewer(self)
         self.quran_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.quran_view.customContextMenuRequested.connect(self.onContextMenu)
+        self.find_bar = FindBar(self, self.quran_view)
         
         self.next_to = EnterButton()
         self.next_to.setIcon(qta.icon("fa.forward"))
@@ -158,6 +160,7 @@ class QuranInterface(QMainWindow):
         layout = QVBoxLayout()
         layout.addWidget(self.quran_title, alignment=Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.quran_view)
+        layout.addWidget(self.find_bar)
 
         buttons_layout = QHBoxLayout()
         buttons_layout.addWidget(self.next_to)
@@ -237,7 +240,7 @@ class QuranInterface(QMainWindow):
         logger.debug("Setting text control label.")
         
         label = self.quran_manager.view_content.label
-        if self.quran_manager.navigation_mode in (NavigationMode.SURAH, NavigationMode.PAGE):
+        if self.quran_manager.navigation_mode in (NavigationMode.SURAH, NavigationMode.PAGE, NavigationMode.CONTINUOUS):
             next_label = "التالية"
             previous_label = "السابقة"
         else:
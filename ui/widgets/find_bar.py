@@ -0,0 +1,148 @@
+from typing import List, Optional, Tuple
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QLabel, QLineEdit, QPushButton
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QTextCursor, QKeySequence, QShortcut
+import qtawesome as qta
+from core_functions.search import TextFinder
+from utils.universal_speech import UniversalSpeech
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+
+class FindBar(QWidget):
+    """
+    Find a phrase in the text shown in the Quran view, ignoring tashkil and hamzat.
+    The view text is folded once per page, so the hits are found again on each keystroke without querying the database.
+    """
+
+    def __init__(self, parent, quran_view):
+        super().__init__(parent)
+        self.parent = parent
+        self.quran_view = quran_view
+        self._finder: Optional[TextFinder] = None
+        self.spans: List[Tuple[int, int]] = []
+        self.current = -1
+        # update_hits points current at the first hit after the cursor without selecting it, the next step goes to that hit.
+        self._current_selected = False
+
+        self.label = QLabel("البحث في النص المعروض:")
+        self.search_box = QLineEdit()
+        self.search_box.setAccessibleName(self.label.text())
+        self.label.setBuddy(self.search_box)
+        self.search_box.textChanged.connect(self.update_hits)
+        self.search_box.returnPressed.connect(self.find_next)
+
+        self.count_label = QLabel()
+
+        self.previous_button = QPushButton(qta.icon("fa.arrow-up"), "")
+        self.previous_button.setToolTip("النتيجة السابقة")
+        self.previous_button.setAccessibleName("النتيجة السابقة")
+        self.previous_button.clicked.connect(self.find_previous)
+
+        self.next_button = QPushButton(qta.icon("fa.arrow-down"), "")
+        self.next_button.setToolTip("النتيجة التالية")
+        self.next_button.setAccessibleName("النتيجة التالية")
+        self.next_button.clicked.connect(self.find_next)
+
+        self.close_button = QPushButton(qta.icon("fa.times"), "")
+        self.close_button.setToolTip("إغلاق")
+        self.close_button.setAccessibleName("إغلاق")
+        self.close_button.clicked.connect(self.close_bar)
+
+        QShortcut(QKeySequence("Shift+Return"), self.search_box, self.find_previous)
+        QShortcut(QKeySequence("Shift+Enter"), self.search_box, self.find_previous)
+        QShortcut(QKeySequence(Qt.Key.Key_Escape), self, self.close_bar, context=Qt.ShortcutContext.WidgetWithChildrenShortcut)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.label)
+        layout.addWidget(self.search_box)
+        layout.addWidget(self.count_label)
+        layout.addWidget(self.previous_button)
+        layout.addWidget(self.next_button)
+        layout.addWidget(self.close_button)
+        self.setLayout(layout)
+
+        self.quran_view.textChanged.connect(self.on_view_text_changed)
+        self.hide()
+
+    def open_bar(self):
+        self.show()
+        self.search_box.setFocus()
+        self.search_box.selectAll()
+        self.update_hits()
+
+    def close_bar(self):
+        self.hide()
+        self.spans = []
+        self.current = -1
+        self.quran_view.clear_highlights()
+        self.quran_view.setFocus()
+
+    def on_view_text_changed(self):
+        # QuranViewer clears its highlights on textChanged, the hits of the new page are highlighted again if the bar is open.
+        self._finder = None
+        if self.isVisible() and self.search_box.text():
+            self.update_hits()
+
+    def _get_finder(self) -> TextFinder:
+        # The view shows the text of the view content, which is already a Python string, unlike toPlainText that copies the whole document.
+        view_content = self.parent.quran_manager.view_content
+        text = view_content.text if view_content is not None else self.quran_view.toPlainText()
+        if self._finder is None or self._finder.text != text:
+            self._finder = TextFinder(text)
+        return self._finder
+
+    def update_hits(self):
+        phrase = self.search_box.text()
+        self.spans = self._get_finder().find_all(phrase) if phrase.strip() else []
+        self.current = -1
+        self._current_selected = False
+        if self.spans:
+            position = self.quran_view.textCursor().selectionStart()
+            self.current = next((i for i, (start, _) in enumerate(self.spans) if start >= position), 0)
+        self.quran_view.set_highlights(self.spans, self.current)
+        self.update_count_label()
+        logger.debug(f"Found {len(self.spans)} hits of '{phrase}' in the view.")
+
+    def update_count_label(self):
+        if not self.search_box.text().strip():
+            self.count_label.clear()
+        elif self.spans:
+            self.count_label.setText(f"{self.current + 1} من {len(self.spans)}")
+        else:
+            self.count_label.setText("لا توجد نتائج")
+
+    def find_next(self):
+        self._move(1)
+
+    def find_previous(self):
+        self._move(-1)
+
+    def _move(self, step: int):
+        if not self.isVisible():
+            self.open_bar()
+            return
+        if not self.spans:
+            UniversalSpeech.say("لا توجد نتائج")
+            return
+
+        if step > 0 and not self._current_selected:
+            step = 0
+        self.current = (self.current + step) % len(self.spans)
+        self._current_selected = True
+        start, end = self.spans[self.current]
+        cursor = QTextCursor(self.quran_view.document())
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        self.quran_view.setTextCursor(cursor)
+        self.quran_view.ensureCursorVisible()
+        self.quran_view.set_highlights(self.spans, self.current)
+        self.update_count_label()
+
+        message = f"النتيجة {self.current + 1} من {len(self.spans)}"
+        ayah = self.parent.quran_manager.view_content.get_by_position(start)
+        if ayah is not None:
+            message += f"، {ayah.sura_name} الآية {ayah.number_in_surah}"
+        UniversalSpeech.say(message)
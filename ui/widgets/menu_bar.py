@@ -44,6 +44,12 @@ class MenuBar(QMenuBar):
         self.go_to_saved_position_action.triggered.connect(lambda: Globals.effects_manager.play("move"))
         self.search_action = QAction("البحث", self)
         self.search_action.triggered.connect(self.parent.OnSearch)        
+        self.find_in_view_action = QAction("البحث في النص المعروض", self)
+        self.find_in_view_action.triggered.connect(lambda: self.parent.find_bar.open_bar())
+        self.find_next_in_view_action = QAction("النتيجة التالية في النص المعروض", self)
+        self.find_next_in_view_action.triggered.connect(lambda: self.parent.find_bar.find_next())
+        self.find_previous_in_view_action = QAction("النتيجة السابقة في النص المعروض", self)
+        self.find_previous_in_view_action.triggered.connect(lambda: self.parent.find_bar.find_previous())
         self.go_to_action = QAction("اذهب إلى", self)
         self.go_to_action.triggered.connect(self.OnGoTo)
         self.go_to_ayah_action = QAction("الذهاب إلى آية", self)
@@ -56,7 +62,7 @@ class MenuBar(QMenuBar):
         self.exit_action = QAction("إغلاق البرنامج", self)
         self.exit_action.triggered.connect(self.quit_application)
 
-        self.navigation_menu.addActions([self.next_action, self.previous_action, self.search_action, self.go_to_saved_position_action, self.go_to_ayah_action, self.go_to_action,  self.quick_access_action, self.close_action, self.exit_action])
+        self.navigation_menu.addActions([self.next_action, self.previous_action, self.search_action, self.find_in_view_action, self.find_next_in_view_action, self.find_previous_in_view_action, self.go_to_saved_position_action, self.go_to_ayah_action, self.go_to_action,  self.quick_access_action, self.close_action, self.exit_action])
 
 
         self.player_menu = self.addMenu("المشغل(&P)")
@@ -123,6 +129,7 @@ class MenuBar(QMenuBar):
         ("أحزاب", NavigationMode.HIZB, "Ctrl+4"),
         ("أجزاء", NavigationMode.JUZ, "Ctrl+5"),
         ("مخصص", NavigationMode.CUSTOM_RANGE, "Ctrl+6"),
+        ("متواصل", NavigationMode.CONTINUOUS, "Ctrl+7"),
     ]
 
     # Create actions using a loop
@@ -442,6 +449,9 @@ class MenuBar(QMenuBar):
             self.previous_action: ["Ctrl+B", QKeySequence(Qt.Key.Key_PageUp), "Ctrl+Up", "Alt+Left"],
             self.go_to_saved_position_action: ["Ctrl+Backspace"],
             self.search_action: ["Ctrl+F"],
+            self.find_in_view_action: ["Ctrl+Shift+F"],
+            self.find_next_in_view_action: ["F4"],
+            self.find_previous_in_view_action: ["Shift+F4"],
             self.go_to_action: ["Ctrl+G"],
         self.go_to_ayah_action: ["Shift+G"],
             self.quick_access_action: ["Ctrl+Q"],
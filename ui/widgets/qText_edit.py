@@ -1,6 +1,6 @@
 import re
 from PyQt6.QtCore import QEvent, Qt, QLocale
-from PyQt6.QtGui import QKeyEvent, QTextCursor
+from PyQt6.QtGui import QKeyEvent, QTextCursor, QTextCharFormat, QPalette
 from PyQt6.QtWidgets import QTextEdit
 from core_functions.quran.types import NavigationMode
 from utils.settings import Config
@@ -33,9 +33,100 @@ class QuranViewer(ReadOnlyTextEdit):
         logger.debug("Initializing QuranViewer.")
         self.parent = parent
         self.is_page_turn_alert = False
+        self._moving_window = False
+        # The continuous view edits the document at its ends, keeping that history would grow without bound.
+        self.document().setUndoRedoEnabled(False)
         self.textChanged.connect(self.set_ctrl)
+        self.textChanged.connect(self.clear_highlights)
+        self.cursorPositionChanged.connect(self.follow_continuous)
         logger.debug("QuranViewer initialized.")
 
+    def setText(self, text: str):
+        self._moving_window = True
+        try:
+            super().setText(text)
+            if self.parent.quran_manager.navigation_mode == NavigationMode.CONTINUOUS:
+                # Start reading at the current page, not at the first page of the window.
+                cursor = QTextCursor(self.document())
+                cursor.setPosition(self.parent.quran_manager.window_anchor)
+                self.setTextCursor(cursor)
+        finally:
+            self._moving_window = False
+
+    def follow_continuous(self):
+        """In continuous mode, move the window of pages when the cursor reaches another page."""
+        quran_manager = self.parent.quran_manager
+        if self._moving_window or quran_manager.navigation_mode != NavigationMode.CONTINUOUS:
+            return
+        ayah = quran_manager.view_content.get_by_position(self.textCursor().position())
+        if ayah is None or ayah.page == quran_manager.current_position:
+            return
+
+        self._moving_window = True
+        try:
+            for edit in quran_manager.follow_continuous(ayah.page):
+                self.apply_window_edit(edit)
+        finally:
+            self._moving_window = False
+        self.parent.set_text_ctrl_label()
+
+    def apply_window_edit(self, edit):
+        """Apply a WindowEdit of the continuous view. The text cursor keeps its place in the text that stays."""
+        cursor = QTextCursor(self.document())
+        end = self.document().characterCount() - 1
+        if edit.at_end:
+            cursor.setPosition(end - edit.removed)
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        else:
+            cursor.setPosition(edit.removed, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        if edit.inserted:
+            cursor.insertText(edit.inserted)
+
+    def highlight_hits(self, highlighter, ayah_numbers) -> int:
+        """
+        Highlight the hits of a search (see core_functions.search.HitHighlighter) in the ayahs of the current view
+        whose numbers are in ayah_numbers, and return how many spans were highlighted.
+        The highlights are cleared when the view changes.
+        """
+        view_content = self.parent.quran_manager.view_content
+        start_ayah, end_ayah = view_content.start_ayah, view_content.end_ayah
+        if not highlighter or start_ayah is None:
+            return 0
+
+        spans = []
+        for number in sorted(number for number in ayah_numbers if start_ayah.number <= number <= end_ayah.number):
+            ayah = view_content.get_by_ayah_number(number)
+            if ayah is None or ayah.number != number:
+                continue
+            for start, end in highlighter.spans(view_content.text[ayah.first_position:ayah.last_position + 1]):
+                spans.append((ayah.first_position + start, ayah.first_position + end))
+
+        self.set_highlights(spans)
+        logger.debug(f"Highlighted {len(spans)} search hits.")
+        return len(spans)
+
+    def set_highlights(self, spans, current: int = None):
+        """Highlight the (start, end) spans of the text, the one at index current with the stronger color."""
+        char_format = QTextCharFormat()
+        char_format.setBackground(self.palette().color(QPalette.ColorRole.Highlight).lighter(150))
+        current_format = QTextCharFormat()
+        current_format.setBackground(self.palette().color(QPalette.ColorRole.Highlight))
+        current_format.setForeground(self.palette().color(QPalette.ColorRole.HighlightedText))
+        selections = []
+        for i, (start, end) in enumerate(spans):
+            selection = QTextEdit.ExtraSelection()
+            selection.format = current_format if i == current else char_format
+            selection.cursor = QTextCursor(self.document())
+            selection.cursor.setPosition(start)
+            selection.cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            selections.append(selection)
+        self.setExtraSelections(selections)
+
+    def clear_highlights(self):
+        if self.extraSelections():
+            self.setExtraSelections([])
+
     def set_ctrl(self):
         #logger.debug("Setting control state.")
         current_line_text = self.textCursor().block().text()
@@ -89,7 +180,7 @@ class QuranViewer(ReadOnlyTextEdit):
                     logger.debug("Text direction set to Right-to-Left (Ctrl + Right Shift).")
 
 
-        if not Config.reading.auto_page_turn or self.parent.quran_manager.navigation_mode == NavigationMode.CUSTOM_RANGE:
+        if not Config.reading.auto_page_turn or self.parent.quran_manager.navigation_mode in (NavigationMode.CUSTOM_RANGE, NavigationMode.CONTINUOUS):
             return
 
         current_line = self.textCursor().block().blockNumber()
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+from exceptions.database import DBNotFoundError, DatabaseConnectionError
+from utils.logger import LoggerManager
+
+logger = LoggerManager.get_logger(__name__)
+
+
+class ConnectionPool:
+    """
+    Long-lived read-only connections to the bundled databases.
+
+    The databases under the data folder never change while the program runs, so their connections are opened
+    with mode=ro and immutable=1, which lets SQLite skip locking and change detection, and they are kept open:
+    a released connection waits in the pool of its file until the next user takes it, with its schema already parsed
+    and its page cache warm. A connection is used by one thread at a time, so every thread that needs a database
+    at the same moment gets its own connection, and an idle thread holds none.
+    Callers borrow a connection for one operation with the connection() context manager.
+    Since immutable=1 makes SQLite trust its cached pages, acquire compares the modification time and size of the file
+    with those seen when its connections were opened, and if the file was replaced it closes them and opens fresh ones.
+    """
+    # Negative cache_size is in KiB.
+    CACHE_SIZE = -8192
+    MMAP_SIZE = 64 * 1024 * 1024
+
+    _lock = threading.Lock()
+    _idle: Dict[str, List[sqlite3.Connection]] = {}
+    _paths: Dict[sqlite3.Connection, str] = {}
+    _signatures: Dict[str, Tuple[float, int]] = {}
+    # opened and reused count the connections handed out, operations the with blocks run through connection().
+    stats: Dict[str, int] = {"opened": 0, "reused": 0, "operations": 0}
+
+    @classmethod
+    def _count(cls, event: str) -> None:
+        with cls._lock:
+            cls.stats[event] += 1
+
+    @staticmethod
+    def _signature(path: str) -> Tuple[float, int]:
+        if not os.path.isfile(path):
+            logger.error(f"Database file not found: {path}")
+            raise DBNotFoundError(path)
+        stat = os.stat(path)
+        return stat.st_mtime, stat.st_size
+
+    @classmethod
+    def _invalidate(cls, path: str) -> List[sqlite3.Connection]:
+        """Forget the connections of a replaced file and return the idle ones to close. Called with the lock held."""
+        stale = cls._idle.pop(path, [])
+        for conn in [conn for conn, conn_path in cls._paths.items() if conn_path == path]:
+            # Connections in use are closed by release.
+            del cls._paths[conn]
+        return stale
+
+    @classmethod
+    def _open(cls, path: str) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA cache_size = {cls.CACHE_SIZE};")
+            conn.execute(f"PRAGMA mmap_size = {cls.MMAP_SIZE};")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open {path}: {e}")
+            raise DatabaseConnectionError(cause=e)
+
+        conn.row_factory = sqlite3.Row
+        cls._count("opened")
+        logger.debug(f"Opened read-only connection to {path}.")
+        return conn
+
+    @classmethod
+    def acquire(cls, db_path: Union[str, Path]) -> sqlite3.Connection:
+        """
+        Take a connection to the database from the pool, opening one if none is idle.
+        The caller owns it until release, and must not share it with another thread meanwhile.
+        Raises DBNotFoundError if the file does not exist.
+        """
+        path = os.path.abspath(db_path)
+        signature = cls._signature(path)
+        stale = []
+        with cls._lock:
+            if cls._signatures.get(path, signature) != signature:
+                stale = cls._invalidate(path)
+            cls._signatures[path] = signature
+            idle = cls._idle.get(path)
+            conn = idle.pop() if idle else None
+            if conn is not None:
+                cls.stats["reused"] += 1
+                return conn
+
+        if stale:
+            logger.info(f"Database {path} changed on disk, reopening its pooled connections.")
+            for stale_conn in stale:
+                stale_conn.close()
+
+        conn = cls._open(path)
+        with cls._lock:
+            cls._paths[conn] = path
+        return conn
+
+    @classmethod
+    def release(cls, conn: sqlite3.Connection) -> None:
+        """Give a connection taken with acquire back to the pool, or close it if its file was replaced meanwhile."""
+        with cls._lock:
+            path = cls._paths.get(conn)
+            if path is not None:
+                cls._idle.setdefault(path, []).append(conn)
+        if path is None:
+            conn.close()
+
+    @classmethod
+    @contextmanager
+    def connection(cls, db_path: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+        """Use a pooled connection for the duration of a with block."""
+        conn = cls.acquire(db_path)
+        cls._count("operations")
+        try:
+            yield conn
+        finally:
+            cls.release(conn)
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close every connection of the pool, idle or not, for example before the database files are replaced."""
+        with cls._lock:
+            connections = list(cls._paths)
+            cls._idle.clear()
+            cls._paths.clear()
+            cls._signatures.clear()
+        for conn in connections:
+            conn.close()
+        logger.debug(f"Closed {len(connections)} pooled connections, stats: {cls.stats}.")
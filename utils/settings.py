@@ -71,6 +71,7 @@ class SearchSettings(BaseSection):
     ignore_tashkeel: bool = True
     ignore_hamza: bool = True
     match_whole_word: bool = False
+    fuzzy_search: bool = False
 
 @dataclass
 class ReadingSettings(BaseSection):